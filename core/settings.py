@@ -15,6 +15,7 @@ import dj_database_url
 from environs import Env
 import os
 import sys
+import tempfile
 
 # Initialize the Env object to read environment variables
 env = Env()
@@ -53,8 +54,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.MetricsMiddleware',
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "tasks.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,7 +64,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    'django_ratelimit.middleware.RatelimitMiddleware',
+    'tasks.middleware.RatelimitMiddleware',
+    'tasks.middleware.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -104,10 +107,44 @@ DATABASES = {
 
 POSTGRESQL_EXTENSIONS = ['pg_trgm']
 
+# Minimum trigram similarity for title search. It is set as the session default of pg_trgm's `%`
+# operator, which is what lets Postgres answer searches from the GIN trigram index on `title`. It is
+# appended to any `options` DATABASE_URL already carries.
+TASK_SEARCH_SIMILARITY_THRESHOLD = env.float('TASK_SEARCH_SIMILARITY_THRESHOLD', default=0.1)
+database_options = DATABASES['default'].setdefault('OPTIONS', {})
+database_options['options'] = ' '.join(filter(None, [
+    database_options.get('options'), f"-c pg_trgm.similarity_threshold={TASK_SEARCH_SIMILARITY_THRESHOLD}",
+]))
+
 # DATABASES['default']['OPTIONS'] = {
 #     'options': '-c search_path=public',
 # }
 
+# Read replicas for task list, retrieve and search queries (see TaskReplicas). Each URL in TASK_REPLICA_URLS
+# becomes a `replica_<n>` alias with the primary's session options; the same URL as DATABASE_URL works for
+# trying it out locally. Replicas more than TASK_REPLICA_MAX_LAG_SECONDS behind, or unreachable, are
+# skipped; their lag is rechecked every TASK_REPLICA_CHECK_INTERVAL seconds. After a write, a client's
+# reads stay on the primary for TASK_READ_YOUR_WRITES_SECONDS.
+TASK_REPLICA_URLS = env.list('TASK_REPLICA_URLS', default=[])
+for index, url in enumerate(TASK_REPLICA_URLS):
+    replica = dj_database_url.parse(url)
+    replica['OPTIONS'] = {**DATABASES['default']['OPTIONS'], **replica.get('OPTIONS', {})}
+    # The replica's own session `options` come after the primary's, so the search threshold still applies.
+    replica['OPTIONS']['options'] = ' '.join(filter(None, [
+        DATABASES['default']['OPTIONS']['options'], replica.get('OPTIONS', {}).get('options'),
+    ]))
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica_{index}'] = replica
+if 'test' in sys.argv and not TASK_REPLICA_URLS:
+    # A second alias of the test database, for the tests that turn replica reads on.
+    DATABASES['replica_0'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+TASK_REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith('replica_')]
+TASK_REPLICA_READS_ENABLED = env.bool('TASK_REPLICA_READS_ENABLED', default=bool(TASK_REPLICA_URLS))
+TASK_REPLICA_MAX_LAG_SECONDS = env.float('TASK_REPLICA_MAX_LAG_SECONDS', default=10)
+TASK_REPLICA_CHECK_INTERVAL = env.float('TASK_REPLICA_CHECK_INTERVAL', default=5)
+TASK_READ_YOUR_WRITES_SECONDS = env.float('TASK_READ_YOUR_WRITES_SECONDS', default=10)
+DATABASE_ROUTERS = ['tasks.routers.TaskReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -151,6 +188,15 @@ LOGGING = {
             'filename': 'debug.log',
             'formatter': 'verbose',
         },
+        # Task audit events: queued, written as JSON lines in batches by a background thread, and
+        # dropped (and counted) rather than blocking requests when the queue is full.
+        'audit': {
+            'level': 'INFO',
+            'class': 'tasks.helpers.logger.AuditLogHandler',
+            'filename': env.str('TASK_AUDIT_LOG_FILE', default='audit.log'),
+            'maxsize': env.int('TASK_AUDIT_LOG_QUEUE_SIZE', default=10000),
+            'batch_size': env.int('TASK_AUDIT_LOG_BATCH_SIZE', default=500),
+        },
     },
     'loggers': {
         'django': {
@@ -158,6 +204,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'tasks.audit': {
+            'handlers': ['audit'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -188,6 +239,10 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'DEFAULT_PAGINATION_LIMIT': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.helpers.renderer.TaskJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 CACHES = {
@@ -196,6 +251,94 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     },
 }
+if env.str('REDIS_URL', default=''):
+    # Shared by every worker process and host, as the task response cache requires.
+    CACHES['default'] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': env.str('REDIS_URL'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    }
+
+# Task response cache. Entries are versioned by a generation counter bumped on every task write,
+# so the timeout only bounds how long superseded entries linger. The counter lives in the
+# TASK_CACHE_ALIAS cache, which must be shared by all workers (Redis or Memcached): with a per-process
+# cache such as LocMemCache the system check fails (tasks.E001) and responses are not cached.
+TASK_CACHE_ENABLED = env.bool('TASK_CACHE_ENABLED', default=bool(env.str('REDIS_URL', default='')))
+TASK_CACHE_ALIAS = env.str('TASK_CACHE_ALIAS', default='default')
+TASK_CACHE_TIMEOUT = env.int('TASK_CACHE_TIMEOUT', default=30)
+
+# Largest number of tasks accepted by one bulk create/update/delete request.
+TASK_BULK_MAX_ITEMS = env.int('TASK_BULK_MAX_ITEMS', default=1000)
+
+# Serve task list pages from `values_list()` rows through a precompiled converter table instead of
+# TaskSerializer instances. The output is byte-for-byte the same.
+TASK_FAST_SERIALIZER_ENABLED = env.bool('TASK_FAST_SERIALIZER_ENABLED', default=True)
+
+# Length of the `description_preview` field that `?fields=` can ask for instead of the full description.
+TASK_DESCRIPTION_PREVIEW_LENGTH = env.int('TASK_DESCRIPTION_PREVIEW_LENGTH', default=100)
+
+# List counts switch from COUNT(*) to planner estimates once the planner expects this many rows (0 disables).
+TASK_COUNT_ESTIMATE_THRESHOLD = env.int('TASK_COUNT_ESTIMATE_THRESHOLD', default=100000)
+
+# Delta-sync feed: deletion tombstones are kept TASK_TOMBSTONE_RETENTION_DAYS.
+TASK_TOMBSTONE_RETENTION_DAYS = env.int('TASK_TOMBSTONE_RETENTION_DAYS', default=30)
+
+# Request, SQL, cache, rate limit and serializer metrics at `/metrics`. For servers with several worker
+# processes, point PROMETHEUS_MULTIPROC_DIR at an empty directory so the scrape covers all of them.
+TASK_METRICS_ENABLED = env.bool('TASK_METRICS_ENABLED', default=True)
+
+# Phase timings in a `Server-Timing` header on every response. Requests slower than TASK_SLOW_REQUEST_MS are
+# sampled at TASK_SLOW_REQUEST_SAMPLE_RATE into a ring buffer of TASK_SLOW_REQUEST_BUFFER_SIZE traces with
+# their SQL and the `EXPLAIN (ANALYZE, BUFFERS)` of the TASK_SLOW_REQUEST_EXPLAIN_QUERIES slowest SELECTs.
+TASK_SERVER_TIMING_ENABLED = env.bool('TASK_SERVER_TIMING_ENABLED', default=True)
+TASK_SLOW_REQUEST_MS = env.float('TASK_SLOW_REQUEST_MS', default=500)
+TASK_SLOW_REQUEST_SAMPLE_RATE = env.float('TASK_SLOW_REQUEST_SAMPLE_RATE', default=0.1)
+TASK_SLOW_REQUEST_BUFFER_SIZE = env.int('TASK_SLOW_REQUEST_BUFFER_SIZE', default=100)
+TASK_SLOW_REQUEST_EXPLAIN_QUERIES = env.int('TASK_SLOW_REQUEST_EXPLAIN_QUERIES', default=3)
+
+# Work queue behind `/tasks/claim/`: a claim leases pending tasks to a worker for TASK_LEASE_SECONDS unless
+# it asks for another duration; expired leases can be claimed again. One claim takes at most TASK_CLAIM_MAX_TASKS.
+TASK_LEASE_SECONDS = env.int('TASK_LEASE_SECONDS', default=300)
+TASK_CLAIM_MAX_TASKS = env.int('TASK_CLAIM_MAX_TASKS', default=100)
+
+# Monthly partitions of `tasks_task` by `created_at` (`python manage.py manage_task_partitions`): partitions are
+# created TASK_PARTITION_PREMAKE_MONTHS ahead, and months older than TASK_PARTITION_RETENTION_MONTHS are
+# detached (0 keeps every month).
+TASK_PARTITION_PREMAKE_MONTHS = env.int('TASK_PARTITION_PREMAKE_MONTHS', default=3)
+TASK_PARTITION_RETENTION_MONTHS = env.int('TASK_PARTITION_RETENTION_MONTHS', default=0)
+
+# Archive (`python manage.py archive_tasks`): completed tasks not updated for TASK_ARCHIVE_AFTER_DAYS move to
+# `tasks_archivedtask` in transactions of TASK_ARCHIVE_BATCH_SIZE tasks.
+TASK_ARCHIVE_AFTER_DAYS = env.int('TASK_ARCHIVE_AFTER_DAYS', default=90)
+TASK_ARCHIVE_BATCH_SIZE = env.int('TASK_ARCHIVE_BATCH_SIZE', default=1000)
+
+# Soft delete: with TASK_SOFT_DELETE, deleting a task only sets its `deleted_at`. `python manage.py purge_tasks`
+# removes tasks soft-deleted more than TASK_PURGE_AFTER_DAYS ago, TASK_PURGE_BATCH_SIZE per transaction with
+# TASK_PURGE_PAUSE_SECONDS between transactions.
+TASK_SOFT_DELETE = env.bool('TASK_SOFT_DELETE', default=True)
+TASK_PURGE_AFTER_DAYS = env.int('TASK_PURGE_AFTER_DAYS', default=7)
+TASK_PURGE_BATCH_SIZE = env.int('TASK_PURGE_BATCH_SIZE', default=1000)
+TASK_PURGE_PAUSE_SECONDS = env.float('TASK_PURGE_PAUSE_SECONDS', default=0.1)
+
+# Due-date reminders (`python manage.py run_reminders`): `due_soon` when a pending task falls due within
+# TASK_REMINDER_LEAD_SECONDS, `overdue` once its due date passes. Each tick sends batches of up to
+# TASK_REMINDER_BATCH_SIZE to TASK_REMINDER_SINK: the audit log by default, or
+# `tasks.helpers.reminders.WebhookReminderSink`, which posts to TASK_REMINDER_WEBHOOK_URL.
+TASK_REMINDER_LEAD_SECONDS = env.int('TASK_REMINDER_LEAD_SECONDS', default=3600)
+TASK_REMINDER_BATCH_SIZE = env.int('TASK_REMINDER_BATCH_SIZE', default=500)
+TASK_REMINDER_INTERVAL = env.float('TASK_REMINDER_INTERVAL', default=60)
+TASK_REMINDER_SINK = env.str('TASK_REMINDER_SINK', default='tasks.helpers.reminders.LogReminderSink')
+TASK_REMINDER_WEBHOOK_URL = env.str('TASK_REMINDER_WEBHOOK_URL', default='')
+
+# Token bucket rate limiter behind the task endpoints and RatelimitMiddleware. `redis` shares buckets
+# between all workers and hosts; `local` shares them between the worker processes of one host through a
+# memory-mapped file. TASK_RATELIMIT_GLOBAL_RATE (e.g. `100/m`) adds a per-user/IP limit on every request.
+TASK_RATELIMIT_BACKEND = env.str('TASK_RATELIMIT_BACKEND', default='redis' if env.str('REDIS_URL', default='') else 'local')
+TASK_RATELIMIT_REDIS_URL = env.str('TASK_RATELIMIT_REDIS_URL', default=env.str('REDIS_URL', default=''))
+TASK_RATELIMIT_LOCAL_PATH = env.str('TASK_RATELIMIT_LOCAL_PATH', default=os.path.join(tempfile.gettempdir(), 'tasks-ratelimit.buckets'))
+TASK_RATELIMIT_GLOBAL_RATE = env.str('TASK_RATELIMIT_GLOBAL_RATE', default='') or None
 
 # Override cache setting for testing (use Redis)
 if 'test' in sys.argv or DEBUG:
@@ -19,10 +19,13 @@ from django.urls import include, path
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 from django.conf import settings
+from tasks.views import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("tasks/", include("tasks.urls")),
+    path("async/tasks/", include("tasks.async_urls")),
+    path("metrics", metrics, name="metrics"),
     path("", TemplateView.as_view(template_name="home.html"))
     ]
 
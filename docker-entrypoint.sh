@@ -3,6 +3,11 @@ set -x
 
 sleep 2
 
+# Per-process metric files of a previous run would otherwise be summed into /metrics.
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR" || exit 1
+fi
+
 python manage.py makemigrations || exit 1
 python manage.py migrate --noinput || exit 1
 
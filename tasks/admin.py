@@ -1,5 +1,12 @@
 from django.contrib import admin
 from .models import Task
+from tasks.helpers.pagination import TaskPaginator
 
-# Register your models here.
-admin.site.register(Task)
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    # Admin for tasks. The changelist pages through TaskPaginator, so large tables show the planner's
+    # estimate instead of running COUNT(*), and skips the extra unfiltered count Django adds by default.
+    list_display = ('title', 'status', 'priority', 'due_date', 'created_at')
+    list_filter = ('status',)
+    paginator = TaskPaginator
+    show_full_result_count = False
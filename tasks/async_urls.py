@@ -0,0 +1,8 @@
+from django.urls import path
+from .async_views import AsyncTaskDetailView, AsyncTaskListView
+
+# URL patterns for the async task endpoints, mounted at /async/tasks/ next to the DRF routes.
+urlpatterns = [
+    path('', AsyncTaskListView.as_view(), name='async-task-list'),
+    path('<int:pk>/', AsyncTaskDetailView.as_view(), name='async-task-detail'),
+]
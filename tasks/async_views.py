@@ -0,0 +1,171 @@
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from .models import ArchivedTask, Task, TaskWithArchived
+from .serializer import TaskSearchResultSerializer, TaskSerializer
+from tasks.helpers.archive import TaskArchive
+from tasks.helpers.deletion import TaskDeletion
+from tasks.helpers.filter import TaskFilter
+from tasks.helpers.logger import TaskLogger
+from tasks.helpers.metrics import TaskMetrics
+from tasks.helpers.pagination import TaskCursorPagination, TaskPagination
+from tasks.helpers.profiling import TaskProfiler
+from tasks.helpers.ratelimit import is_ratelimited
+from tasks.helpers.renderer import TaskJSONRenderer
+from tasks.helpers.replicas import TaskReplicas
+from tasks.helpers.rows import TaskRowSerializer
+from tasks.helpers.service import TaskQueryService
+from tasks.helpers.versioning import TaskVersion
+
+# Async counterparts of TaskViewSet's list/retrieve/create/update/delete, served under /async/tasks/.
+# They run on the event loop with Django's async ORM, so under ASGI (uvicorn) a request does not
+# occupy a thread while it waits on the database. Responses match the DRF endpoints.
+
+def render(data, status=200):
+    # Renders data the same way the DRF endpoints do.
+    return HttpResponse(TaskJSONRenderer().render(data), status=status, content_type='application/json')
+
+async def ratelimited(request, group, method):
+    # The check reads `request.user` and the bucket backend synchronously, so it runs in a thread.
+    return await sync_to_async(is_ratelimited)(request, group=group, key='user', rate='2/m', method=method, increment=True)
+
+def parse_body(request):
+    # Parses a JSON request body, returning (data, error response).
+    try:
+        return json.loads(request.body or b'{}'), None
+    except ValueError as error:
+        return None, render({'detail': f"JSON parse error - {error}"}, status=400)
+
+async def get_task(pk, archived=False):
+    # Fetches a task, returning (task, error response). With `archived`, falls back to the archive.
+    try:
+        return await Task.objects.aget(pk=pk), None
+    except (Task.DoesNotExist, ValueError):
+        task = await ArchivedTask.objects.filter(pk=pk).afirst() if archived else None
+        if task is not None:
+            return task, None
+        return None, render({'detail': 'No Task matches the given query.'}, status=404)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskListView(View):
+    # GET lists tasks with the same filters and pagination as /tasks/; POST creates a task.
+
+    async def get(self, request):
+        with TaskProfiler.phase('filter'):
+            model = TaskWithArchived if TaskArchive.requested(request.GET) else Task
+            filterset = TaskFilter(request.GET, queryset=model.objects.all(), request=request)
+            if not filterset.is_valid():
+                return render({name: list(errors) for name, errors in filterset.errors.items()}, status=400)
+
+            full_text = TaskQueryService.is_full_text_search(request.GET)
+            fields = TaskQueryService(None, None, filterset.form.cleaned_data).selected_fields()
+            serializer_class = TaskSearchResultSerializer if full_text else TaskSerializer
+            serializer = serializer_class(fields=fields)
+            # The same choice as TaskViewSet.list_rows: value tuples when every field maps onto a column
+            if settings.TASK_FAST_SERIALIZER_ENABLED and TaskRowSerializer.supports(serializer):
+                rows = TaskRowSerializer(serializer)
+                queryset = rows.values(filterset.qs)
+                serialize, kind = rows.to_representation, 'rows'
+            else:
+                queryset = filterset.qs
+                serialize, kind = (lambda tasks: serializer_class(tasks, many=True, fields=fields).data), 'model'
+        drf_request = Request(request)
+        pagination = TaskCursorPagination() if TaskCursorPagination.is_requested(drf_request) else TaskPagination()
+        try:
+            with TaskReplicas.reading(await sync_to_async(TaskReplicas.read_alias)(request)):
+                page = await pagination.apaginate_queryset(queryset, drf_request)
+        except APIException as error:
+            return render({'detail': str(error.detail)}, status=error.status_code)
+        with TaskMetrics.serializing(kind):
+            data = serialize(page)
+        return render(pagination.get_paginated_response(data).data)
+
+    async def post(self, request):
+        data, error = parse_body(request)
+        if error:
+            return error
+        serializer = TaskSerializer(data=data)
+        if not serializer.is_valid():
+            return render(serializer.errors, status=400)
+        task = await Task.objects.acreate(**serializer.validated_data)
+        return render(TaskSerializer(task).data, status=201)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskDetailView(View):
+    # GET retrieves, PUT/PATCH update and DELETE removes a task, with the same rate limits and audit
+    # logging as TaskViewSet.
+
+    async def get(self, request, pk):
+        with TaskReplicas.reading(await sync_to_async(TaskReplicas.read_alias)(request)):
+            task, error = await get_task(pk, archived=True)
+        if error:
+            return error
+        etag = TaskVersion.etag(task.version)
+        if TaskVersion.not_modified(request.headers.get('If-None-Match'), etag):
+            response = HttpResponse(status=304)
+        else:
+            response = render(TaskSerializer(task).data)
+        response['ETag'] = etag
+        return response
+
+    async def put(self, request, pk):
+        return await self.update(request, pk)
+
+    async def patch(self, request, pk):
+        if await ratelimited(request, 'update-task', 'PATCH'):
+            return render({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
+        # Same single conditional `UPDATE ... RETURNING` as TaskViewSet.partial_update.
+        data, error = parse_body(request)
+        if error:
+            return error
+        serializer = TaskSerializer(data=data, partial=True)
+        if not serializer.is_valid():
+            return render(serializer.errors, status=400)
+        versions = TaskVersion.parse_if_match(request.headers.get('If-Match'))
+        task = await sync_to_async(TaskVersion.update)(pk, serializer.validated_data, versions)
+        if task is None:
+            if versions is not None and await Task.objects.filter(pk=pk).aexists():
+                return render({'detail': 'The task has been modified since it was fetched.'}, status=412)
+            return render({'detail': 'No Task matches the given query.'}, status=404)
+        TaskLogger.log_task_update(task)  # Queued; the audit handler never blocks.
+        response = render(TaskSerializer(task).data)
+        response['ETag'] = TaskVersion.etag(task.version)
+        return response
+
+    async def update(self, request, pk):
+        task, error = await get_task(pk)
+        if error:
+            return error
+        TaskLogger.log_task_update(task)  # Queued; the audit handler never blocks.
+        data, error = parse_body(request)
+        if error:
+            return error
+        serializer = TaskSerializer(task, data=data)
+        if not serializer.is_valid():
+            return render(serializer.errors, status=400)
+        # `serializer.save()` would call the synchronous `Model.save()`; apply the data and save asynchronously.
+        for name, value in serializer.validated_data.items():
+            setattr(task, name, value)
+        await task.asave()
+        response = render(TaskSerializer(task).data)
+        response['ETag'] = TaskVersion.etag(task.version)
+        return response
+
+    async def delete(self, request, pk):
+        if await ratelimited(request, 'delete-task', 'DELETE'):
+            return render({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
+        task, error = await get_task(pk)
+        if error:
+            return error
+        TaskLogger.log_task_deletion(task)
+        await sync_to_async(TaskDeletion.delete)(Task.objects.filter(pk=task.pk))
+        return HttpResponse(status=204)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from tasks.helpers.cache import TaskCache
+
+# The response cache is only correct when every worker sees the same generation counter.
+@register(Tags.caches)
+def check_task_cache(app_configs, **kwargs):
+    if not settings.TASK_CACHE_ENABLED or TaskCache.is_shared():
+        return []
+    return [Error(
+        f"TASK_CACHE_ENABLED needs a cache shared by all workers, but the '{settings.TASK_CACHE_ALIAS}' cache is process-local.",
+        hint="Point TASK_CACHE_ALIAS at a Redis or Memcached cache (for example by setting REDIS_URL), or set TASK_CACHE_ENABLED=False.",
+        id='tasks.E001',
+    )]
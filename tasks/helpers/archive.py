@@ -0,0 +1,114 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.forms import NullBooleanSelect
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from tasks.helpers.cache import TaskCache
+from tasks.helpers.logger import TaskLogger
+from tasks.models import ArchivedTask, Checkpoint, TaskStatus
+
+class TaskArchive:
+    # Moves completed tasks that have not changed for TASK_ARCHIVE_AFTER_DAYS from `tasks_task` to
+    # `tasks_archivedtask`, and back on request. Archived tasks drop out of `/tasks/` (and of the delta
+    # feed, as deletions) but stay readable by ID; `?include_archived=true` lists them with the live ones
+    # through the `tasks_task_with_archived` view. The statistics keep counting them.
+    #
+    # A run works in batches of TASK_ARCHIVE_BATCH_SIZE tasks, each one transaction that deletes the batch
+    # from `tasks_task` and inserts it into the archive. Batches walk the (updated_at, id) index; the
+    # position after each batch is saved with it in the `tasks.archive` Checkpoint, so an interrupted run
+    # resumes where it stopped, and the next run after a finished one starts again from the oldest task.
+    checkpoint_name = 'tasks.archive'
+    # Advisory lock namespace held per task ID while a restore writes that ID back (see Task).
+    id_lock = 'tasks.task.id'
+
+    @staticmethod
+    def requested(query_params):
+        # Whether a listing asks for archived tasks too (`?include_archived=true`).
+        return NullBooleanSelect().value_from_datadict(query_params, None, 'include_archived') is True
+
+    @staticmethod
+    def lookup(pk):
+        # Returns the archived task with the ID, or None.
+        try:
+            return ArchivedTask.objects.filter(pk=pk).first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    @staticmethod
+    def columns():
+        # Columns the two tables share.
+        return [field.column for field in ArchivedTask._meta.concrete_fields if field.name != 'archived_at']
+
+    @classmethod
+    def archive(cls, days=None, batch_size=None, max_batches=None):
+        # Archives the completed tasks last updated more than `days` ago, at most `max_batches` batches
+        # (all of them by default), and returns how many were moved.
+        days = settings.TASK_ARCHIVE_AFTER_DAYS if days is None else days
+        batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+        cutoff = timezone.now() - timedelta(days=days)
+        columns = ', '.join(connection.ops.quote_name(column) for column in cls.columns())
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            with transaction.atomic():
+                # The row lock also keeps concurrent runs from sharing a position.
+                checkpoint, _ = Checkpoint.objects.select_for_update().get_or_create(name=cls.checkpoint_name)
+                position = checkpoint.state.get('position')
+                after, after_params = "", []
+                if position:
+                    after, after_params = "AND (updated_at, id) > (%s, %s)", [parse_datetime(position[0]), position[1]]
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"WITH batch AS ("
+                        f"SELECT id, created_at FROM tasks_task WHERE status = %s AND updated_at < %s AND deleted_at IS NULL {after}"
+                        f" ORDER BY updated_at, id LIMIT %s FOR UPDATE SKIP LOCKED"
+                        f"), moved AS ("
+                        f"DELETE FROM tasks_task USING batch"
+                        f" WHERE tasks_task.id = batch.id AND tasks_task.created_at = batch.created_at RETURNING tasks_task.*"
+                        f") INSERT INTO tasks_archivedtask ({columns}, archived_at) SELECT {columns}, now() FROM moved"
+                        f" RETURNING updated_at, id",
+                        [TaskStatus.COMPLETED.value, cutoff, *after_params, batch_size],
+                    )
+                    rows = cursor.fetchall()
+                if len(rows) < batch_size:
+                    checkpoint.state.pop('position', None)  # Finished
+                else:
+                    last = max(rows)
+                    checkpoint.state['position'] = [last[0].isoformat(), last[1]]
+                checkpoint.save(update_fields=['state', 'updated_at'])
+                if rows:
+                    TaskLogger.log_task_archival(sorted(pk for _, pk in rows))
+            archived += len(rows)
+            batches += 1
+            if len(rows) < batch_size:
+                break
+        if archived:
+            TaskCache.bump()
+        return archived
+
+    @classmethod
+    def restore(cls, ids):
+        # Moves archived tasks back to `tasks_task` and returns the IDs restored. Each comes back as a new
+        # version updated now, so ETags change, delta-sync clients receive it again and it is not archived
+        # again before TASK_ARCHIVE_AFTER_DAYS. The primary key of `tasks_task` does not keep IDs unique on
+        # its own (see Task), so under a per-ID advisory lock, a task whose ID a live task already has
+        # stays archived instead.
+        shared = cls.columns()
+        columns = ', '.join(connection.ops.quote_name(column) for column in shared)
+        restored_values = {'updated_at': 'now()', 'version': 'version + 1'}
+        values = ', '.join(restored_values.get(column, connection.ops.quote_name(column)) for column in shared)
+        ids = sorted(set(ids))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s), id) FROM unnest(%s::integer[]) AS id", [cls.id_lock, ids])
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM tasks_archivedtask archived WHERE id = ANY(%s)"
+                f" AND NOT EXISTS (SELECT FROM tasks_task WHERE tasks_task.id = archived.id) RETURNING {columns})"
+                f" INSERT INTO tasks_task ({columns}) SELECT {values} FROM moved RETURNING id",
+                [ids],
+            )
+            restored = sorted(pk for pk, in cursor.fetchall())
+        if restored:
+            TaskLogger.log_task_restore(restored)
+            TaskCache.bump()
+        return restored
@@ -0,0 +1,120 @@
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from tasks.helpers.cache import TaskCache
+from tasks.helpers.deletion import TaskDeletion
+from tasks.helpers.logger import TaskLogger
+from tasks.models import Task
+from tasks.serializer import TaskSerializer, TaskBulkDeleteSerializer
+
+class TaskBulkService:
+    # A service class for creating, updating and deleting many tasks in one request.
+    # Each batch is validated up front, written with a single bulk statement inside one transaction,
+    # and reported back item by item in the order it was submitted.
+    batch_size = 500
+
+    @staticmethod
+    def validate_items(items):
+        # Ensures the payload is a non-empty list of objects no larger than `TASK_BULK_MAX_ITEMS`.
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > settings.TASK_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [f"Ensure there are no more than {settings.TASK_BULK_MAX_ITEMS} items."]})
+        if not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'non_field_errors': ['Expected every item to be an object.']})
+
+    def create(self, items):
+        # Validates every item with TaskSerializer and inserts them all with one `bulk_create`.
+        # The batch is rejected as a whole when any item is invalid.
+        self.validate_items(items)
+        serializer = TaskSerializer(data=items, many=True)
+        if not serializer.is_valid():
+            return status.HTTP_400_BAD_REQUEST, {'errors': serializer.errors}
+
+        with transaction.atomic(), TaskCache.deferred():
+            tasks = Task.objects.bulk_create(
+                [Task(**data) for data in serializer.validated_data], batch_size=self.batch_size
+            )
+            TaskCache.bump()
+        TaskLogger.log_bulk_task_creation(tasks)
+
+        results = TaskSerializer(tasks, many=True).data
+        return status.HTTP_201_CREATED, {'results': [{'id': task['id'], 'status': status.HTTP_201_CREATED, 'data': task} for task in results]}
+
+    def update(self, items):
+        # Applies partial updates, each item carrying the `id` of the task it changes, with one
+        # `bulk_update`. Unknown IDs are reported per item; invalid data rejects the whole batch.
+        self.validate_items(items)
+        ids = [item.get('id') for item in items]
+        if not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in ids):
+            raise ValidationError({'id': ['Every item requires an integer id.']})
+        # Each item is one new version of its task, so an ID may only appear once per batch.
+        duplicates = sorted(task_id for task_id, count in Counter(ids).items() if count > 1)
+        if duplicates:
+            raise ValidationError({'id': [f"Duplicate ids: {', '.join(map(str, duplicates))}."]})
+
+        with transaction.atomic(), TaskCache.deferred():
+            # Rows are locked in ID order, so concurrent batches over the same tasks wait on each other
+            # instead of deadlocking.
+            instances = Task.objects.select_for_update().order_by('pk').in_bulk(ids)
+            serializers, errors = [], []
+            for item in items:
+                instance = instances.get(item['id'])
+                if instance is None:
+                    serializers.append(None)
+                    errors.append({})
+                    continue
+                data = {name: value for name, value in item.items() if name != 'id'}
+                serializer = TaskSerializer(instance, data=data, partial=True)
+                serializer.is_valid()
+                serializers.append(serializer)
+                errors.append(serializer.errors)
+            if any(errors):
+                return status.HTTP_400_BAD_REQUEST, {'errors': errors}
+
+            # `bulk_update` bypasses `save()`, so the auto-updated timestamp and the version are set by
+            # hand; the rows are locked, so incrementing the loaded versions is safe.
+            now = timezone.now()
+            fields = {'updated_at', 'version'}
+            updated = {}
+            for serializer in serializers:
+                if serializer is None:
+                    continue
+                task = serializer.instance
+                for name, value in serializer.validated_data.items():
+                    setattr(task, name, value)
+                    fields.add(name)
+                task.updated_at = now
+                task.version += 1
+                updated[task.id] = task
+            Task.objects.bulk_update(list(updated.values()), sorted(fields), batch_size=self.batch_size)
+            TaskCache.bump()
+        TaskLogger.log_bulk_task_update(list(updated.values()))
+
+        results = []
+        for task_id in ids:
+            if task_id in updated:
+                results.append({'id': task_id, 'status': status.HTTP_200_OK, 'data': TaskSerializer(updated[task_id]).data})
+            else:
+                results.append({'id': task_id, 'status': status.HTTP_404_NOT_FOUND})
+        return status.HTTP_200_OK, {'results': results}
+
+    def delete(self, data):
+        # Deletes the tasks listed in `ids` with a single statement through TaskDeletion.
+        serializer = TaskBulkDeleteSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        with transaction.atomic(), TaskCache.deferred():
+            tasks = list(Task.objects.select_for_update().filter(id__in=ids).only('id', 'title'))
+            TaskDeletion.delete(Task.objects.filter(id__in=[task.id for task in tasks]))
+        TaskLogger.log_bulk_task_deletion(tasks)
+
+        deleted = {task.id for task in tasks}
+        return status.HTTP_200_OK, {'results': [
+            {'id': task_id, 'status': status.HTTP_204_NO_CONTENT if task_id in deleted else status.HTTP_404_NOT_FOUND}
+            for task_id in ids
+        ]}
@@ -0,0 +1,131 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+from tasks.helpers.metrics import TaskMetrics
+from tasks.helpers.replicas import TaskReplicas
+
+# Set while bumps are being coalesced by `TaskCache.deferred()`.
+_deferred_bump = ContextVar('task_cache_deferred_bump', default=None)
+
+class TaskCache:
+    # Versioned response cache for the task list and retrieve endpoints.
+    # Every cache key embeds a table-wide generation number that each write to `tasks_task` bumps,
+    # so invalidation is a single INCR and superseded entries are never read again; they just expire.
+    # The generation lives in the `TASK_CACHE_ALIAS` cache, so that cache must be shared by every worker:
+    # with a per-process cache a write would only invalidate the worker that made it. Caching is
+    # therefore off (and the `tasks.E001` system check fails) unless the cache is shared.
+    generation_key = 'tasks:generation'
+    local_backends = (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.filebased.FileBasedCache',
+    )
+    key_prefix = 'tasks:response'
+
+    # Process-local hit/miss counters.
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def get_cache():
+        # Returns the cache backend used for task responses.
+        return caches[settings.TASK_CACHE_ALIAS]
+
+    @classmethod
+    def is_shared(cls):
+        # Whether the cache backend is shared between worker processes and hosts.
+        return settings.CACHES.get(settings.TASK_CACHE_ALIAS, {}).get('BACKEND') not in cls.local_backends
+
+    @classmethod
+    def generation(cls):
+        # Returns the current generation, initialising it on first use.
+        cache = cls.get_cache()
+        generation = cache.get(cls.generation_key)
+        if generation is None:
+            cache.add(cls.generation_key, 1, timeout=None)
+            generation = cache.get(cls.generation_key, 1)
+        return generation
+
+    @classmethod
+    def increment_generation(cls):
+        # Moves every task response to a new generation.
+        cache = cls.get_cache()
+        try:
+            cache.incr(cls.generation_key)
+        except ValueError:
+            # The counter was evicted or never created; any value newer than the old keys will do.
+            cache.add(cls.generation_key, 1, timeout=None)
+            cache.incr(cls.generation_key)
+
+    @classmethod
+    def bump(cls):
+        # Invalidates all cached task responses. The generation is bumped right away and again when the
+        # surrounding transaction commits, so an entry cached from a snapshot taken before the commit
+        # is discarded too. Outside a transaction the callback runs immediately.
+        deferred = _deferred_bump.get()
+        if deferred is not None:
+            deferred['pending'] = True
+            return
+        cls.increment_generation()
+        transaction.on_commit(cls.increment_generation)
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        # Coalesces every bump issued inside the block, such as one post_delete signal per deleted row,
+        # into a single bump when the block exits.
+        state = {'pending': False}
+        token = _deferred_bump.set(state)
+        try:
+            yield
+        finally:
+            _deferred_bump.reset(token)
+            if state['pending']:
+                cls.bump()
+
+    @classmethod
+    def make_key(cls, request, action, *parts):
+        # Builds the cache key from the generation, the action and the normalized query parameters.
+        # Parameter order does not matter. The host and renderer are included because pagination
+        # links and the response body depend on them.
+        params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+        fingerprint = repr((
+            request.get_host(), request.scheme, request.accepted_renderer.format, parts, params,
+        ))
+        digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+        return f"{cls.key_prefix}:{cls.generation()}:{action}:{digest}"
+
+    @classmethod
+    def respond(cls, request, action, build_response, *parts):
+        # Serves a cached response for the request, or builds, caches and returns a fresh one.
+        # The key, and so the generation, is read before the database is queried. A response read from
+        # a replica is served but not cached: the replica may not have replayed the writes that led to
+        # the current generation yet, and the stale entry would outlive its lag.
+        if not settings.TASK_CACHE_ENABLED or not cls.is_shared():
+            return build_response()
+
+        cache = cls.get_cache()
+        key = cls.make_key(request, action, *parts)
+        cached = cache.get(key)
+        if cached is not None:
+            cls.hits += 1
+            TaskMetrics.cache_requests.labels(action, 'hit').inc()
+            response = Response(cached)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        cls.misses += 1
+        TaskMetrics.cache_requests.labels(action, 'miss').inc()
+        response = build_response()
+        if response.status_code == 200 and TaskReplicas.current() is None:
+            cache.set(key, response.data, settings.TASK_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @classmethod
+    def stats(cls):
+        # Returns the hit/miss counters of this process together with the current generation.
+        return {'hits': cls.hits, 'misses': cls.misses, 'generation': cls.generation()}
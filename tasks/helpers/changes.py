@@ -0,0 +1,128 @@
+import json
+from datetime import timedelta
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from tasks.helpers.pagination import TaskCursorPagination, decode_cursor, encode_cursor
+from tasks.helpers.rows import TaskRowSerializer
+from tasks.models import Checkpoint, Task, TaskTombstone
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The cursor is older than the retained deletions; sync again from the start.'
+    default_code = 'cursor_expired'
+
+
+class TaskChangeFeed:
+    # Delta-sync feed behind `/tasks/changes/`. It keeps two keyset positions in one signed cursor:
+    # one over tasks in (change_xid, id) order and one over deletion tombstones in (change_xid, id)
+    # order. Each page seeks past both through their indexes, so a sync costs in proportion to what
+    # changed rather than to the size of the table.
+    #
+    # `change_xid` is the ID of the transaction that wrote the row, stamped by the database. Transactions
+    # commit in any order, so the feed only serves rows whose transaction is below the xmin of its
+    # snapshot: every such transaction has finished, and no row can appear later behind a position a
+    # client has already passed, however long the transaction ran or whatever timestamps it wrote.
+    cursor_salt = 'tasks.changes.cursor'
+    since_query_param = 'since'
+    checkpoint_name = 'tasks.changes.tombstones'
+
+    def __init__(self, serializer, request):
+        self.rows = TaskRowSerializer(serializer)
+        self.request = request
+        self.size = TaskCursorPagination().get_page_size(request)
+
+    def get_cursor(self):
+        # Returns the (task position, tombstone position) of the `since` cursor, or None for a full sync.
+        token = self.request.query_params.get(self.since_query_param)
+        if not token:
+            return None
+        cursor = decode_cursor(token, self.cursor_salt)
+        if isinstance(cursor, dict) and 't' in cursor:
+            raise CursorExpired()  # Issued by the earlier timestamp-ordered feed
+        try:
+            return tuple((int(cursor[key][0]), int(cursor[key][1])) for key in ('tx', 'dx'))
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ValidationError({self.since_query_param: ['Invalid cursor.']})
+
+    @staticmethod
+    def after(position):
+        # Keyset predicate "(change_xid, id) > position".
+        xid, pk = position
+        return Q(change_xid__gt=xid) | Q(change_xid=xid, id__gt=pk)
+
+    @classmethod
+    def horizons(cls):
+        # Returns the xmin of a fresh snapshot, below which every transaction has finished, and the last
+        # pruned tombstone position (or None), in one query.
+        connection = connections[router.db_for_read(Task)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint, "
+                f"(SELECT state->>'pruned_through' FROM {Checkpoint._meta.db_table} WHERE name = %s)",
+                [cls.checkpoint_name],
+            )
+            bound, pruned_through = cursor.fetchone()
+        return bound, tuple(json.loads(pruned_through)) if pruned_through else None
+
+    def page(self):
+        # Returns the next page: changed tasks, deleted task IDs, the cursor to continue from and
+        # whether more changes are already waiting.
+        bound, pruned_through = self.horizons()
+        cursor = self.get_cursor()
+        if cursor is None:
+            # A full sync starts from the first task; deletions before now concern no task it will receive.
+            task_position, tombstone_position = None, (bound, 0)
+        else:
+            task_position, tombstone_position = cursor
+            if pruned_through is not None and tombstone_position < pruned_through:
+                raise CursorExpired()
+
+        tasks = Task.objects.filter(change_xid__lt=bound).order_by('change_xid', 'id')
+        if task_position is not None:
+            tasks = tasks.filter(self.after(task_position))
+        tombstones = TaskTombstone.objects.filter(change_xid__lt=bound).order_by('change_xid', 'id')
+        tombstones = tombstones.filter(self.after(tombstone_position))
+
+        # Each read fetches a lookahead row to learn whether more changes are waiting, instead of counting.
+        changed = list(self.rows.values(tasks)[:self.size + 1])
+        deleted = list(tombstones.values_list('change_xid', 'id', 'task_id')[:self.size + 1])
+        has_more = len(changed) > self.size or len(deleted) > self.size
+        # A stream with no further rows below the bound resumes from the bound itself, so idle cursors
+        # keep up and do not expire.
+        if len(changed) > self.size:
+            changed = changed[:self.size]
+            task_position = (changed[-1].change_xid, changed[-1].id)
+        else:
+            task_position = (bound, 0)
+        if len(deleted) > self.size:
+            deleted = deleted[:self.size]
+            tombstone_position = deleted[-1][:2]
+        else:
+            tombstone_position = (bound, 0)
+
+        token = encode_cursor({'tx': list(task_position), 'dx': list(tombstone_position)}, self.cursor_salt)
+        return {
+            'changed': self.rows.to_representation(changed),
+            'deleted': [task_id for _, _, task_id in deleted],
+            'next': token,
+            'has_more': has_more,
+        }
+
+    @classmethod
+    def prune(cls, days):
+        # Deletes tombstones older than `days` and records the last position pruned, so cursors before
+        # it get 410.
+        horizon = timezone.now() - timedelta(days=days)
+        with transaction.atomic():
+            checkpoint, _ = Checkpoint.objects.select_for_update().get_or_create(name=cls.checkpoint_name)
+            expired = TaskTombstone.objects.filter(deleted_at__lt=horizon)
+            last = expired.order_by('-change_xid', '-id').values_list('change_xid', 'id').first()
+            deleted, _ = expired.delete()
+            if last is not None:
+                previous = checkpoint.state.get('pruned_through')
+                checkpoint.state['pruned_through'] = max(list(last), previous or list(last))
+                checkpoint.save(update_fields=['state', 'updated_at'])
+        return deleted
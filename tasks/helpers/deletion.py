@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+from tasks.helpers.cache import TaskCache
+from tasks.helpers.logger import TaskLogger
+from tasks.models import Task
+
+class TaskDeletion:
+    # Deletes tasks for the API. With TASK_SOFT_DELETE, a delete is one UPDATE that sets `deleted_at`:
+    # the default manager and the partial indexes of Task stop seeing the rows, and the triggers take them
+    # out of the statistics and write their tombstones, all in the request's transaction. The rows
+    # themselves stay until `purge()` removes them in small batches from a background command, so the
+    # row locks and dead tuples of a cleanup are spread out instead of landing on the requests.
+
+    @staticmethod
+    def delete(queryset):
+        # Deletes the tasks of a Task queryset and returns how many were deleted.
+        if not settings.TASK_SOFT_DELETE:
+            return queryset.delete()[1].get(Task._meta.label, 0)
+        # A soft delete is a new version, so `If-Match` on the old one fails.
+        deleted = queryset.update(deleted_at=Now(), version=F('version') + 1)
+        if deleted:
+            # The UPDATE sends no post_delete signal, so invalidate the response cache here.
+            TaskCache.bump()
+        return deleted
+
+    @staticmethod
+    def purge(days=None, batch_size=None, max_batches=None, pause=None):
+        # Removes the tasks soft-deleted more than `days` ago, `batch_size` rows per transaction from the
+        # head of the `deleted_at` index, sleeping `pause` seconds between batches so autovacuum and
+        # replicas keep up. Stops after `max_batches` batches (all of them by default) and returns how
+        # many tasks were removed.
+        days = settings.TASK_PURGE_AFTER_DAYS if days is None else days
+        batch_size = batch_size or settings.TASK_PURGE_BATCH_SIZE
+        pause = settings.TASK_PURGE_PAUSE_SECONDS if pause is None else pause
+        cutoff = timezone.now() - timedelta(days=days)
+        purged = batches = 0
+        while max_batches is None or batches < max_batches:
+            if batches and pause:
+                time.sleep(pause)
+            # Soft-deleted rows are neither counted nor tombstoned again (see migration 0015).
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "WITH batch AS ("
+                    "SELECT id, created_at FROM tasks_task WHERE deleted_at IS NOT NULL AND deleted_at < %s"
+                    " ORDER BY deleted_at, id LIMIT %s FOR UPDATE SKIP LOCKED"
+                    ") DELETE FROM tasks_task USING batch"
+                    " WHERE tasks_task.id = batch.id AND tasks_task.created_at = batch.created_at RETURNING tasks_task.id",
+                    [cutoff, batch_size],
+                )
+                ids = sorted(pk for pk, in cursor.fetchall())
+            if ids:
+                TaskLogger.log_task_purge(ids)
+            purged += len(ids)
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return purged
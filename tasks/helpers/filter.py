@@ -1,18 +1,49 @@
 import django_filters
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
 from tasks.models import Task
+from tasks.helpers.service import TaskQueryService
+from tasks.serializer import TaskSerializer
+
+class FieldListFilter(django_filters.BaseCSVFilter, django_filters.ChoiceFilter):
+    # Comma-separated list of task field names, each validated against the serializer's fields.
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('choices', lambda: [(name, name) for name in TaskSerializer.selectable_fields()])
+        super().__init__(*args, **kwargs)
 
 class TaskFilter(django_filters.FilterSet):
-    # A filter class for filtering Task objects based on specific criteria.
-    search_date = django_filters.DateFilter(field_name="created_at", lookup_expr='date', label="Created Date")
-    search = django_filters.CharFilter(field_name='title', lookup_expr='icontains', label="Title")
-    sort_by_date = django_filters.BooleanFilter(method='filter_sort_by_date', label="Sort by Date")
+    # A filter class declaring and validating the query parameters used to filter Task objects.
+    # The validated values are compiled into a single query by TaskQueryService, so each parameter
+    # is parsed once and turns into exactly one predicate or ordering.
+    search_date = django_filters.DateFilter(label="Created Date")
+    search = django_filters.CharFilter(label="Title")
+    search_threshold = django_filters.NumberFilter(min_value=0, max_value=1, label="Search Threshold")
+    search_mode = django_filters.ChoiceFilter(
+        choices=[('trigram', "Fuzzy title match"), ('fulltext', "Full-text title and description")], label="Search Mode"
+    )
+    sort_by_date = django_filters.BooleanFilter(label="Sort by Date")
+    # Picks the queryset (live tasks or TaskWithArchived) in the views, so it adds no predicate here.
+    include_archived = django_filters.BooleanFilter(label="Include Archived")
+    fields = FieldListFilter(label="Fields")
+    exclude = FieldListFilter(label="Exclude Fields")
 
     class Meta:
         model = Task
-        fields = ['search_date', 'search', 'sort_by_date']
+        fields = ['search_date', 'search', 'search_mode', 'search_threshold', 'sort_by_date', 'include_archived', 'fields', 'exclude']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The trigram index only finds matches at the session threshold, so a per-query threshold can
+        # only be stricter; a lower one is a 400 rather than silently ignored.
+        self.filters['search_threshold'].extra['min_value'] = settings.TASK_SEARCH_SIMILARITY_THRESHOLD
+
+    def filter_queryset(self, queryset):
+        # Hands the cleaned parameters to TaskQueryService instead of applying each filter separately.
+        return TaskQueryService(queryset, self.request, self.form.cleaned_data).apply_filters()
+
 
-    def filter_sort_by_date(self, queryset, name, value):
-        # Custom filter to sort tasks by their creation date.
-        if value:
-            return queryset.order_by('-created_at')
-        return queryset.order_by('created_at')
+class TaskFilterBackend(DjangoFilterBackend):
+    # DjangoFilterBackend insists on the queryset's model being the filterset's; TaskFilter also filters
+    # TaskWithArchived, which has the same fields as Task.
+    def get_filterset_class(self, view, queryset=None):
+        return getattr(view, 'filterset_class', None)
@@ -1,29 +1,223 @@
+import json
 import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
 
 # Setting up a logger for Django
 logger = logging.getLogger('django')
+# Task audit events go to their own logger, which LOGGING routes through AuditLogHandler.
+audit_logger = logging.getLogger('tasks.audit')
+
+
+class AuditJSONFormatter(logging.Formatter):
+    # Formats a record as one JSON object per line: time, level, event, message and the record's `audit` fields.
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'audit', None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class AuditLogHandler(logging.Handler):
+    # Non-blocking handler for audit records. `emit()` only puts the record on a bounded queue; a
+    # writer thread formats the records (so message formatting never runs on the request thread) and
+    # appends them to `filename` in batches of up to `batch_size` lines, one write and flush per batch.
+    # When the queue is full the record is dropped and counted rather than blocking the request, and
+    # the writer notes the drops in the file once it catches up. `close()`, which `logging.shutdown()`
+    # calls at exit, drains the queue before returning.
+    def __init__(self, filename, maxsize=10000, batch_size=500, flush_interval=0.5):
+        super().__init__()
+        self.filename = os.path.abspath(filename)
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = self.reported_drops = self.written = 0
+        self.stopping = threading.Event()
+        self.writer = None
+        self.writer_pid = None
+        self.setFormatter(AuditJSONFormatter())
+
+    def start(self):
+        # Starts the writer thread. Also called after a fork, since the parent's thread does not survive it.
+        with self.lock:
+            if self.writer_pid != os.getpid():
+                # A forked child gets a fresh queue: the inherited one holds the parent's records and locks.
+                self.queue = queue.Queue(self.queue.maxsize)
+                self.stopping.clear()
+                self.writer = threading.Thread(target=self.run, name='audit-log-writer', daemon=True)
+                self.writer_pid = os.getpid()
+                self.writer.start()
+
+    def emit(self, record):
+        if self.writer_pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def run(self):
+        # Writer loop: waits for a record, drains up to a batch behind it and writes them at once.
+        while not (self.stopping.is_set() and self.queue.empty()):
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def write(self, batch):
+        # Appends the formatted batch, plus a note of any records dropped since the last batch.
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        dropped = self.dropped - self.reported_drops
+        if dropped:
+            self.reported_drops += dropped
+            lines.append(json.dumps({
+                'time': datetime.now(timezone.utc).isoformat(), 'level': 'WARNING',
+                'event': 'audit.dropped', 'message': f"Dropped {dropped} audit records", 'count': dropped,
+            }))
+        if lines:
+            try:
+                with open(self.filename, 'a', encoding='utf-8') as stream:
+                    stream.write('\n'.join(lines) + '\n')
+            except OSError:
+                self.handleError(batch[0])
+                return
+            self.written += len(batch)
+
+    def stats(self):
+        # Returns the queue depth and the written/dropped counters of this process.
+        return {'queued': self.queue.qsize(), 'written': self.written, 'dropped': self.dropped}
+
+    def flush(self):
+        # Waits, within reason, for the records queued so far to be written.
+        if self.writer is not None and self.writer.is_alive() and self.writer_pid == os.getpid():
+            with self.queue.all_tasks_done:
+                self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout=10)
+
+    def close(self):
+        # Stops the writer after it has drained the queue.
+        if self.writer is not None and self.writer_pid == os.getpid():
+            self.stopping.set()
+            self.writer.join(timeout=10)
+        super().close()
+
 
 class TaskLogger:
    # A class for logging events related to tasks, such as creation, deletion, and updates.
+   # Events go to the `tasks.audit` logger with %-style arguments, so the message is only formatted by
+   # the audit writer thread, and carry structured `event`/`audit` fields for the JSON audit log.
     @staticmethod
     def log_task_deletion(task_instance):
         # Logs the event of a task being deleted, including the task title and ID.
-        logger.info(f"Deleting Task: {task_instance.title} (ID: {task_instance.id})")
+        audit_logger.info(
+            "Deleting Task: %s (ID: %s)", task_instance.title, task_instance.id,
+            extra={'event': 'task.delete', 'audit': {'task_ids': [task_instance.id]}},
+        )
 
     @staticmethod
     def log_task_update(task_instance):
         # Logs the event of a task being updated, including the task title and ID.
-        logger.info(f"Partial update for Task: {task_instance.title} (ID: {task_instance.id})")
+        audit_logger.info(
+            "Partial update for Task: %s (ID: %s)", task_instance.title, task_instance.id,
+            extra={'event': 'task.update', 'audit': {'task_ids': [task_instance.id]}},
+        )
     
+    @staticmethod
+    def log_bulk_task_creation(task_instances):
+        # Logs a batch of created tasks as a single event, including their IDs.
+        if audit_logger.isEnabledFor(logging.INFO):
+            ids = [task.id for task in task_instances]
+            audit_logger.info("Bulk creating %d Tasks (IDs: %s)", len(ids), ids, extra={'event': 'task.bulk_create', 'audit': {'task_ids': ids}})
+
+    @staticmethod
+    def log_bulk_task_deletion(task_instances):
+        # Logs a batch of task deletions as a single event, including the task titles and IDs.
+        if audit_logger.isEnabledFor(logging.INFO):
+            tasks = [(task.title, task.id) for task in task_instances]
+            audit_logger.info(
+                "Bulk deleting %d Tasks: %s", len(tasks), tasks,
+                extra={'event': 'task.bulk_delete', 'audit': {'task_ids': [task_id for _, task_id in tasks]}},
+            )
+
+    @staticmethod
+    def log_bulk_task_update(task_instances):
+        # Logs a batch of task updates as a single event, including the task titles and IDs.
+        if audit_logger.isEnabledFor(logging.INFO):
+            tasks = [(task.title, task.id) for task in task_instances]
+            audit_logger.info(
+                "Bulk update for %d Tasks: %s", len(tasks), tasks,
+                extra={'event': 'task.bulk_update', 'audit': {'task_ids': [task_id for _, task_id in tasks]}},
+            )
+
+    @staticmethod
+    def log_task_completion(worker, task_ids):
+        # Logs tasks a work-queue worker completed and released, including the worker and task IDs.
+        audit_logger.info(
+            "Worker %s completed %d Tasks (IDs: %s)", worker, len(task_ids), task_ids,
+            extra={'event': 'task.complete', 'audit': {'task_ids': task_ids, 'worker': worker}},
+        )
+
+    @staticmethod
+    def log_task_archival(task_ids):
+        # Logs a batch of completed tasks moved to the archive, including their IDs.
+        audit_logger.info(
+            "Archived %d Tasks (IDs: %s)", len(task_ids), task_ids,
+            extra={'event': 'task.archive', 'audit': {'task_ids': task_ids}},
+        )
+
+    @staticmethod
+    def log_task_purge(task_ids):
+        # Logs a batch of soft-deleted tasks removed for good, including their IDs.
+        audit_logger.info(
+            "Purged %d Tasks (IDs: %s)", len(task_ids), task_ids,
+            extra={'event': 'task.purge', 'audit': {'task_ids': task_ids}},
+        )
+
+    @staticmethod
+    def log_task_restore(task_ids):
+        # Logs archived tasks moved back to the live table, including their IDs.
+        audit_logger.info(
+            "Restored %d Tasks (IDs: %s)", len(task_ids), task_ids,
+            extra={'event': 'task.restore', 'audit': {'task_ids': task_ids}},
+        )
+
+    @staticmethod
+    def log_reminders(kind, reminders):
+        # Logs a batch of due-date reminders of one kind (`due_soon` or `overdue`), including the task IDs.
+        ids = [reminder['id'] for reminder in reminders]
+        audit_logger.info(
+            "Reminder %s for %d Tasks (IDs: %s)", kind, len(ids), ids,
+            extra={'event': f'task.{kind}', 'audit': {'task_ids': ids}},
+        )
+
     @staticmethod
     def log_task_search(search_title):
         # Logs the event of searching tasks by title, including the search term.
-        logger.info(f"Searching tasks by title: {search_title} with similarity filter")
+        audit_logger.info("Searching tasks by title: %s with similarity filter", search_title, extra={'event': 'task.search'})
 
     @staticmethod
     def log_sorting(sort_by_date):
         # Logs the event of sorting tasks by creation date, including the sort order.
         if sort_by_date == 'true':
-            logger.info(f"Sorting tasks by created_at in descending order")
+            audit_logger.info("Sorting tasks by created_at in descending order", extra={'event': 'task.sort'})
         elif sort_by_date == 'false':
-            logger.info(f"Sorting tasks by created_at in ascending order")
+            audit_logger.info("Sorting tasks by created_at in ascending order", extra={'event': 'task.sort'})
@@ -0,0 +1,92 @@
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from django.db import connections
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from tasks.helpers.profiling import TaskProfiler
+
+class TaskMetrics:
+    # Prometheus metrics of the task API, served at `/metrics`. MetricsMiddleware times every request
+    # and counts its SQL queries through a `connection.execute_wrapper` on each database alias; the
+    # response cache, the rate limiter and the list views record their own events. Recording is a
+    # few `perf_counter()` calls and in-memory increments per request.
+    #
+    # With PROMETHEUS_MULTIPROC_DIR set, prometheus_client keeps each worker process's values in
+    # memory-mapped files in that directory and `/metrics` sums them over all workers, so forked
+    # servers report one set of numbers whichever worker answers the scrape.
+    content_type = CONTENT_TYPE_LATEST
+
+    request_latency = Histogram(
+        'tasks_http_request_duration_seconds', "Time to build the response, by route.", ['method', 'route', 'status'],
+    )
+    request_queries = Histogram(
+        'tasks_db_queries_per_request', "SQL queries run by one request, by route.", ['route'],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    )
+    request_query_time = Histogram(
+        'tasks_db_query_duration_seconds_per_request', "Total SQL time of one request, by route.", ['route'],
+    )
+    cache_requests = Counter('tasks_cache_requests_total', "Task response cache lookups.", ['action', 'result'])
+    ratelimit_rejections = Counter('tasks_ratelimit_rejections_total', "Requests refused by a rate limit.", ['group'])
+    serializer_time = Histogram(
+        'tasks_serializer_duration_seconds', "Time to serialize one list page.", ['serializer'],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    )
+
+    # Queries kept per request for slow-request traces; later ones are only counted.
+    logged_queries = 100
+
+    @classmethod
+    @contextmanager
+    def tracking_queries(cls):
+        # Counts and times the SQL queries run on any database inside the block, and keeps the first
+        # `logged_queries` as (alias, sql, params, seconds).
+        stats = {'count': 0, 'seconds': 0.0, 'log': []}
+
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                seconds = time.perf_counter() - started
+                stats['count'] += 1
+                stats['seconds'] += seconds
+                if len(stats['log']) < cls.logged_queries:
+                    stats['log'].append((context['connection'].alias, sql, params, seconds))
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            yield stats
+
+    @classmethod
+    def observe_request(cls, request, response, seconds, queries):
+        # Records a finished request under its URL name (e.g. `task-list`), so IDs in paths do not
+        # multiply the series.
+        match = request.resolver_match
+        route = (match.view_name if match else None) or 'unmatched'
+        cls.request_latency.labels(request.method, route, str(response.status_code)).observe(seconds)
+        cls.request_queries.labels(route).observe(queries['count'])
+        cls.request_query_time.labels(route).observe(queries['seconds'])
+
+    @classmethod
+    @contextmanager
+    def serializing(cls, serializer):
+        # Times the serialization inside the block, also as the request's `serialize` phase.
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            cls.serializer_time.labels(serializer).observe(seconds)
+            TaskProfiler.add('serialize', seconds)
+
+    @staticmethod
+    def export():
+        # Returns the metrics in the Prometheus text format, summed over all worker processes in
+        # multiprocess mode.
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(REGISTRY)
@@ -1,7 +1,348 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from tasks.helpers.profiling import TaskProfiler
+
+class TaskCounter:
+    # Counting strategy for task querysets. Counts are exact while the planner expects fewer than
+    # `TASK_COUNT_ESTIMATE_THRESHOLD` rows, which covers small tables and selective filters. Above it the
+    # planner's estimate is returned instead of running `COUNT(*)` over the whole match.
+
+    @classmethod
+    def count(cls, queryset):
+        # Returns (count, approximate), timed as the request's `count` phase.
+        with TaskProfiler.phase('count'):
+            threshold = settings.TASK_COUNT_ESTIMATE_THRESHOLD
+            if threshold:
+                estimate = cls.estimate(queryset)
+                if estimate is not None and estimate >= threshold:
+                    return estimate, True
+            return queryset.count(), False
+
+    @classmethod
+    async def acount(cls, queryset):
+        # Async variant of `count()`. Django has no async cursor for the estimate queries, so this runs
+        # in the ORM's database thread, the same way `QuerySet.acount()` does.
+        return await sync_to_async(cls.count)(queryset)
+
+    @staticmethod
+    def estimate(queryset):
+        # Returns the planner's row estimate for the queryset, or None when no estimate is available.
+        # Unfiltered querysets read `pg_class.reltuples` scaled to the table's current size, the same
+        # arithmetic the planner does, summed over the partitions of a partitioned table (empty ones
+        # count as 0); views and anything filtered use the top row estimate of `EXPLAIN`. The default
+        # manager's own filter counts as unfiltered, so soft-deleted tasks awaiting purge are included.
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        query = queryset.query
+        unfiltered = query.where == queryset.model._default_manager.all().query.where
+        with connection.cursor() as cursor:
+            if unfiltered and not query.is_sliced and not query.distinct and not query.combinator:
+                cursor.execute(
+                    "SELECT CASE WHEN bool_or(relkind <> 'r' OR (reltuples < 0 OR relpages = 0) AND pg_relation_size(oid) > 0) THEN NULL ELSE "
+                    "COALESCE(sum(reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int)) "
+                    "FILTER (WHERE reltuples >= 0 AND relpages > 0), 0)::bigint END "
+                    "FROM pg_class WHERE oid IN (SELECT relid FROM pg_partition_tree(%s::regclass) WHERE isleaf)",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                if row and row[0] is not None:
+                    return row[0]
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class TaskPage(Page):
+    # A page whose `has_next()` comes from fetching one extra row rather than from the total count.
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class TaskPaginator(Paginator):
+    # Paginator counting through TaskCounter. With an estimated count the last page is not known, so
+    # any page number is accepted, the next link comes from a one-row lookahead and a page past the
+    # end is reported as empty.
+
+    @cached_property
+    def counted(self):
+        return TaskCounter.count(self.object_list)
+
+    @property
+    def count(self):
+        return self.counted[0]
+
+    @property
+    def is_approximate(self):
+        return self.counted[1]
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.is_approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if not self.is_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return TaskPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
 
 class TaskPagination(PageNumberPagination):
     # Custom pagination class for tasks, allowing pagination of tasks by page size.
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+    django_paginator_class = TaskPaginator
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Async variant of `paginate_queryset()` for views on the async ORM: the count and the page
+        # rows are read with async queries, the page bookkeeping is TaskPaginator's.
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.counted = await TaskCounter.acount(queryset)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        rows = [row async for row in queryset[bottom:top + 1]]
+        if not rows and number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=paginator.error_messages["no_results"]))
+        self.page = TaskPage(rows[:paginator.per_page], number, paginator, has_more=len(rows) > paginator.per_page)
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        # `count_is_approximate` tells clients when `count` is a planner estimate.
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_approximate': self.page.paginator.is_approximate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {'type': 'boolean', 'example': False}
+        return response_schema
+
+
+def encode_cursor(payload, salt):
+    # Signs and compresses a cursor payload into an opaque, URL-safe token.
+    return signing.dumps(payload, salt=salt, compress=True)
+
+
+def decode_cursor(token, salt):
+    # Verifies a token produced by `encode_cursor`, returning None when it was tampered with.
+    try:
+        return signing.loads(token, salt=salt)
+    except signing.BadSignature:
+        return None
+
+
+class TaskCursorPagination(BasePagination):
+    # Keyset pagination for tasks. Each page is addressed by the sort key of its boundary row, so the
+    # database seeks straight to the next page through the ordering index instead of running
+    # `COUNT(*)` and scanning past an `OFFSET`. Deep pages cost the same as the first one.
+    page_size = TaskPagination.page_size
+    page_size_query_param = TaskPagination.page_size_query_param
+    max_page_size = TaskPagination.max_page_size
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_salt = 'tasks.pagination.cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        # Keyset mode is opted into with `?pagination=cursor` and stays on for any request carrying a cursor.
+        query_params = request.query_params
+        return query_params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in query_params
+
+    def get_page_size(self, request):
+        # Reads the requested page size, clamped to `max_page_size`.
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        # Returns the queryset's effective ordering as (name, descending) pairs. This follows whatever
+        # `TaskQueryService` picked (date sort or trigram rank) and falls back to `Task.Meta.ordering`.
+        # `id` is appended as a tie-breaker so every row has a unique, stable position.
+        query = queryset.query
+        ordering = list(query.order_by)
+        if not ordering and query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+
+        keys = []
+        for item in ordering:
+            if isinstance(item, str):
+                name, descending = item.lstrip('-'), item.startswith('-')
+            elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+                name, descending = item.expression.name, item.descending
+            else:
+                raise ValueError(f"Cannot paginate by ordering expression {item!r}")
+            keys.append(('id' if name == 'pk' else name, descending))
+            if keys[-1][0] == 'id':
+                break
+
+        if not keys or keys[-1][0] != 'id':
+            keys.append(('id', keys[-1][1] if keys else True))
+        return keys
+
+    def get_cursor(self, request):
+        # Decodes the cursor from the request, if any. Tampered cursors and cursors minted for a
+        # different ordering are rejected rather than silently producing a wrong page.
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        cursor = decode_cursor(token, self.cursor_salt)
+        if not isinstance(cursor, dict) or cursor.get('k') != self.ordering_signature():
+            raise NotFound(self.invalid_cursor_message)
+        values = cursor.get('v')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            cursor['v'] = [self.to_python(name, value) for (name, _), value in zip(self.ordering, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def ordering_signature(self):
+        # A compact description of the ordering, embedded in cursors so they only replay against it.
+        return [('-' if descending else '') + name for name, descending in self.ordering]
+
+    def to_python(self, name, value):
+        # Converts a JSON cursor value back into the type the ordering column compares against.
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value  # Annotations such as the trigram `similarity` rank are plain numbers.
+        return field.to_python(value)
+
+    def build_seek(self, values, reverse):
+        # Builds the keyset predicate "strictly after (or before, when reversed) this row" as
+        # `k1 >= v1 AND (k1 > v1 OR (k1 = v1 AND k2 > v2 ...))`. The leading bound lets Postgres turn
+        # the first key into an index range condition instead of filtering the whole table.
+        def lookup(descending, strict):
+            after = descending == reverse
+            return ('gt' if after else 'lt') + ('' if strict else 'e')
+
+        (name, descending), value = self.ordering[-1], values[-1]
+        condition = Q(**{f'{name}__{lookup(descending, True)}': value})
+        for (name, descending), value in zip(reversed(self.ordering[:-1]), reversed(values[:-1])):
+            condition = Q(**{f'{name}__{lookup(descending, True)}': value}) | (Q(**{name: value}) & condition)
+
+        name, descending = self.ordering[0]
+        return Q(**{f'{name}__{lookup(descending, False)}': values[0]}) & condition
+
+    def seek(self, queryset, request):
+        # Orders the queryset by the keyset and positions it after the request's cursor.
+        self.request = request
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        self.size = self.get_page_size(request)
+        self.cursor = self.get_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor.get('r'))
+
+        queryset = queryset.order_by(*[
+            ('-' if descending != self.reverse else '') + name for name, descending in self.ordering
+        ])
+        if self.cursor:
+            queryset = queryset.filter(self.build_seek(self.cursor['v'], self.reverse))
+        # Fetch one extra row to learn whether another page exists, without counting.
+        return queryset[:self.size + 1]
+
+    def paginate_rows(self, rows):
+        # Trims the lookahead row and records the boundary rows the links are built from.
+        has_more = len(rows) > self.size
+        rows = rows[:self.size]
+        if self.reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.cursor is not None
+
+        self.next_row = rows[-1] if rows and has_next else None
+        self.previous_row = rows[0] if rows and has_previous else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.seek(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Async variant for views on the async ORM.
+        return self.paginate_rows([row async for row in self.seek(queryset, request)])
+
+    def position_of(self, row):
+        # Extracts the ordering values of a row in their JSON-safe form.
+        values = []
+        for name, _ in self.ordering:
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def get_link(self, row, reverse):
+        # Builds the URL for the page after (or before, when reversed) the given boundary row.
+        if row is None:
+            return None
+        token = encode_cursor({'k': self.ordering_signature(), 'v': self.position_of(row), 'r': reverse}, self.cursor_salt)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_next_link(self):
+        return self.get_link(self.next_row, reverse=False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_row, reverse=True)
+
+    def get_paginated_response(self, data):
+        # Cursor pages carry no total count; that is the query this mode exists to avoid.
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,151 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from tasks.helpers.cache import TaskCache
+from tasks.models import Task
+
+class TaskPartitions:
+    # Monthly range partitions of `tasks_task` on `created_at` (see migration 0013). Each UTC month is a
+    # partition named `tasks_task_pYYYYMM`; rows outside every month land in `tasks_task_default`. Queries
+    # that bound `created_at`, such as `search_date`, are pruned to the months they cover, and vacuum and
+    # index maintenance work on one month at a time.
+    #
+    # `ensure()` creates the partitions of the coming months ahead of time, moving any rows the default
+    # partition holds for them. `retire()` detaches (or drops) the months past the retention period.
+    # Indexes of each partition are named `<partition>_<index on tasks_task>`, so query plans keep
+    # naming the model's indexes.
+    #
+    # On databases that had tasks before partitioning, the original table is the partition
+    # `tasks_task_history`, covering everything before the first monthly partition. It has no start, is
+    # skipped by `ensure()` and is retired as a whole once its end passes the retention period.
+    table = Task._meta.db_table
+    default = f'{table}_default'
+    history = f'{table}_history'
+    bounds_re = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \('([^']+)'\)")
+
+    @staticmethod
+    def month(moment, offset=0):
+        # Start of the UTC month `offset` months after the one containing `moment`.
+        moment = moment.astimezone(dt_timezone.utc)
+        index = moment.year * 12 + moment.month - 1 + offset
+        return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+    @classmethod
+    def name(cls, month):
+        return f"{cls.table}_p{month:%Y%m}"
+
+    @staticmethod
+    def columns():
+        # Stored columns, in the form INSERT ... SELECT can copy between partitions.
+        return ", ".join(connection.ops.quote_name(field.column) for field in Task._meta.local_fields if not field.generated)
+
+    @classmethod
+    def partitions(cls):
+        # Returns the range partitions as (name, start, end), oldest first. The start of the history
+        # partition is None.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+                [cls.table],
+            )
+            rows = cursor.fetchall()
+        partitions = []
+        for name, bound in rows:
+            match = cls.bounds_re.search(bound)
+            if match:
+                partitions.append((name, match[1] and parse_datetime(match[1]), parse_datetime(match[2])))
+        return sorted(partitions, key=lambda partition: partition[2])
+
+    @classmethod
+    def create(cls, month):
+        # Creates the partition of one month as a separate table, moves the month's rows out of the
+        # default partition into it and attaches it. Attaching only takes a SHARE UPDATE EXCLUSIVE lock on
+        # `tasks_task`, so reads and writes carry on; the default partition is locked while its rows move.
+        name, end = cls.name(month), cls.month(month, 1)
+        columns = cls.columns()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {cls.default} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"CREATE TABLE {name} (LIKE {cls.table} INCLUDING CONSTRAINTS INCLUDING GENERATED)")
+            # Statement triggers on `tasks_task` do not fire for statements on a partition, so the move
+            # changes neither the statistics nor the tombstones.
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {cls.default} WHERE created_at >= %s AND created_at < %s RETURNING {columns}) "
+                f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved",
+                [month, end],
+            )
+            cursor.execute(f"ALTER TABLE {cls.table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [month, end])
+            cls.name_indexes(cursor)
+        return name
+
+    @classmethod
+    def name_indexes(cls, cursor):
+        # Renames the indexes Postgres created on partitions to `<partition>_<index on tasks_task>`.
+        cursor.execute(
+            "SELECT child.relname, format('%%s_%%s', partition.relname, parent.relname) FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_index child_index ON child_index.indexrelid = child.oid "
+            "JOIN pg_index parent_index ON parent_index.indexrelid = parent.oid "
+            "JOIN pg_class partition ON partition.oid = child_index.indrelid "
+            "WHERE parent_index.indrelid = %s::regclass",
+            [cls.table],
+        )
+        for current, wanted in cursor.fetchall():
+            if current != wanted:
+                cursor.execute(f"ALTER INDEX {current} RENAME TO {wanted}")
+
+    @classmethod
+    def ensure(cls, months_ahead=None, now=None):
+        # Creates the partitions of the current month and the next `months_ahead` months that no
+        # partition covers yet, and returns their names.
+        months_ahead = settings.TASK_PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+        now = now or timezone.now()
+        existing = cls.partitions()
+        created = []
+        for offset in range(months_ahead + 1):
+            month = cls.month(now, offset)
+            if not any((start is None or start <= month) and month < end for _, start, end in existing):
+                created.append(cls.create(month))
+        return created
+
+    @classmethod
+    def retire(cls, retain_months=None, drop=False, now=None):
+        # Detaches the partitions that ended more than `retain_months` (> 0) months before the current one,
+        # leaving each as a standalone table for archiving, or drops them with `drop`. Their tasks leave
+        # the API like deleted ones: the statistics are decremented and tombstones written for
+        # `/tasks/changes/` (soft-deleted tasks already had both), in the same transaction. Returns the
+        # names of the retired partitions.
+        retain_months = settings.TASK_PARTITION_RETENTION_MONTHS if retain_months is None else retain_months
+        if not retain_months:
+            return []  # Keep every month
+        cutoff = cls.month(now or timezone.now(), -retain_months)
+        retired = []
+        for name, _, end in cls.partitions():
+            if end > cutoff:
+                continue
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {name} IN SHARE MODE")
+                cursor.execute(
+                    "INSERT INTO tasks_taskstat (status, priority, slot, count) "
+                    f"SELECT status, priority, 0, -count(*) FROM {name} WHERE deleted_at IS NULL GROUP BY 1, 2 ORDER BY 1, 2 "
+                    "ON CONFLICT (status, priority, slot) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count"
+                )
+                cursor.execute(
+                    "INSERT INTO tasks_taskduestat (due_date, slot, count) "
+                    f"SELECT (due_date AT TIME ZONE 'UTC')::date, 0, -count(*) FROM {name} "
+                    "WHERE deleted_at IS NULL AND status = 'Pending' AND due_date IS NOT NULL GROUP BY 1 ORDER BY 1 "
+                    "ON CONFLICT (due_date, slot) DO UPDATE SET count = tasks_taskduestat.count + EXCLUDED.count"
+                )
+                cursor.execute(f"INSERT INTO tasks_tasktombstone (task_id, deleted_at) SELECT id, clock_timestamp() FROM {name} WHERE deleted_at IS NULL")
+                cursor.execute(f"ALTER TABLE {cls.table} DETACH PARTITION {name}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {name}")
+                else:
+                    cursor.execute(f"ALTER TABLE {name} ALTER COLUMN id DROP DEFAULT")  # Off the tasks_task sequence
+            retired.append(name)
+        if retired:
+            TaskCache.bump()
+        return retired
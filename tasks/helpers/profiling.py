@@ -0,0 +1,157 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import partial
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections, transaction
+from tasks.helpers.logger import logger
+
+# Phase durations (seconds) of the current request, set by `TaskProfiler.profiling()`.
+_timings = ContextVar('task_profiler_timings', default=None)
+
+class TaskProfiler:
+    # Per-request phase timing and slow-request traces.
+    #
+    # Code on the request path wraps its phases in `phase(name)`: `filter` (building the filtered
+    # queryset), `count` (the pagination count), `serialize` and `render`. MetricsMiddleware adds the
+    # total SQL time as `db` and the whole request as `total`, and returns them all as a
+    # `Server-Timing` header that browser devtools display. The phases overlap: `count` is also `db`.
+    #
+    # Requests slower than TASK_SLOW_REQUEST_MS are sampled at TASK_SLOW_REQUEST_SAMPLE_RATE into a ring
+    # buffer of TASK_SLOW_REQUEST_BUFFER_SIZE traces with their SQL, parameters and, for the slowest
+    # SELECTs, `EXPLAIN (ANALYZE, BUFFERS)` run after the response is sent. The buffer lives in the
+    # `TASK_CACHE_ALIAS` cache, so with Redis it is shared by all workers.
+    phases = ('filter', 'count', 'db', 'serialize', 'render', 'total')
+    buffer_prefix = 'tasks:slow-requests'
+
+    @staticmethod
+    @contextmanager
+    def profiling():
+        # Collects the phase timings of the request handled inside the block.
+        timings = {}
+        token = _timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _timings.reset(token)
+
+    @staticmethod
+    def add(name, seconds):
+        # Adds time to a phase of the current request, if one is being profiled.
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name):
+        # Times the block as (part of) a phase of the current request.
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add(name, time.perf_counter() - started)
+
+    @classmethod
+    def server_timing(cls, timings, queries):
+        # Formats the `Server-Timing` header value, in milliseconds.
+        entries = []
+        for name in cls.phases:
+            if name in timings:
+                entry = f"{name};dur={timings[name] * 1000:.2f}"
+                if name == 'db':
+                    entry += f';desc="{queries["count"]} queries"'
+                entries.append(entry)
+        return ', '.join(entries)
+
+    @classmethod
+    def finish(cls, request, response, seconds, timings, queries):
+        # Sets the `Server-Timing` header and returns whether the request should be traced.
+        timings.update(db=queries['seconds'], total=seconds)
+        response['Server-Timing'] = cls.server_timing(timings, queries)
+        return seconds * 1000 >= settings.TASK_SLOW_REQUEST_MS and random.random() < settings.TASK_SLOW_REQUEST_SAMPLE_RATE
+
+    @staticmethod
+    def explain(alias, sql, params):
+        # Returns the `EXPLAIN (ANALYZE, BUFFERS)` text of a SELECT. ANALYZE runs the query again, so it
+        # runs in a transaction that is rolled back, and any row locks it takes are released at once.
+        try:
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+                    plan = '\n'.join(row[0] for row in cursor.fetchall())
+                transaction.set_rollback(True, using=alias)
+            return plan
+        except DatabaseError as error:
+            return f"EXPLAIN failed: {error}"
+
+    @staticmethod
+    def param(value):
+        # JSON-safe, bounded form of a query parameter.
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        text = value if isinstance(value, str) else repr(value)
+        return text if len(text) <= 200 else text[:200] + '…'
+
+    @classmethod
+    def record(cls, request, response, seconds, timings, queries):
+        # Saves a trace of a slow request to the ring buffer. The slowest SELECTs are explained once the
+        # response has been sent (when the server closes it), so the client never waits on the plans;
+        # until then their `explain` is None.
+        selects = [query for query in queries['log'] if query[1].lstrip()[:6].upper() == 'SELECT']
+        explained = sorted(selects, key=lambda query: query[3], reverse=True)[:settings.TASK_SLOW_REQUEST_EXPLAIN_QUERIES]
+        statements, pending = [], []
+        for index, query in enumerate(queries['log']):
+            alias, sql, params, duration = query
+            statements.append({
+                'alias': alias,
+                'sql': sql,
+                'params': [cls.param(value) for value in params or ()],
+                'duration_ms': round(duration * 1000, 2),
+                'explain': None,
+            })
+            if query in explained:
+                pending.append((index, alias, sql, params))
+        trace = {
+            'id': uuid.uuid4().hex,
+            'time': datetime.now(timezone.utc).isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(seconds * 1000, 2),
+            'timings_ms': {name: round(value * 1000, 2) for name, value in timings.items()},
+            'query_count': queries['count'],
+            'queries': statements,
+        }
+        cache = caches[settings.TASK_CACHE_ALIAS]
+        try:
+            slot = cache.incr(f"{cls.buffer_prefix}:next")
+        except ValueError:
+            cache.add(f"{cls.buffer_prefix}:next", 0, timeout=None)
+            slot = cache.incr(f"{cls.buffer_prefix}:next")
+        key = f"{cls.buffer_prefix}:{slot % settings.TASK_SLOW_REQUEST_BUFFER_SIZE}"
+        cache.set(key, trace, timeout=None)
+        if pending:
+            response._resource_closers.append(partial(cls.explain_trace, key, trace, pending))
+        logger.warning("Slow request %s %s took %.0f ms (trace %s)", request.method, request.path, seconds * 1000, trace['id'])
+
+    @classmethod
+    def explain_trace(cls, key, trace, pending):
+        # Adds the plans of the pending SELECTs to a buffered trace, unless newer traces replaced it.
+        for index, alias, sql, params in pending:
+            trace['queries'][index]['explain'] = cls.explain(alias, sql, params)
+        cache = caches[settings.TASK_CACHE_ALIAS]
+        current = cache.get(key)
+        if current is not None and current['id'] == trace['id']:
+            cache.set(key, trace, timeout=None)
+
+    @classmethod
+    def traces(cls):
+        # Returns the buffered traces, newest first.
+        cache = caches[settings.TASK_CACHE_ALIAS]
+        keys = [f"{cls.buffer_prefix}:{slot}" for slot in range(settings.TASK_SLOW_REQUEST_BUFFER_SIZE)]
+        return sorted(cache.get_many(keys).values(), key=lambda trace: trace['time'], reverse=True)
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+from tasks.helpers.cache import TaskCache
+from tasks.helpers.logger import TaskLogger
+from tasks.models import Task, TaskStatus
+
+class TaskQueue:
+    # Work queue over pending tasks for a pool of workers. A claim leases the next tasks in queue order
+    # (highest priority first, then earliest due date, tasks without one last) to a worker until the lease
+    # expires; the worker renews it with heartbeats while it works and releases the tasks when done.
+    #
+    # Each call is one statement. A claim picks its candidates with `FOR UPDATE SKIP LOCKED`, so
+    # concurrent claims step over each other's rows instead of waiting on them or taking the same task,
+    # and workers only contend for the rows they actually lease. Lease times come from the database
+    # clock, so workers and app servers need not agree on the time. The lease columns are not task
+    # content: claims and heartbeats leave `version`, `updated_at` and the response cache alone.
+
+    def __init__(self, worker, lease_seconds=None):
+        self.worker = worker
+        self.lease_seconds = lease_seconds or settings.TASK_LEASE_SECONDS
+        self.connection = connections[router.db_for_write(Task)]
+
+    def column(self, name):
+        # Quoted column name of a Task field.
+        return self.connection.ops.quote_name(Task._meta.get_field(name).column)
+
+    def execute(self, sql, params):
+        # Runs one statement and returns every row.
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def claim(self, limit=1):
+        # Leases up to `limit` claimable tasks (pending, with no lease or an expired one) to the worker:
+        #   WITH candidates AS (SELECT id ... ORDER BY priority DESC, due_date, id LIMIT n FOR UPDATE SKIP LOCKED)
+        #   UPDATE tasks_task SET claimed_by = %s, lease_expires_at = now() + lease ... RETURNING <all columns>
+        # Returns the leased tasks in queue order; an empty list when nothing is claimable.
+        table = self.connection.ops.quote_name(Task._meta.db_table)
+        pk, claimed_by, lease_expires_at = self.column('id'), self.column('claimed_by'), self.column('lease_expires_at')
+        fields = [field for field in Task._meta.concrete_fields if not field.generated]
+        returning = ', '.join(f"{table}.{self.column(field.name)}" for field in fields)
+        order = f"{self.column('priority')} DESC, {self.column('due_date')}, {pk}"
+        rows = self.execute(
+            f"WITH candidates AS ("
+            f"SELECT {pk} FROM {table} WHERE {self.column('status')} = %s AND {self.column('deleted_at')} IS NULL"
+            f" AND ({lease_expires_at} IS NULL OR {lease_expires_at} < now())"
+            f" ORDER BY {order} LIMIT %s FOR UPDATE SKIP LOCKED"
+            f"), claimed AS ("
+            f"UPDATE {table} SET {claimed_by} = %s, {lease_expires_at} = now() + %s * interval '1 second'"
+            f" FROM candidates WHERE {table}.{pk} = candidates.{pk} RETURNING {returning}"
+            f") SELECT * FROM claimed ORDER BY {order}",
+            [TaskStatus.PENDING.value, limit, self.worker, self.lease_seconds],
+        )
+        return [Task.from_db(self.connection.alias, [field.attname for field in fields], row) for row in rows]
+
+    def heartbeat(self, ids):
+        # Extends the worker's leases on `ids` by the lease duration from now. Returns the IDs still
+        # leased to the worker and their new expiry; a task missing from them was claimed by another
+        # worker after its lease expired (or never belonged to this one), and its work should stop.
+        table = self.connection.ops.quote_name(Task._meta.db_table)
+        pk, lease_expires_at = self.column('id'), self.column('lease_expires_at')
+        rows = self.execute(
+            f"UPDATE {table} SET {lease_expires_at} = now() + %s * interval '1 second'"
+            f" WHERE {pk} = ANY(%s) AND {self.column('claimed_by')} = %s AND {self.column('deleted_at')} IS NULL"
+            f" RETURNING {pk}, {lease_expires_at}",
+            [self.lease_seconds, list(ids), self.worker],
+        )
+        return sorted(task_id for task_id, _ in rows), max((expires_at for _, expires_at in rows), default=None)
+
+    def release(self, ids, completed=False):
+        # Gives up the worker's leases on `ids`, returning the IDs that were still leased to it. With
+        # `completed`, the same statement marks those tasks Completed as a regular task write.
+        table = self.connection.ops.quote_name(Task._meta.db_table)
+        pk, claimed_by = self.column('id'), self.column('claimed_by')
+        assignments, params = [f"{claimed_by} = NULL", f"{self.column('lease_expires_at')} = NULL"], []
+        if completed:
+            version = self.column('version')
+            assignments += [f"{self.column('status')} = %s", f"{self.column('updated_at')} = %s", f"{version} = {version} + 1"]
+            params += [TaskStatus.COMPLETED.value, timezone.now()]
+        rows = self.execute(
+            f"UPDATE {table} SET {', '.join(assignments)} WHERE {pk} = ANY(%s) AND {claimed_by} = %s"
+            f" AND {self.column('deleted_at')} IS NULL RETURNING {pk}",
+            [*params, list(ids), self.worker],
+        )
+        released = sorted(task_id for task_id, in rows)
+        if completed and released:
+            # The raw UPDATE sends no post_save signal, so invalidate the response cache here.
+            TaskCache.bump()
+            TaskLogger.log_task_completion(self.worker, released)
+        return released
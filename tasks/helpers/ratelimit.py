@@ -0,0 +1,238 @@
+import hashlib
+import ipaddress
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from django_ratelimit import ALL
+from tasks.helpers.metrics import TaskMetrics
+
+class RedisTokenBucket:
+    # Token buckets stored in Redis and updated by one Lua script, so every check is a single atomic
+    # round trip shared by all workers and hosts. Time comes from the Redis server clock, so workers
+    # with skewed clocks still agree on the refill.
+    script = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    allowed = 1
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url):
+        import redis
+
+        self.errors = (redis.RedisError,)
+        self.client = redis.Redis.from_url(url)
+        self.consume = self.client.register_script(self.script)
+
+    def take(self, key, capacity, rate, cost):
+        # Takes `cost` tokens if at least one is available. Returns (allowed, tokens left).
+        allowed, tokens = self.consume(keys=[key], args=[capacity, rate, cost])
+        return bool(allowed), float(tokens)
+
+
+class LocalTokenBucket:
+    # Stand-in for single-host deployments: the buckets live in a memory-mapped file shared by every
+    # worker process on the host, and each check is one `flock`-guarded read-modify-write of a slot.
+    # Slots are found by open addressing on a 64-bit key hash; a slot whose bucket has refilled holds
+    # no information and is reused, and when all probed slots are busy the one closest to full is evicted.
+    slot = struct.Struct('<Qddd')  # key hash, tokens, last update, time the bucket is full again
+    slots = 4096
+    probes = 8
+
+    def __init__(self, path):
+        import fcntl
+
+        self.errors = (OSError,)
+        self.flock = fcntl.flock
+        self.lock_exclusive, self.unlock = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self.thread_lock = threading.Lock()  # `flock` does not exclude threads sharing the descriptor.
+        size = self.slot.size * self.slots
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.flock(self.fd, self.lock_exclusive)
+        try:
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+        finally:
+            self.flock(self.fd, self.unlock)
+        self.memory = mmap.mmap(self.fd, size)
+
+    def take(self, key, capacity, rate, cost):
+        # Takes `cost` tokens if at least one is available. Returns (allowed, tokens left).
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        now = time.monotonic()  # System-wide on Linux, so every process reads the same clock.
+        with self.thread_lock:
+            self.flock(self.fd, self.lock_exclusive)
+            try:
+                offset, tokens, ts = self.find_slot(key_hash, now)
+                if tokens is None or ts > now:  # New bucket, or one written before a reboot.
+                    tokens, ts = capacity, now
+                tokens = min(capacity, tokens + (now - ts) * rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= cost
+                self.slot.pack_into(self.memory, offset, key_hash, tokens, now, now + (capacity - tokens) / rate)
+            finally:
+                self.flock(self.fd, self.unlock)
+        return allowed, tokens
+
+    def find_slot(self, key_hash, now):
+        # Returns (offset, tokens, last update) of the key's slot; tokens is None for a fresh slot.
+        free = evict = None
+        for probe in range(self.probes):
+            offset = ((key_hash + probe) % self.slots) * self.slot.size
+            slot_hash, tokens, ts, full_at = self.slot.unpack_from(self.memory, offset)
+            if slot_hash == key_hash:
+                return offset, tokens, ts
+            if free is None and (slot_hash == 0 or full_at <= now):
+                free = offset
+            if evict is None or full_at < evict[1]:
+                evict = (offset, full_at)
+        return (free if free is not None else evict[0]), None, None
+
+
+_backends = {}
+
+def get_backend():
+    # Returns the token bucket backend selected by TASK_RATELIMIT_BACKEND, created once per process.
+    name = settings.TASK_RATELIMIT_BACKEND
+    if name == 'redis':
+        location = settings.TASK_RATELIMIT_REDIS_URL
+        backend_class = RedisTokenBucket
+    elif name == 'local':
+        location = settings.TASK_RATELIMIT_LOCAL_PATH
+        backend_class = LocalTokenBucket
+    else:
+        raise ImproperlyConfigured(f"Unknown TASK_RATELIMIT_BACKEND: {name}")
+    if (name, location) not in _backends:
+        _backends[(name, location)] = backend_class(location)
+    return _backends[(name, location)]
+
+
+# `key=`, `rate=` and `method=` mean what they mean to django-ratelimit (4.1), including its RATELIMIT_IP_META_KEY
+# and RATELIMIT_IPV4_MASK/RATELIMIT_IPV6_MASK settings. The few lines of its parsing are repeated here
+# because django-ratelimit only exposes them as private names.
+rate_re = re.compile(r'(\d+)/(\d*)([smhd])?')
+periods = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def split_rate(rate):
+    # Returns (limit, period in seconds) of a rate such as `5/m` or `100/15s`; tuples pass through.
+    if isinstance(rate, tuple):
+        return rate
+    match = rate_re.match(rate)
+    if not match:
+        raise ImproperlyConfigured(f"Could not understand ratelimit rate: {rate}")
+    count, multiplier, period = match.groups()
+    return int(count), periods[(period or 's').lower()] * int(multiplier or 1)
+
+
+def method_matches(request, method):
+    # Whether the request's method is `method` or one of a list of methods (ALL matches every method).
+    if method == ALL:
+        return True
+    methods = method if isinstance(method, (list, tuple)) else [method]
+    return request.method in [m.upper() for m in methods]
+
+
+def client_ip(request):
+    # The client address from REMOTE_ADDR or RATELIMIT_IP_META_KEY (a META key, a callable or its dotted
+    # path), masked to its network so clients cannot dodge the limit by rotating addresses.
+    ip_meta = getattr(settings, 'RATELIMIT_IP_META_KEY', None)
+    if not ip_meta:
+        ip = request.META['REMOTE_ADDR']
+        if not ip:
+            raise ImproperlyConfigured("REMOTE_ADDR is empty; set RATELIMIT_IP_META_KEY behind a proxy on a Unix socket.")
+    elif callable(ip_meta):
+        ip = ip_meta(request)
+    elif '.' in ip_meta:
+        ip = import_string(ip_meta)(request)
+    elif ip_meta in request.META:
+        ip = request.META[ip_meta]
+    else:
+        raise ImproperlyConfigured(f"Could not get IP address from {ip_meta}")
+    mask = getattr(settings, 'RATELIMIT_IPV6_MASK', 64) if ':' in ip else getattr(settings, 'RATELIMIT_IPV4_MASK', 32)
+    return str(ipaddress.ip_network(f'{ip}/{mask}', strict=False).network_address)
+
+
+def key_value(group, request, key):
+    # Resolves a ratelimit key: `ip`, `user`, `user_or_ip`, `get:<name>`, `post:<name>`, `header:<name>`,
+    # a callable or the dotted path of one taking (group, request).
+    if callable(key):
+        return key(group, request)
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        return str(request.user.pk)
+    if key == 'user_or_ip':
+        return str(request.user.pk) if request.user.is_authenticated else client_ip(request)
+    accessor, _, name = key.partition(':')
+    if name and accessor == 'get':
+        return request.GET.get(name, '')
+    if name and accessor == 'post':
+        return request.POST.get(name, '')
+    if name and accessor == 'header':
+        return request.META.get('HTTP_' + name.replace('-', '_').upper(), '')
+    if '.' in key:
+        return import_string(key)(group, request)
+    raise ImproperlyConfigured(f"Could not understand ratelimit key: {key}")
+
+
+def get_usage(request, group=None, key=None, rate=None, method=ALL, increment=False):
+    # Token bucket counterpart of `django_ratelimit.core.get_usage()`. A rate of `N/period` is a bucket
+    # of N tokens refilled at N per period, so bursts are capped at N and the long-run rate is exact
+    # across all workers. `increment=False` checks without taking a token.
+    if not getattr(settings, 'RATELIMIT_ENABLE', True) or not method_matches(request, method):
+        return None
+    if group is None or rate is None or not key:
+        raise ImproperlyConfigured("Ratelimit group, key and rate must be specified")
+    limit, period = split_rate(rate)
+    value = key_value(group, request, key)
+
+    methods = '' if method == ALL else ''.join(sorted(m.upper() for m in ([method] if isinstance(method, str) else method)))
+    digest = hashlib.sha256(f"{group}|{limit}/{period}s|{value}|{methods}".encode()).hexdigest()
+    prefix = getattr(settings, 'RATELIMIT_CACHE_PREFIX', 'rl:')
+    refill = limit / period
+    backend = get_backend()
+    try:
+        allowed, tokens = backend.take(f"{prefix}tb:{digest}", limit, refill, 1 if increment else 0)
+    except backend.errors:
+        # Same policy as django-ratelimit when its cache fails: limit unless RATELIMIT_FAIL_OPEN.
+        if getattr(settings, 'RATELIMIT_FAIL_OPEN', False):
+            return None
+        return {'count': 0, 'limit': 0, 'should_limit': True, 'time_left': -1}
+    return {
+        'count': limit - int(tokens),
+        'limit': limit,
+        'should_limit': not allowed,
+        'time_left': 0 if allowed else max(0, (1 - tokens) / refill),
+    }
+
+
+def is_ratelimited(request, group=None, key=None, rate=None, method=ALL, increment=False):
+    # Drop-in replacement for `django_ratelimit.core.is_ratelimited()` on the token bucket backend.
+    usage = get_usage(request, group, key, rate, method, increment)
+    if usage is None:
+        return False
+    if usage['should_limit']:
+        request.limited = True
+        TaskMetrics.ratelimit_rejections.labels(group).inc()
+    return usage['should_limit']
@@ -0,0 +1,104 @@
+from datetime import timedelta
+import requests
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+from tasks.helpers.logger import TaskLogger
+from tasks.models import Checkpoint, Task, TaskStatus
+
+class LogReminderSink:
+    # Default sink: writes each batch of reminders to the audit log as one event.
+    def send(self, kind, reminders):
+        TaskLogger.log_reminders(kind, reminders)
+
+
+class WebhookReminderSink:
+    # POSTs each batch as `{"event": "task.<kind>", "tasks": [...]}` to TASK_REMINDER_WEBHOOK_URL. A failed
+    # delivery raises, so the scheduler keeps its watermark and sends the batch again on the next tick.
+    def __init__(self):
+        self.session = requests.Session()
+
+    def send(self, kind, reminders):
+        payload = {'event': f'task.{kind}', 'tasks': reminders}
+        response = self.session.post(settings.TASK_REMINDER_WEBHOOK_URL, json=payload, timeout=10)
+        response.raise_for_status()
+
+
+class TaskReminderScheduler:
+    # Sends reminders for pending tasks as their due date comes into view: `due_soon` when it enters the
+    # next TASK_REMINDER_LEAD_SECONDS, `overdue` when it passes. Each kind keeps a persisted watermark, a
+    # (due_date, id) position in the Checkpoint named `tasks.reminders`, so a tick only reads the tasks
+    # between the watermark and the window edge, in batches, from the partial index on pending due dates.
+    # Nothing else is scanned however large the table grows.
+    #
+    # The watermark advances after each batch is handed to the sink, so delivery is at least once: a
+    # crash or a sink error repeats at most the batch in flight. Reminders fire when the window edge
+    # passes a task; a task edited to fall due behind the watermark gets no reminder for that kind.
+    checkpoint_name = 'tasks.reminders'
+    fields = ('id', 'title', 'due_date', 'priority')
+
+    def __init__(self, sink=None, batch_size=None):
+        self.sink = sink or import_string(settings.TASK_REMINDER_SINK)()
+        self.batch_size = batch_size or settings.TASK_REMINDER_BATCH_SIZE
+
+    def windows(self, now):
+        # Returns the edge each kind's watermark moves up to at `now`.
+        return {'due_soon': now + timedelta(seconds=settings.TASK_REMINDER_LEAD_SECONDS), 'overdue': now}
+
+    @staticmethod
+    def after(position):
+        # Keyset predicate "(due_date, id) > position"; a position without an ID covers its whole instant.
+        # The redundant `due_date >= moment` gives the index scan its lower bound.
+        moment, pk = position
+        if pk is None:
+            return Q(due_date__gt=moment)
+        return Q(due_date__gte=moment) & (Q(due_date__gt=moment) | Q(due_date=moment, id__gt=pk))
+
+    def tick(self, now=None, max_batches=100):
+        # Runs one scheduling pass and returns the number of reminders sent per kind, or None when another
+        # scheduler is running a pass (ticks hold a session advisory lock). A backlog larger than
+        # `max_batches` per kind is left for the following ticks.
+        now = now or timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", [self.checkpoint_name])
+            if not cursor.fetchone()[0]:
+                return None
+        try:
+            checkpoint, _ = Checkpoint.objects.get_or_create(name=self.checkpoint_name)
+            sent = {}
+            for kind, edge in self.windows(now).items():
+                sent[kind] = self.advance(checkpoint, kind, edge, now, max_batches)
+            return sent
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", [self.checkpoint_name])
+
+    def advance(self, checkpoint, kind, edge, now, max_batches):
+        # Sends the reminders of one kind between its watermark and `edge`, moving the watermark along.
+        stored = checkpoint.state.get(kind)
+        position = (parse_datetime(stored[0]), stored[1]) if stored else (now, None)  # A new scheduler starts now
+        if not stored:
+            self.save(checkpoint, kind, position)
+        pending = Task.objects.filter(status=TaskStatus.PENDING, due_date__lte=edge).order_by('due_date', 'id')
+        sent = 0
+        for _ in range(max_batches):
+            if position[0] > edge or (position[0] == edge and position[1] is None):
+                break
+            batch = list(pending.filter(self.after(position)).values(*self.fields)[:self.batch_size])
+            if batch:
+                self.sink.send(kind, [
+                    {**reminder, 'due_date': reminder['due_date'].isoformat()} for reminder in batch
+                ])
+                sent += len(batch)
+            # A short batch is the end of the window, so the watermark can jump to its edge.
+            position = (batch[-1]['due_date'], batch[-1]['id']) if len(batch) == self.batch_size else (edge, None)
+            self.save(checkpoint, kind, position)
+        return sent
+
+    @staticmethod
+    def save(checkpoint, kind, position):
+        checkpoint.state[kind] = [position[0].isoformat(), position[1]]
+        checkpoint.save(update_fields=['state', 'updated_at'])
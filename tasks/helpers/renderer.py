@@ -0,0 +1,32 @@
+from rest_framework.renderers import JSONRenderer
+from tasks.helpers.profiling import TaskProfiler
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it responses are rendered by the stdlib encoder.
+    orjson = None
+
+class TaskJSONRenderer(JSONRenderer):
+    # JSONRenderer that encodes with orjson when it is installed, producing the same bytes as DRF's
+    # compact, unicode, strict output several times faster. Types orjson cannot encode natively go
+    # through DRF's encoder, and anything it rejects (non-string keys, integers beyond 64 bits, ...)
+    # falls back to the stdlib path. The one divergence is float exponents (`1e16` against `1e+16`),
+    # which task responses never contain.
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with TaskProfiler.phase('render'):
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except TypeError:  # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of U+2028/U+2029 as JSONRenderer, for clients that embed the JSON in JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DatabaseError, connections
+from tasks.helpers.logger import logger
+
+# Database alias the reads of the current request go to, set by `TaskReplicas.reading()`.
+_read_alias = ContextVar('task_replica_read_alias', default=None)
+
+class TaskReplicas:
+    # Read replica selection for the task read endpoints. A view opts its reads in with
+    # `reading(read_alias(request))`; TaskReplicaRouter then sends them to the chosen replica, and
+    # every other query, including all writes, to the primary. One replica is chosen per request, so
+    # a page and its count come from the same server.
+    #
+    # Read-your-writes: ReadYourWritesMiddleware answers every successful write with a cookie and an
+    # `X-Primary-Until` header holding the time until which that client's reads stay on the primary.
+    # Browsers send the cookie back by themselves; other clients echo the header.
+    cookie_name = 'tasks_primary_until'
+    header_name = 'X-Primary-Until'
+
+    # Seconds a replica is behind: 0 when it has replayed all the WAL it received (or is not a
+    # replica at all, like a second alias of the primary), NULL when its replay position is unknown.
+    lag_sql = (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+        " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    )
+
+    # Process-local lag of each replica: alias -> (monotonic time checked, lag in seconds or None when
+    # the replica could not be checked).
+    health = {}
+    lock = threading.Lock()
+
+    @staticmethod
+    def enabled():
+        # Whether task reads may use replicas at all.
+        return settings.TASK_REPLICA_READS_ENABLED and bool(settings.TASK_REPLICA_DATABASES)
+
+    @classmethod
+    def pinned(cls, request):
+        # Whether the client wrote recently enough that its reads must see the primary. Times further
+        # ahead than one window are ignored, so a client cannot pin itself for good.
+        value = request.headers.get(cls.header_name) or request.COOKIES.get(cls.cookie_name)
+        try:
+            until = float(value)
+        except (TypeError, ValueError):
+            return False
+        now = time.time()
+        return now < until <= now + settings.TASK_READ_YOUR_WRITES_SECONDS
+
+    @classmethod
+    def pin(cls, response):
+        # Keeps the client's reads on the primary for the read-your-writes window.
+        window = settings.TASK_READ_YOUR_WRITES_SECONDS
+        until = f"{time.time() + window:.3f}"
+        response.set_cookie(cls.cookie_name, until, max_age=window, httponly=True, samesite='Lax')
+        response[cls.header_name] = until
+
+    @classmethod
+    def lag(cls, alias):
+        # Returns the replica's lag in seconds, or None when it is unreachable. Checks run at most once
+        # per TASK_REPLICA_CHECK_INTERVAL in each process.
+        checked = cls.health.get(alias)
+        if checked is not None and time.monotonic() - checked[0] < settings.TASK_REPLICA_CHECK_INTERVAL:
+            return checked[1]
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(cls.lag_sql)
+                lag = cursor.fetchone()[0]
+        except DatabaseError as error:
+            logger.warning("Replica %s is unreachable: %s", alias, error)
+            connection.close()
+            lag = None
+        lag = None if lag is None else float(lag)
+        with cls.lock:
+            cls.health[alias] = (time.monotonic(), lag)
+        return lag
+
+    @classmethod
+    def read_alias(cls, request):
+        # Returns the replica this request's reads should use, or None for the primary: when replicas
+        # are off, the client is pinned to the primary, or no replica is within the allowed lag.
+        if not cls.enabled() or cls.pinned(request):
+            return None
+        healthy = []
+        for alias in settings.TASK_REPLICA_DATABASES:
+            lag = cls.lag(alias)
+            if lag is not None and lag <= settings.TASK_REPLICA_MAX_LAG_SECONDS:
+                healthy.append(alias)
+        return random.choice(healthy) if healthy else None
+
+    @staticmethod
+    @contextmanager
+    def reading(alias):
+        # Routes the reads inside the block to `alias` (None means the primary).
+        token = _read_alias.set(alias)
+        try:
+            yield
+        finally:
+            _read_alias.reset(token)
+
+    @staticmethod
+    def current():
+        # Alias the current reads are routed to, or None.
+        return _read_alias.get()
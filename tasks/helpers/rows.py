@@ -0,0 +1,78 @@
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+class TaskRowSerializer:
+    # Read-only counterpart of a ModelSerializer that works on `values_list()` tuples instead of model
+    # instances. The per-field conversion is worked out once up front, so each row costs one dict
+    # build instead of an instance, a `ReturnDict` and a `to_representation()` call per field.
+    # The output is identical to the serializer's: same keys, same order, same values.
+
+    # Representations that return the database value unchanged (`int(value)`, `str(value)` or the choice).
+    passthrough_representations = {
+        serializers.IntegerField.to_representation,
+        serializers.CharField.to_representation,
+        serializers.ChoiceField.to_representation,
+        serializers.BooleanField.to_representation,
+    }
+
+    def __init__(self, serializer):
+        # Compiles the converter table for the serializer's readable fields.
+        self.fields = [field for field in serializer.fields.values() if not field.write_only]
+        self.columns = [field.field_name for field in self.fields]
+        self.sources = [field.source for field in self.fields]
+        self.converters = [self.compile(field) for field in self.fields]
+
+    @staticmethod
+    def supports(serializer):
+        # Only fields that map straight onto a column (or annotation) can be read with `values_list()`.
+        return all(
+            '.' not in field.source and field.source != '*'
+            for field in serializer.fields.values() if not field.write_only
+        )
+
+    @classmethod
+    def compile(cls, field):
+        # Returns the converter for one field, or None when the database value is already its representation.
+        if type(field).to_representation in cls.passthrough_representations:
+            return None
+        if isinstance(field, serializers.DateTimeField) and settings.USE_TZ:
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format and output_format.lower() == ISO_8601:
+                return cls.compile_datetime(getattr(field, 'timezone', None) or field.default_timezone())
+        return field.to_representation
+
+    @staticmethod
+    def compile_datetime(tzinfo):
+        # Same as DateTimeField.to_representation for aware values with the ISO 8601 format.
+        def convert(value):
+            if value.tzinfo is not tzinfo:
+                value = value.astimezone(tzinfo)
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    def values(self, queryset, named=True):
+        # Selects the serialized columns as tuples. Annotations (such as the trigram `similarity` rank)
+        # and the ordering columns, with `id` as tie-breaker, ride along after them so keyset pagination
+        # can read its sort key from the named tuples even when a sparse fieldset leaves them out.
+        query = queryset.query
+        ordering = query.order_by or (queryset.model._meta.ordering if query.default_ordering else ())
+        extra = []
+        for name in [*query.annotation_select, *(item.lstrip('-') for item in ordering if isinstance(item, str)), 'id']:
+            name = 'id' if name == 'pk' else name
+            if name not in self.sources and name not in extra:
+                extra.append(name)
+        return queryset.values_list(*self.sources, *extra, named=named)
+
+    def convert(self, row):
+        # Converts one tuple into the list of its field representations, in column order.
+        return [
+            value if value is None or converter is None else converter(value)
+            for converter, value in zip(self.converters, row)
+        ]
+
+    def to_representation(self, rows):
+        # Converts tuples into the dicts the serializer would have produced.
+        columns, convert = self.columns, self.convert
+        return [dict(zip(columns, convert(row))) for row in rows]
@@ -1,50 +1,132 @@
-from django.db.models import Q
-from django.contrib.postgres.search import TrigramSimilarity
-from datetime import datetime
-from django.db.models.functions import TruncDate
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Value, When
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, TrigramSimilarity
+from datetime import datetime, time, timedelta
+from django.db.models.functions import Cast, Concat, Left, Length
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+from django_filters.utils import translate_validation
 from tasks.models import Task
 
 class TaskQueryService:
-    # A service class to handle filtering and sorting of task querysets.
-    def __init__(self, queryset, request):
-        # Initializes the TaskQueryService with a queryset and the request object.
+    # A service class that compiles the task list query parameters into a single queryset.
+    # Every parameter is parsed once and becomes one predicate or ordering, with no helper
+    # annotations, so each request emits one minimal SQL statement.
+    def __init__(self, queryset, request, params=None):
+        # Initializes the TaskQueryService with a queryset, the request object and, optionally,
+        # query parameters already validated by TaskFilter.
         self.queryset = queryset
         self.request = request
+        self.params = params if params is not None else self.parse_params()
+
+    def parse_params(self):
+        # Validates the raw query parameters through TaskFilter's form, raising a 400 on bad input.
+        from tasks.helpers.filter import TaskFilter
+
+        filterset = TaskFilter(self.request.query_params, queryset=self.queryset, request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.form.cleaned_data
 
     def filter_by_search_date(self):
-        # Filters the queryset by a specific creation date if provided in the request.
-        search_date = self.request.query_params.get('search_date', None)
+        # Filters the queryset to tasks created on `search_date` in the active timezone. The day is
+        # expressed as a half-open `created_at` range rather than a truncated date, so the
+        # (created_at, id) index can serve it.
+        search_date = self.params.get('search_date')
         if search_date:
-            try:
-                search_date_obj = datetime.strptime(search_date, "%Y-%m-%d")
-                self.queryset = self.queryset.annotate(created_date=TruncDate('created_at')).filter(created_date=search_date_obj.date())
-            except ValueError:
-                # If the date format is invalid, return an empty queryset.
-                self.queryset = Task.objects.none()
+            tz = timezone.get_current_timezone()
+            start = timezone.make_aware(datetime.combine(search_date, time.min), tz)
+            end = timezone.make_aware(datetime.combine(search_date + timedelta(days=1), time.min), tz)
+            self.queryset = self.queryset.filter(created_at__gte=start, created_at__lt=end)
         return self.queryset
 
+    @staticmethod
+    def is_full_text_search(query_params):
+        # Whether the raw query parameters ask for a full-text search, whose results carry a `headline`.
+        return query_params.get('search_mode') == 'fulltext' and bool((query_params.get('search') or '').strip())
+
     def filter_by_search_title(self):
-        # Filters the queryset by a search term in the task title using trigram similarity.
-        search_title = self.request.query_params.get('search', None)
+        # Filters the queryset by a search term in the task title using trigram similarity, or over
+        # title and description with `search_mode=fulltext`.
+        # The `%` operator is answered from the GIN trigram index at the session threshold
+        # (`TASK_SEARCH_SIMILARITY_THRESHOLD`), so only the candidate rows are ranked.
+        search_title = self.params.get('search')
+        if search_title and self.params.get('search_mode') == 'fulltext':
+            return self.filter_by_full_text(search_title)
         if search_title:
+            self.queryset = self.queryset.filter(title__trigram_similar=search_title)
+            # The rank is cast to double precision so it round-trips exactly through pagination cursors.
             self.queryset = self.queryset.annotate(
-                similarity=TrigramSimilarity('title', search_title)
-            ).filter(similarity__gt=0.1).order_by('-similarity')
+                similarity=Cast(TrigramSimilarity('title', search_title), FloatField())
+            )
+            threshold = self.params.get('search_threshold')
+            if threshold is not None and threshold > settings.TASK_SEARCH_SIMILARITY_THRESHOLD:
+                # A stricter per-query threshold only re-checks the rows the index already matched; TaskFilter
+                # rejects lower ones.
+                self.queryset = self.queryset.filter(similarity__gt=float(threshold))
+            self.queryset = self.queryset.order_by('-similarity')
+        return self.queryset
+
+    def filter_by_full_text(self, search):
+        # Matches the search (web search syntax: "quoted phrases", `or`, `-word`) against the stored
+        # `search_vector` through its GIN index and orders by SearchRank, where title matches (weight A)
+        # outrank description matches (weight B). The `headline` is a `ts_headline` snippet of the
+        # description; Postgres computes such costly expressions after the sort and limit, so only the
+        # rows of the page pay for it.
+        query = SearchQuery(search, search_type='websearch', config=Task.search_config)
+        self.queryset = self.queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+            headline=SearchHeadline(
+                'description', query, config=Task.search_config,
+                start_sel='<mark>', stop_sel='</mark>', min_words=15, max_words=35,
+            ),
+        ).order_by('-rank')
         return self.queryset
 
     def sort_by_date(self):
         # Sorts the queryset by the creation date based on the `sort_by_date` query parameter.
-        sort_by_date = self.request.query_params.get('sort_by_date', None)
-        if sort_by_date:
-            if sort_by_date == 'true':
-                self.queryset = self.queryset.order_by('-created_at')
-            elif sort_by_date == 'false':
-                self.queryset = self.queryset.order_by('created_at')
+        # An explicit sort takes precedence over the search ranking.
+        sort_by_date = self.params.get('sort_by_date')
+        if sort_by_date is True:
+            self.queryset = self.queryset.order_by('-created_at')
+        elif sort_by_date is False:
+            self.queryset = self.queryset.order_by('created_at')
+        return self.queryset
+
+    def selected_fields(self):
+        # Returns the sparse fieldset requested with `fields` and/or `exclude`, in serializer order,
+        # or None when the default fields apply.
+        from tasks.serializer import TaskSerializer
+
+        fields, exclude = self.params.get('fields'), self.params.get('exclude')
+        if not fields and not exclude:
+            return None
+        selected = fields or TaskSerializer.default_fields()
+        return [name for name in TaskSerializer.selectable_fields() if name in selected and name not in (exclude or ())]
+
+    def select_fields(self):
+        # Loads only the columns of the requested fieldset (plus `id` and the ordering columns), so an
+        # unselected `description` is never read, and computes `description_preview` in SQL: the first
+        # TASK_DESCRIPTION_PREVIEW_LENGTH characters, with an ellipsis when the description is longer.
+        selected = self.selected_fields()
+        if selected is None:
+            return self.queryset
+        if 'description_preview' in selected:
+            length = settings.TASK_DESCRIPTION_PREVIEW_LENGTH
+            self.queryset = self.queryset.annotate(description_preview=Case(
+                When(GreaterThan(Length(Left('description', length + 1)), length), then=Concat(Left('description', length), Value('…'))),
+                default=Left('description', length),
+            ))
+        columns = {field.name for field in Task._meta.concrete_fields}
+        ordering = [item.lstrip('-') for item in self.queryset.query.order_by or Task._meta.ordering if isinstance(item, str)]
+        self.queryset = self.queryset.only('id', *(name for name in [*selected, *ordering] if name in columns))
         return self.queryset
 
     def apply_filters(self):
-        # Applies all filters (search date, search title, and sorting by date) to the queryset.
+        # Applies all filters (search date, search title, and sorting by date) and the sparse fieldset
+        # to the queryset.
         self.queryset = self.filter_by_search_date()
         self.queryset = self.filter_by_search_title()
         self.queryset = self.sort_by_date()
+        self.queryset = self.select_fields()
         return self.queryset
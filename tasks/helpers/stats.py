@@ -0,0 +1,81 @@
+from datetime import datetime, time, timezone as dt_timezone
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from tasks.models import ArchivedTask, Task, TaskDueStat, TaskStat, TaskStatus
+
+class TaskStats:
+    # Task statistics served from the TaskStat and TaskDueStat counter rollups, which the `tasks_task`
+    # triggers keep current (archived tasks included). A read sums the slots of each (status, priority)
+    # counter in SQL and the due days before today in one index range, however many tasks there are.
+
+    @staticmethod
+    def get():
+        # Returns the total, the counts per status and per priority, and the number of overdue tasks
+        # (pending with a due date in the past). Whole past due days come from the due-day rollup; tasks
+        # due earlier today are counted through the partial index on pending due dates.
+        now = timezone.now()
+        today = now.astimezone(dt_timezone.utc).date()
+        by_status = {status.value: 0 for status in TaskStatus}
+        by_priority = {}
+        # One row per (status, priority), so this does not grow with the tasks or their due dates.
+        for status, priority, count in TaskStat.objects.order_by().values_list('status', 'priority').annotate(total=Sum('count')):
+            by_status[status] = by_status.get(status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+        overdue = TaskDueStat.objects.filter(due_date__lt=today).aggregate(total=Sum('count'))['total'] or 0
+        start_of_today = datetime.combine(today, time.min, tzinfo=dt_timezone.utc)
+        overdue += Task.objects.filter(status=TaskStatus.PENDING, due_date__gte=start_of_today, due_date__lt=now).count()
+        return {
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_priority': {str(priority): count for priority, count in sorted(by_priority.items()) if count},
+            'overdue': overdue,
+        }
+
+    @staticmethod
+    def counters():
+        # Returns the rollups as ({(status, priority): count}, {due day: count}), summed over their slots.
+        totals = TaskStat.objects.order_by().values_list('status', 'priority').annotate(total=Sum('count')).exclude(total=0)
+        days = TaskDueStat.objects.order_by().values_list('due_date').annotate(total=Sum('count')).exclude(total=0)
+        return (
+            {(status, priority): total for status, priority, total in totals},
+            {due_date: total for due_date, total in days},
+        )
+
+    @staticmethod
+    def buckets():
+        # Counts the tasks from `tasks_task` and the archive the way the triggers roll them up.
+        due_day = TruncDate('due_date', tzinfo=dt_timezone.utc)
+        totals, days = {}, {}
+        for model in (Task, ArchivedTask):
+            for status, priority, count in model.objects.order_by().values_list('status', 'priority').annotate(count=Count('id')):
+                totals[status, priority] = totals.get((status, priority), 0) + count
+            pending = model.objects.filter(status=TaskStatus.PENDING, due_date__isnull=False).order_by()
+            for day, count in pending.annotate(day=due_day).values_list('day').annotate(count=Count('id')):
+                days[day] = days.get(day, 0) + count
+        return totals, days
+
+    @classmethod
+    def rebuild(cls, dry_run=False):
+        # Recomputes the rollups from scratch and returns (counters, counters that were wrong). Unless
+        # `dry_run`, the rollups are rewritten with one slot per counter even when they were right, which
+        # folds the slots and drops the rows that fell to zero. Task writes wait on a SHARE lock until the
+        # rebuild commits, so no trigger update is lost in between.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model in (Task, ArchivedTask))
+                cursor.execute(f"LOCK TABLE {tables} IN SHARE MODE")
+            expected, current = cls.buckets(), cls.counters()
+            wrong = sum(
+                1 for rollup, counted in zip(expected, current)
+                for key in rollup.keys() | counted.keys() if rollup.get(key) != counted.get(key)
+            )
+            if not dry_run:
+                TaskStat.objects.all().delete()
+                TaskStat.objects.bulk_create(
+                    TaskStat(status=status, priority=priority, count=count) for (status, priority), count in expected[0].items()
+                )
+                TaskDueStat.objects.all().delete()
+                TaskDueStat.objects.bulk_create(TaskDueStat(due_date=day, count=count) for day, count in expected[1].items())
+        return sum(map(len, expected)), wrong
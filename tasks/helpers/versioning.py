@@ -0,0 +1,78 @@
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from tasks.helpers.cache import TaskCache
+from tasks.models import Task
+
+class TaskVersion:
+    # Optimistic concurrency for single tasks. Each task's `version` is its strong ETag; a PATCH with
+    # `If-Match` only applies when the task is still at one of the listed versions, and a GET with a
+    # matching `If-None-Match` is answered with 304 and no body.
+
+    @staticmethod
+    def etag(version):
+        # Returns the ETag header value of a task version.
+        return quote_etag(str(version))
+
+    @staticmethod
+    def parse_if_match(header):
+        # Returns the versions an `If-Match` header accepts, or None when there is no precondition
+        # (no header, or `*`). Weak tags never match, since `If-Match` uses strong comparison.
+        if header is None:
+            return None
+        etags = parse_etags(header)
+        if etags == ['*']:
+            return None
+        versions = []
+        for etag in etags:
+            if etag.startswith('"') and etag[1:-1].isdigit():
+                versions.append(int(etag[1:-1]))
+        return versions
+
+    @staticmethod
+    def not_modified(header, etag):
+        # Whether an `If-None-Match` header matches the current ETag (weak comparison).
+        if header is None:
+            return False
+        etags = parse_etags(header)
+        return etags == ['*'] or etag in [tag.removeprefix('W/') for tag in etags]
+
+    @staticmethod
+    def update(pk, data, versions=None):
+        # Applies validated field values to a task in one statement:
+        #   UPDATE tasks_task SET <changed columns>, updated_at = %s, version = version + 1
+        #   WHERE id = %s AND deleted_at IS NULL [AND version IN (...)] RETURNING <all columns>
+        # Returns the updated task, or None when no row matched the ID and versions.
+        if versions == []:
+            return None
+        connection = connections[router.db_for_write(Task)]
+        quote = connection.ops.quote_name
+        meta = Task._meta
+
+        assignments, params = [], []
+        for name, value in {**data, 'updated_at': timezone.now()}.items():
+            field = meta.get_field(name)
+            assignments.append(f"{quote(field.column)} = %s")
+            params.append(field.get_db_prep_save(value, connection))
+        version = quote(meta.get_field('version').column)
+        assignments.append(f"{version} = {version} + 1")
+
+        where = f"{quote(meta.pk.column)} = %s AND {quote(meta.get_field('deleted_at').column)} IS NULL"
+        params.append(pk)
+        if versions is not None:
+            where += f" AND {version} IN ({', '.join(['%s'] * len(versions))})"
+            params.extend(versions)
+
+        fields = [field for field in meta.concrete_fields if not field.generated]
+        returning = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(meta.db_table)} SET {', '.join(assignments)} WHERE {where} RETURNING {returning}",
+                params,
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        # The raw UPDATE sends no post_save signal, so invalidate the response cache here.
+        TaskCache.bump()
+        return Task.from_db(connection.alias, [field.attname for field in fields], row)
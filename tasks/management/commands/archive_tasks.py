@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.helpers.archive import TaskArchive
+
+class Command(BaseCommand):
+    # Moves old completed tasks to the archive table in batches, or restores archived tasks with
+    # `--restore`. An interrupted run resumes from its last committed batch.
+    help = "Archive completed tasks older than the archive age, or restore archived tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS, help="Archive completed tasks not updated for this many days.")
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE, help="Tasks moved per transaction.")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches (default: all).")
+        parser.add_argument('--restore', type=int, nargs='+', metavar='ID', help="Move these archived tasks back instead.")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            restored = TaskArchive.restore(options['restore'])
+            self.stdout.write(f"Restored {len(restored)} of {len(options['restore'])} tasks.")
+            return
+        if options['days'] < 0 or options['batch_size'] < 1 or (options['max_batches'] is not None and options['max_batches'] < 1):
+            raise CommandError("--days must not be negative, and --batch-size and --max-batches must be positive.")
+        archived = TaskArchive.archive(options['days'], options['batch_size'], options['max_batches'])
+        self.stdout.write(f"Archived {archived} completed tasks older than {options['days']} days.")
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from tasks.helpers.logger import AuditJSONFormatter, AuditLogHandler, audit_logger
+from tasks.models import Task
+
+class Command(BaseCommand):
+    # Measures PATCH /tasks/<id>/ latency with audit logging off, with a plain FileHandler that formats
+    # and writes each record on the request thread, and with the queued AuditLogHandler. The audit
+    # logger's handlers are swapped for the run and restored afterwards; the files go to a temp directory.
+    help = "Benchmark request latency of the task audit log handlers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="PATCH requests per handler.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        if total <= 0:
+            raise CommandError("--requests must be positive.")
+
+        task = Task.objects.create(title="Audit log benchmark task")
+        handlers, propagate = audit_logger.handlers[:], audit_logger.propagate
+        try:
+            with tempfile.TemporaryDirectory() as directory, override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False):
+                file_handler = logging.FileHandler(os.path.join(directory, 'sync.log'))
+                file_handler.setFormatter(AuditJSONFormatter())
+                candidates = [
+                    ("off", logging.NullHandler()),
+                    ("FileHandler (sync)", file_handler),
+                    ("AuditLogHandler (queued)", AuditLogHandler(os.path.join(directory, 'queued.log'))),
+                ]
+                audit_logger.propagate = False
+                for label, handler in candidates:
+                    audit_logger.handlers = [handler]
+                    try:
+                        self.report(label, self.run(task, total))
+                    finally:
+                        handler.close()
+        finally:
+            audit_logger.handlers, audit_logger.propagate = handlers, propagate
+            task.delete()
+
+    def run(self, task, total):
+        # Sends the PATCH requests one after another, returning their latencies.
+        client = Client()
+        path = reverse('task-detail', args=[task.pk])
+        latencies = []
+        for index in range(total + 1):
+            started = time.perf_counter()
+            response = client.patch(path, json.dumps({'priority': index % 5 + 1}), content_type='application/json')
+            if response.status_code != 200:
+                raise CommandError(f"PATCH returned {response.status_code}: {response.content[:200]!r}")
+            if index:  # The first request warms up the handler.
+                latencies.append(time.perf_counter() - started)
+        return sorted(latencies)
+
+    def report(self, label, latencies):
+        # Prints latency percentiles for one handler.
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        self.stdout.write(f"{label:<26} p50 {percentile(0.50):7.3f} ms   p99 {percentile(0.99):7.3f} ms")
@@ -0,0 +1,75 @@
+import random
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from tasks.helpers.queue import TaskQueue
+from tasks.models import Task, TaskStatus
+
+class Command(BaseCommand):
+    # Measures work-queue throughput as workers are added. For each worker count it seeds pending
+    # tasks, then every worker thread (with its own database connection) claims a batch, simulates
+    # `--work-ms` of processing and releases the batch as completed, until the queue is empty. Since
+    # claims skip rows other workers hold, throughput should grow with the worker count until the
+    # database itself is saturated. The run also checks that no task was processed twice.
+    help = "Benchmark work-queue claim throughput for increasing numbers of workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000, help="Pending tasks seeded for each worker count.")
+        parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated worker counts to measure.")
+        parser.add_argument('--batch', type=int, default=10, help="Tasks taken by each claim.")
+        parser.add_argument('--work-ms', type=float, default=20, help="Simulated processing time per batch.")
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(count) for count in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers.")
+        if min(options['tasks'], options['batch'], *worker_counts) <= 0 or options['work_ms'] < 0:
+            raise CommandError("--tasks, --batch and --workers must be positive and --work-ms not negative.")
+        # The workers complete every task they claim, so existing pending tasks would be completed too.
+        if Task.objects.filter(status=TaskStatus.PENDING).exists():
+            raise CommandError("There are pending tasks in the database; run the benchmark against an empty queue.")
+
+        baseline = None
+        for workers in worker_counts:
+            # The seeded rows are committed, since the worker threads claim through their own connections.
+            seeded = Task.objects.bulk_create(
+                Task(title=f"Queue benchmark task {index}", priority=random.randrange(5)) for index in range(options['tasks'])
+            )
+            try:
+                elapsed, processed = self.run(workers, options['batch'], options['work_ms'] / 1000)
+            finally:
+                Task.objects.filter(pk__in=[task.pk for task in seeded]).delete()
+            if len(processed) != len(set(processed)):
+                raise CommandError(f"{len(processed) - len(set(processed))} tasks were processed twice.")
+            throughput = len(processed) / elapsed
+            baseline = baseline or throughput / workers
+            self.stdout.write(
+                f"{workers:3d} workers   {throughput:9.1f} tasks/s   speedup {throughput / baseline:5.2f}x   "
+                f"({len(processed)} tasks in {elapsed:.2f}s)"
+            )
+
+    def run(self, workers, batch, work_seconds):
+        # Drains the queue with `workers` threads, returning the elapsed time and every processed task ID.
+        processed = []
+        lock = threading.Lock()
+
+        def worker(name):
+            queue = TaskQueue(name)
+            try:
+                while tasks := queue.claim(batch):
+                    time.sleep(work_seconds)
+                    released = queue.release([task.id for task in tasks], completed=True)
+                    with lock:
+                        processed.extend(released)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(f"bench-worker-{index}",)) for index in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started, processed
@@ -0,0 +1,39 @@
+import time
+import uuid
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django_ratelimit.core import is_ratelimited as cache_is_ratelimited
+from tasks.helpers.ratelimit import is_ratelimited
+
+class Command(BaseCommand):
+    # Measures the overhead of one rate limit check: django-ratelimit's cache counter against the token
+    # bucket on each backend. The rate is high enough that no check is ever limited.
+    help = "Benchmark the per-check overhead of the rate limiter backends."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000, help="Checks per backend.")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations <= 0:
+            raise CommandError("--iterations must be positive.")
+        request = RequestFactory().patch('/tasks/1/')
+        request.user = AnonymousUser()
+        rate = f'{iterations * 10}/m'
+
+        candidates = [
+            ("django-ratelimit (cache)", cache_is_ratelimited, {}),
+            ("token bucket (redis)", is_ratelimited, {'TASK_RATELIMIT_BACKEND': 'redis'}),
+            ("token bucket (local)", is_ratelimited, {'TASK_RATELIMIT_BACKEND': 'local'}),
+        ]
+        for label, check, overrides in candidates:
+            group = f'bench-{uuid.uuid4().hex}'
+            with override_settings(RATELIMIT_ENABLE=True, **overrides):
+                check(request, group=group, key='user', rate=rate, method='PATCH', increment=True)  # Warm-up
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    if check(request, group=group, key='user', rate=rate, method='PATCH', increment=True):
+                        raise CommandError(f"{label} limited a benchmark request; is its backend reachable?")
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f"{label:<26} {elapsed * 1_000_000 / iterations:8.1f} us/check")
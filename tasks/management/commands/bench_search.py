@@ -0,0 +1,84 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from tasks.helpers.service import TaskQueryService
+from tasks.models import Task
+
+# Vocabulary of the synthetic titles and descriptions.
+WORDS = [
+    'report', 'invoice', 'meeting', 'deploy', 'release', 'budget', 'review', 'customer', 'database', 'migration',
+    'schedule', 'design', 'backup', 'security', 'audit', 'payroll', 'onboarding', 'roadmap', 'incident', 'vendor',
+    'contract', 'forecast', 'training', 'inventory', 'shipment', 'feedback', 'analytics', 'support', 'billing', 'server',
+]
+
+class Command(BaseCommand):
+    # Benchmarks task searches on a synthetic dataset: the trigram title search, a description
+    # `icontains` filter (what searching the description costs without the tsvector), and the
+    # full-text search with ranking and headlines. Each search fetches the first page and its count.
+    # The dataset is generated with one INSERT ... SELECT inside a transaction that is rolled back
+    # afterwards, so nothing is left behind.
+    help = "Benchmark trigram, substring and full-text task search on a synthetic dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Synthetic tasks to generate.")
+        parser.add_argument('--iterations', type=int, default=20, help="Runs of each search.")
+        parser.add_argument('--page-size', type=int, default=20, help="Results fetched per search.")
+
+    def handle(self, *args, **options):
+        if min(options['rows'], options['iterations'], options['page_size']) <= 0:
+            raise CommandError("--rows, --iterations and --page-size must be positive.")
+
+        with transaction.atomic():
+            self.generate(options['rows'])
+            searches = [
+                ("trigram title", lambda term: self.search({'search': term})),
+                ("description icontains", lambda term: Task.objects.filter(description__icontains=term).order_by('-created_at')),
+                ("full-text (rank+headline)", lambda term: self.search({'search': term, 'search_mode': 'fulltext'})),
+            ]
+            terms = ['invoice', 'security audit', 'database migration']
+            for label, build in searches:
+                self.report(label, self.run(build, terms, options['iterations'], options['page_size']))
+            transaction.set_rollback(True)
+
+    def generate(self, rows):
+        # Inserts `rows` tasks with three-word titles and twelve-word descriptions drawn from WORDS.
+        started = time.perf_counter()
+        pick = f"w[1 + floor(random() * {len(WORDS)})::int]"
+        title = " || ' ' || ".join([pick] * 3)
+        description = " || ' ' || ".join([pick] * 12)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(Task._meta.db_table)} "
+                "(title, description, status, priority, version, created_at, updated_at) "
+                f"SELECT {title}, {description}, 'Pending', i %% 5, 1, now() - i * interval '1 second', now() "
+                "FROM (SELECT %s::text[] AS w) AS words, generate_series(1, %s) AS i",
+                [WORDS, rows],
+            )
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Task._meta.db_table)}")
+        self.stdout.write(f"Generated {rows} tasks in {time.perf_counter() - started:.1f}s")
+
+    def search(self, params):
+        # Builds the list queryset the API would for these query parameters.
+        return TaskQueryService(Task.objects.all(), None, params).apply_filters()
+
+    def run(self, build, terms, iterations, page_size):
+        # Runs each search term `iterations` times, returning the sorted latencies and the last counts.
+        latencies, counts = [], {}
+        for term in terms:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                queryset = build(term)
+                list(queryset[:page_size])
+                counts[term] = queryset.count()
+                latencies.append(time.perf_counter() - started)
+        return sorted(latencies), counts
+
+    def report(self, label, result):
+        # Prints latency percentiles and match counts for one search.
+        latencies, counts = result
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        matches = ', '.join(f"{term!r}: {count}" for term, count in counts.items())
+        self.stdout.write(f"{label:<26} p50 {percentile(0.50):8.2f} ms   p99 {percentile(0.99):8.2f} ms   ({matches})")
@@ -0,0 +1,76 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from tasks.helpers.renderer import TaskJSONRenderer
+from tasks.helpers.rows import TaskRowSerializer
+from tasks.models import Task
+from tasks.serializer import TaskSerializer
+
+class Command(BaseCommand):
+    # Compares the two ways of rendering a page of tasks: TaskSerializer instances through DRF's
+    # JSONRenderer, and `values_list()` rows through TaskRowSerializer and TaskJSONRenderer.
+    # Sample rows are created inside a transaction that is rolled back, so nothing is left behind.
+    help = "Benchmark the TaskSerializer and fast row serializer paths for task list pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Sample tasks created for the run.")
+        parser.add_argument('--page-size', type=int, default=100, help="Tasks rendered per page.")
+        parser.add_argument('--iterations', type=int, default=200, help="Pages rendered per path.")
+
+    def handle(self, *args, **options):
+        if min(options['rows'], options['page_size'], options['iterations']) <= 0:
+            raise CommandError("--rows, --page-size and --iterations must be positive.")
+
+        with transaction.atomic():
+            now = timezone.now()
+            Task.objects.bulk_create(
+                Task(title=f"Benchmark task {index}", description="Sample description " * 4,
+                     priority=index % 5, due_date=now if index % 2 else None)
+                for index in range(options['rows'])
+            )
+            queryset = Task.objects.order_by('-created_at', '-id')[:options['page_size']]
+            self.compare(queryset, options['iterations'])
+            transaction.set_rollback(True)
+
+    def serializer_path(self, queryset):
+        # The default path: model instances, TaskSerializer and the stdlib JSON renderer.
+        return JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+
+    def row_path(self, queryset):
+        # The fast path: value tuples, the precompiled converter table and the orjson renderer.
+        rows = TaskRowSerializer(TaskSerializer())
+        return TaskJSONRenderer().render(rows.to_representation(rows.values(queryset)))
+
+    def measure(self, path, iterations):
+        # Returns the mean milliseconds per call.
+        path()  # Warm-up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            path()
+        return (time.perf_counter() - started) * 1000 / iterations
+
+    def report(self, label, baseline, fast):
+        self.stdout.write(f"{label:<22} TaskSerializer {baseline:8.2f} ms/page, rows {fast:8.2f} ms/page ({baseline / fast:.1f}x)")
+
+    def compare(self, queryset, iterations):
+        if self.serializer_path(queryset) != self.row_path(queryset):
+            raise CommandError("The fast path rendered different bytes than TaskSerializer.")
+
+        # Whole page: query, conversion and rendering.
+        self.report(
+            "Query + encode:",
+            self.measure(lambda: self.serializer_path(queryset), iterations),
+            self.measure(lambda: self.row_path(queryset), iterations),
+        )
+        # Conversion and rendering of rows that were already fetched.
+        instances = list(queryset)
+        rows = TaskRowSerializer(TaskSerializer())
+        values = list(rows.values(queryset))
+        self.report(
+            "Encode only:",
+            self.measure(lambda: JSONRenderer().render(TaskSerializer(instances, many=True).data), iterations),
+            self.measure(lambda: TaskJSONRenderer().render(rows.to_representation(values)), iterations),
+        )
+        self.stdout.write(self.style.SUCCESS("Both paths rendered identical output."))
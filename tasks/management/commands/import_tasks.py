@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import AutoField
+from django.utils import timezone
+from rest_framework import serializers
+from tasks.helpers.cache import TaskCache
+from tasks.models import Checkpoint, Task
+from tasks.serializer import TaskSerializer
+
+class Command(BaseCommand):
+    # Bulk-loads tasks from an NDJSON or CSV file (or stdin) with Postgres `COPY FROM STDIN`.
+    # Rows are validated with TaskSerializer's rules and copied in batches; each batch commits
+    # together with its checkpoint, so an interrupted import resumes exactly where it stopped.
+    help = "Import tasks from an NDJSON or CSV file (or '-' for stdin) using COPY."
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Path of the file to import, or '-' to read from stdin.")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help="Input format (defaults to the file extension, or ndjson).")
+        parser.add_argument('--batch-size', type=int, default=10000, help="Rows copied per transaction.")
+        parser.add_argument('--checkpoint', help="Checkpoint name used to resume (defaults to the source path).")
+        parser.add_argument('--dry-run', action='store_true', help="Validate the input without writing anything.")
+
+    def handle(self, *args, **options):
+        source = options['source']
+        input_format = options['format'] or ('csv' if source.lower().endswith('.csv') else 'ndjson')
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size must be positive.")
+        self.batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.checkpoint_name = f"import_tasks:{options['checkpoint'] or os.path.abspath(source)}"
+
+        self.serializer = TaskSerializer()
+        self.timestamp_field = serializers.DateTimeField()
+        self.now = timezone.now()
+        self.columns = [
+            field for field in Task._meta.concrete_fields
+            if not isinstance(field, AutoField) and not field.generated
+        ]
+        self.using = router.db_for_write(Task)
+
+        if source == '-':
+            self.import_stream(options.get('stdin') or sys.stdin, input_format)
+        else:
+            if not os.path.exists(source):
+                raise CommandError(f"File not found: {source}")
+            with open(source, newline='', encoding='utf-8') as stream:
+                self.import_stream(stream, input_format)
+
+    def records(self, stream, input_format):
+        # Yields (line number, record or parse error) for every input record.
+        if input_format == 'csv':
+            for line_number, record in enumerate(csv.DictReader(stream), start=2):
+                # Empty cells mean "not provided", so model and serializer defaults apply.
+                yield line_number, {name: value for name, value in record.items() if value not in ('', None)}
+            return
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_number, ValueError(f"Invalid JSON: {error}")
+                continue
+            yield line_number, record if isinstance(record, dict) else ValueError("Expected a JSON object.")
+
+    def to_row(self, record):
+        # Validates a record with TaskSerializer's rules and returns the values of the COPY columns.
+        # `created_at`/`updated_at` are read-only in the API but kept when the source provides them.
+        validated = self.serializer.run_validation(record)
+        for name in ('created_at', 'updated_at'):
+            if record.get(name) not in (None, ''):
+                try:
+                    validated[name] = self.timestamp_field.run_validation(record[name])
+                except serializers.ValidationError as error:
+                    raise serializers.ValidationError({name: error.detail})
+        validated.setdefault('created_at', self.now)
+        validated.setdefault('updated_at', validated['created_at'])
+
+        connection = connections[self.using]
+        return [
+            field.get_db_prep_save(validated[field.attname] if field.attname in validated else field.get_default(), connection)
+            for field in self.columns
+        ]
+
+    def import_stream(self, stream, input_format):
+        checkpoint = Checkpoint.objects.using(self.using).filter(name=self.checkpoint_name).first()
+        skip = checkpoint.state.get('records', 0) if checkpoint and not self.dry_run else 0
+        if skip:
+            self.stdout.write(f"Resuming from checkpoint: skipping {skip} already imported records.")
+
+        consumed = skip
+        imported = invalid = 0
+        batch = []
+        started = time.monotonic()
+
+        for position, (line_number, record) in enumerate(self.records(stream, input_format), start=1):
+            if position <= skip:
+                continue
+            consumed = position
+            try:
+                if isinstance(record, Exception):
+                    raise serializers.ValidationError(str(record))
+                batch.append(self.to_row(record))
+            except serializers.ValidationError as error:
+                invalid += 1
+                self.stderr.write(f"Line {line_number}: {error.detail}")
+            if len(batch) >= self.batch_size:
+                imported += self.flush(batch, consumed)
+                batch = []
+                self.report(imported, invalid, started)
+
+        imported += self.flush(batch, consumed)
+        elapsed = time.monotonic() - started
+        action = "Validated" if self.dry_run else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {imported} rows, skipped {invalid} invalid rows in {elapsed:.2f}s "
+            f"({imported / elapsed if elapsed else 0:.0f} rows/s)."
+        ))
+
+    def flush(self, batch, consumed):
+        # Copies one batch and advances the checkpoint in the same transaction.
+        if self.dry_run or consumed == 0:
+            return len(batch)
+
+        with transaction.atomic(using=self.using):
+            if batch:
+                connection = connections[self.using]
+                buffer = io.StringIO()
+                csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(batch)
+                buffer.seek(0)
+                columns = ', '.join(connection.ops.quote_name(field.column) for field in self.columns)
+                # Every string is quoted, so an empty quoted value in a nullable column can only be a NULL.
+                nullable = ', '.join(connection.ops.quote_name(field.column) for field in self.columns if field.null)
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {connection.ops.quote_name(Task._meta.db_table)} ({columns}) FROM STDIN "
+                        f"WITH (FORMAT csv{f', FORCE_NULL ({nullable})' if nullable else ''})",
+                        buffer,
+                    )
+                TaskCache.bump()
+            Checkpoint.objects.using(self.using).update_or_create(
+                name=self.checkpoint_name, defaults={'state': {'records': consumed}}
+            )
+        return len(batch)
+
+    def report(self, imported, invalid, started):
+        # Prints progress with the current throughput.
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"{imported} rows imported, {invalid} invalid ({imported / elapsed if elapsed else 0:.0f} rows/s)")
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from tasks.models import Task
+
+class Command(BaseCommand):
+    # Load-tests the task read endpoints through the WSGI path (the DRF TaskViewSet, one thread per
+    # concurrent request) and the ASGI path (the async views, concurrent requests on one event loop).
+    # Requests go through Django's full handler and middleware stack in-process, so the numbers
+    # compare the two code paths rather than a particular server or network.
+    help = "Compare requests/sec and latency percentiles of the sync (WSGI) and async (ASGI) task endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Requests sent to each path.")
+        parser.add_argument('--concurrency', type=int, default=20, help="Requests in flight at once.")
+        parser.add_argument('--endpoint', choices=['list', 'detail'], default='list', help="Endpoint to load.")
+        parser.add_argument('--seed', type=int, default=100, help="Sample tasks created for the run and deleted afterwards.")
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['concurrency']) <= 0 or options['seed'] < 0:
+            raise CommandError("--requests and --concurrency must be positive and --seed not negative.")
+
+        # The sample rows are committed, since the worker threads read through their own connections.
+        seeded = Task.objects.bulk_create(Task(title=f"Load test task {index}") for index in range(options['seed']))
+        try:
+            task = Task.objects.order_by('-created_at').first()
+            if task is None:
+                raise CommandError("There are no tasks to request; run with --seed.")
+            if options['endpoint'] == 'list':
+                paths = (reverse('task-list'), reverse('async-task-list'))
+            else:
+                paths = (reverse('task-detail', args=[task.pk]), reverse('async-task-detail', args=[task.pk]))
+
+            total, concurrency = options['requests'], options['concurrency']
+            # The async views do not use the response cache, so it is off for both paths.
+            with override_settings(TASK_CACHE_ENABLED=False):
+                self.report("WSGI (TaskViewSet)", *self.run_sync(paths[0], total, concurrency))
+                self.report("ASGI (async views)", *asyncio.run(self.run_async(paths[1], total, concurrency)))
+        finally:
+            Task.objects.filter(pk__in=[task.pk for task in seeded]).delete()
+
+    def run_sync(self, path, total, concurrency):
+        # Sends the requests from `concurrency` threads, each with its own client and database connection.
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        results = []
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    results.append((response.status_code, time.perf_counter() - started))
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - started
+
+    async def run_async(self, path, total, concurrency):
+        # Sends the requests from `concurrency` coroutines sharing one event loop.
+        client = AsyncClient()
+        remaining = iter(range(total))
+        results = []
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path)
+                results.append((response.status_code, time.perf_counter() - started))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        # Close the connection of the thread the async ORM ran its queries in.
+        await sync_to_async(connections.close_all)()
+        return results, elapsed
+
+    def report(self, label, results, elapsed):
+        # Prints throughput and latency percentiles for one path.
+        latencies = sorted(latency for _, latency in results)
+        if not latencies:
+            raise CommandError(f"{label}: no requests completed.")
+        errors = sum(1 for status, _ in results if status != 200)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        self.stdout.write(
+            f"{label:<20} {len(results) / elapsed:8.1f} req/s   p50 {percentile(0.50):7.2f} ms   "
+            f"p99 {percentile(0.99):7.2f} ms   errors {errors}"
+        )
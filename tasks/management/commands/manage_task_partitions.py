@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.helpers.partitions import TaskPartitions
+
+class Command(BaseCommand):
+    # Maintains the monthly partitions of `tasks_task`: creates the coming months' partitions and retires
+    # the months past the retention period. Meant to run daily (e.g. from cron); a run with nothing to do
+    # only reads the catalog.
+    help = "Create upcoming task partitions and detach or drop expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.TASK_PARTITION_PREMAKE_MONTHS, help="Months to create ahead of the current one.")
+        parser.add_argument('--retain', type=int, default=settings.TASK_PARTITION_RETENTION_MONTHS, help="Months to keep before the current one (0 keeps all).")
+        parser.add_argument('--drop', action='store_true', help="Drop expired partitions instead of detaching them.")
+
+    def handle(self, *args, **options):
+        if options['ahead'] < 0 or options['retain'] < 0:
+            raise CommandError("--ahead and --retain must not be negative.")
+        created = TaskPartitions.ensure(options['ahead'])
+        retired = TaskPartitions.retire(options['retain'], drop=options['drop'])
+        self.stdout.write(f"Created {len(created)} partitions{': ' + ', '.join(created) if created else ''}.")
+        verb = "Dropped" if options['drop'] else "Detached"
+        self.stdout.write(f"{verb} {len(retired)} partitions{': ' + ', '.join(retired) if retired else ''}.")
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.helpers.changes import TaskChangeFeed
+
+class Command(BaseCommand):
+    # Deletes deletion tombstones past their retention. Delta-sync cursors older than the retention then
+    # get 410 Gone from `/tasks/changes/` and have to sync from the start.
+    help = "Prune task deletion tombstones older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_TOMBSTONE_RETENTION_DAYS, help="Tombstones to keep, in days.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError("--days must not be negative.")
+        deleted = TaskChangeFeed.prune(options['days'])
+        self.stdout.write(f"Pruned {deleted} task tombstones older than {options['days']} days.")
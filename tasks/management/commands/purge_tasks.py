@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tasks.helpers.deletion import TaskDeletion
+
+class Command(BaseCommand):
+    # Removes soft-deleted tasks for good, in small transactions with a pause between them, so it can run
+    # from cron next to live traffic.
+    help = "Purge tasks soft-deleted more than the purge age ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_PURGE_AFTER_DAYS, help="Purge tasks soft-deleted more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_PURGE_BATCH_SIZE, help="Tasks removed per transaction.")
+        parser.add_argument('--pause', type=float, default=settings.TASK_PURGE_PAUSE_SECONDS, help="Seconds to sleep between transactions.")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches (default: all).")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['pause'] < 0 or options['batch_size'] < 1 or (options['max_batches'] is not None and options['max_batches'] < 1):
+            raise CommandError("--days and --pause must not be negative, and --batch-size and --max-batches must be positive.")
+        purged = TaskDeletion.purge(options['days'], options['batch_size'], options['max_batches'], options['pause'])
+        self.stdout.write(f"Purged {purged} tasks soft-deleted more than {options['days']} days ago.")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from tasks.helpers.stats import TaskStats
+
+class Command(BaseCommand):
+    # Reconciles the TaskStat and TaskDueStat rollups with `tasks_task`: recounts every counter and rewrites
+    # the rollups, dropping the rows that fell to zero (drift comes from a TRUNCATE, a restore, or writes
+    # made with the triggers disabled).
+    help = "Rebuild the task statistics counters from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many counters are wrong.")
+
+    def handle(self, *args, **options):
+        buckets, wrong = TaskStats.rebuild(dry_run=options['dry_run'])
+        if not wrong:
+            self.stdout.write(f"All {buckets} task statistics counters are correct.")
+        elif options['dry_run']:
+            self.stdout.write(f"{wrong} of {buckets} task statistics counters are wrong.")
+        else:
+            self.stdout.write(f"Rebuilt {buckets} task statistics counters ({wrong} were wrong).")
@@ -0,0 +1,33 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from tasks.helpers.reminders import TaskReminderScheduler
+
+class Command(BaseCommand):
+    # Runs the due-date reminder scheduler, one tick every TASK_REMINDER_INTERVAL seconds. Several copies can
+    # run for availability: a tick that finds another one in progress is skipped.
+    help = "Send due-soon and overdue reminders for pending tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single tick and exit.")
+        parser.add_argument('--interval', type=float, default=settings.TASK_REMINDER_INTERVAL, help="Seconds between ticks.")
+        parser.add_argument('--max-batches', type=int, default=100, help="Batches per reminder kind and tick.")
+
+    def handle(self, *args, **options):
+        if options['interval'] <= 0 or options['max_batches'] < 1:
+            raise CommandError("--interval and --max-batches must be positive.")
+        scheduler = TaskReminderScheduler()
+        try:
+            while True:
+                close_old_connections()
+                sent = scheduler.tick(max_batches=options['max_batches'])
+                if sent is None:
+                    self.stdout.write("Another scheduler is running a tick; skipped.")
+                else:
+                    self.stdout.write(f"Sent {sent['due_soon']} due-soon and {sent['overdue']} overdue reminders.")
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
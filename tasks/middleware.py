@@ -0,0 +1,147 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+from django_ratelimit.middleware import RatelimitMiddleware as BaseRatelimitMiddleware
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+from tasks.helpers.metrics import TaskMetrics
+from tasks.helpers.profiling import TaskProfiler
+from tasks.helpers.ratelimit import is_ratelimited
+from tasks.helpers.replicas import TaskReplicas
+
+# Async-capable versions of the third-party middleware in MIDDLEWARE. Django runs the whole stack in
+# the mode of its least capable middleware, so a single sync-only middleware makes every async view
+# under ASGI hop through a thread and back. These keep the stack native in both WSGI and ASGI.
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    # Serves static files like WhiteNoise; other requests pass straight through without a thread hop.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class RatelimitMiddleware(BaseRatelimitMiddleware):
+    # Turns Ratelimited exceptions into RATELIMIT_VIEW responses and, when TASK_RATELIMIT_GLOBAL_RATE is
+    # set, applies that limit per user or IP to every request with one token bucket check.
+    sync_capable = True
+    async_capable = True
+    group = 'global'
+    message = {'detail': 'Rate limit exceeded. Try again later.'}
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def limited(self, request):
+        rate = settings.TASK_RATELIMIT_GLOBAL_RATE
+        return bool(rate) and is_ratelimited(request, group=self.group, key='user_or_ip', rate=rate, increment=True)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.limited(request):
+            return JsonResponse(self.message, status=429)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if settings.TASK_RATELIMIT_GLOBAL_RATE and await sync_to_async(self.limited)(request):
+            return JsonResponse(self.message, status=429)
+        return await self.get_response(request)
+
+
+class ReadYourWritesMiddleware:
+    # Pins a client's reads to the primary database for TASK_READ_YOUR_WRITES_SECONDS after each
+    # successful write, so replica lag never hides the client's own changes from it (see TaskReplicas).
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and TaskReplicas.enabled():
+            TaskReplicas.pin(response)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+
+class MetricsMiddleware:
+    # Instruments every request: records its latency, SQL query count and SQL time per route (see
+    # TaskMetrics), returns its phase timings as a `Server-Timing` header and traces it when it is slow
+    # (see TaskProfiler). It is the outermost middleware, so the latency covers the whole stack.
+    # Streamed responses are timed until their first byte is ready.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def enabled():
+        return settings.TASK_METRICS_ENABLED or settings.TASK_SERVER_TIMING_ENABLED
+
+    @staticmethod
+    def finish(request, response, seconds, timings, queries):
+        # Records the metrics and sets the header; returns whether the request should be traced.
+        if settings.TASK_METRICS_ENABLED:
+            TaskMetrics.observe_request(request, response, seconds, queries)
+        return settings.TASK_SERVER_TIMING_ENABLED and TaskProfiler.finish(request, response, seconds, timings, queries)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled():
+            return self.get_response(request)
+        started = time.perf_counter()
+        with TaskProfiler.profiling() as timings, TaskMetrics.tracking_queries() as queries:
+            response = self.get_response(request)
+        seconds = time.perf_counter() - started
+        if self.finish(request, response, seconds, timings, queries):
+            TaskProfiler.record(request, response, seconds, timings, queries)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled():
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with TaskProfiler.profiling() as timings, TaskMetrics.tracking_queries() as queries:
+            response = await self.get_response(request)
+        seconds = time.perf_counter() - started
+        if self.finish(request, response, seconds, timings, queries):
+            await sync_to_async(TaskProfiler.record)(request, response, seconds, timings, queries)
+        return response
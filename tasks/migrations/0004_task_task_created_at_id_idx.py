@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_auto_20250425_1241"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["created_at", "id"], name="task_created_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 17:52
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_task_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"], name="task_title_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_task_title_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Checkpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Checkpoint Name"
+                    ),
+                ),
+                (
+                    "state",
+                    models.JSONField(default=dict, verbose_name="Checkpoint State"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Last Updated At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Checkpoint",
+                "verbose_name_plural": "Checkpoints",
+            },
+        ),
+    ]
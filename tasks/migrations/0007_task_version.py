@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_checkpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="version",
+            field=models.PositiveIntegerField(default=1, verbose_name="Version"),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2 on 2026-10-17 18:19
+
+from django.db import migrations, models
+
+# Statement-level triggers with transition tables: each INSERT/UPDATE/DELETE statement, however many rows
+# it touches, applies one grouped upsert of count deltas to tasks_taskstat. Updates that leave every row
+# in its bucket (such as title edits) cancel out and write nothing.
+CREATE_TRIGGERS = """
+CREATE FUNCTION tasks_task_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    -- PL/pgSQL plans each statement when it first runs, so a branch may name a transition table
+    -- that only exists for its own operation.
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, count(*)
+        FROM new_rows GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, -count(*)
+        FROM old_rows GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, sum(delta)
+        FROM (
+            SELECT status, priority, due_date, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT status, priority, due_date, 1 AS delta FROM new_rows
+        ) AS changes
+        GROUP BY 1, 2, 3 HAVING sum(delta) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_task_stats_insert ON tasks_task;
+DROP TRIGGER IF EXISTS tasks_task_stats_update ON tasks_task;
+DROP TRIGGER IF EXISTS tasks_task_stats_delete ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_stats();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_task_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.CharField(max_length=20, verbose_name="Task Status")),
+                ("priority", models.IntegerField(verbose_name="Priority Level")),
+                (
+                    "due_date",
+                    models.DateField(blank=True, null=True, verbose_name="Due Day"),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="Task Count")),
+            ],
+            options={
+                "verbose_name": "Task Statistic",
+                "verbose_name_plural": "Task Statistics",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "Pending")),
+                fields=["due_date"],
+                name="task_pending_due_date_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskstat",
+            constraint=models.UniqueConstraint(
+                fields=("status", "priority", "due_date"),
+                name="task_stat_bucket_uniq",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.RunSQL(
+            """
+            CREATE TRIGGER tasks_task_stats_insert AFTER INSERT ON tasks_task
+                REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+            CREATE TRIGGER tasks_task_stats_update AFTER UPDATE ON tasks_task
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+            CREATE TRIGGER tasks_task_stats_delete AFTER DELETE ON tasks_task
+                REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+            INSERT INTO tasks_taskstat (status, priority, due_date, count)
+            SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, count(*)
+            FROM tasks_task GROUP BY 1, 2, 3;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
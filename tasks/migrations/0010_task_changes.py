@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-17 18:23
+
+from django.db import migrations, models
+
+# One tombstone per deleted task row, written by a statement-level trigger so bulk and queryset deletes
+# cost one INSERT ... SELECT. `clock_timestamp()` is the time of the delete itself rather than the start
+# of its transaction.
+CREATE_TRIGGER = """
+CREATE FUNCTION tasks_task_tombstones() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO tasks_tasktombstone (task_id, deleted_at) SELECT id, clock_timestamp() FROM old_rows;
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER tasks_task_tombstones AFTER DELETE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_tombstones();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS tasks_task_tombstones ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_tombstones();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_task_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.IntegerField(verbose_name="Task ID")),
+                ("deleted_at", models.DateTimeField(verbose_name="Deleted At")),
+            ],
+            options={
+                "verbose_name": "Task Tombstone",
+                "verbose_name_plural": "Task Tombstones",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["updated_at", "id"], name="task_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="task_tombstone_deleted_idx"
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_task_changes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="claimed_by",
+            field=models.CharField(
+                blank=True, max_length=255, null=True, verbose_name="Claimed By"
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Lease Expires At"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "Pending")),
+                fields=["-priority", "due_date", "id"],
+                name="task_pending_queue_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_task_queue"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_pending_due_date_idx",
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "Pending")),
+                fields=["due_date", "id"],
+                name="task_pending_due_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,216 @@
+# Generated by Django 5.2 on 2026-10-17 19:45
+
+from django.db import migrations, transaction
+
+# Monthly partitions created beyond the current month; `manage_task_partitions` keeps extending them.
+PREMAKE_MONTHS = 3
+
+# The existing table becomes this partition, holding every task created before the first monthly one.
+HISTORY = "tasks_task_history"
+HISTORY_CHECK = f"{HISTORY}_created_at_check"
+
+# The statistics and tombstone triggers of 0008 and 0010. Statement-level triggers on the partitioned
+# table see the rows of every partition in their transition tables.
+TRIGGERS = ["tasks_task_stats_insert", "tasks_task_stats_update", "tasks_task_stats_delete", "tasks_task_tombstones"]
+CREATE_TRIGGERS = """
+CREATE TRIGGER tasks_task_stats_insert AFTER INSERT ON tasks_task
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_task_stats_update AFTER UPDATE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_task_stats_delete AFTER DELETE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_task_tombstones AFTER DELETE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_tombstones();
+"""
+
+# Names the indexes Postgres created on each partition `<partition>_<index on tasks_task>`, so query
+# plans keep naming the model's indexes.
+NAME_PARTITION_INDEXES = """
+DO $$
+DECLARE
+    renamed record;
+BEGIN
+    FOR renamed IN
+        SELECT child.relname AS current, format('%s_%s', partition.relname, parent.relname) AS wanted
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_index child_index ON child_index.indexrelid = child.oid
+        JOIN pg_index parent_index ON parent_index.indexrelid = parent.oid
+        JOIN pg_class partition ON partition.oid = child_index.indrelid
+        WHERE parent_index.indrelid = 'tasks_task'::regclass
+          AND child.relname <> format('%s_%s', partition.relname, parent.relname)
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', renamed.current, renamed.wanted);
+    END LOOP;
+END;
+$$;
+"""
+
+
+def stored_columns(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    return ", ".join(schema_editor.quote_name(field.column) for field in Task._meta.local_fields if not field.generated)
+
+
+def create_months(cursor, first):
+    # One partition per UTC month from `first` to PREMAKE_MONTHS ahead, and a default partition for rows
+    # outside every partition.
+    cursor.execute(
+        """
+        SELECT month, month + interval '1 month' FROM generate_series(
+            %s::timestamptz, date_trunc('month', now(), 'UTC') + %s * interval '1 month', interval '1 month'
+        ) AS month
+        """,
+        [first, PREMAKE_MONTHS],
+    )
+    for start, end in cursor.fetchall():
+        cursor.execute(
+            f"CREATE TABLE tasks_task_p{start:%Y%m} PARTITION OF tasks_task FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    cursor.execute("CREATE TABLE tasks_task_default PARTITION OF tasks_task DEFAULT")
+
+
+def partition(apps, schema_editor):
+    # Turns `tasks_task` into a table range-partitioned by month of `created_at` without copying it: the
+    # existing table is attached as the partition `tasks_task_history` for every month up to the first
+    # monthly partition. Postgres requires the primary key of a partitioned table to include the
+    # partition key, so it becomes (id, created_at) (see Task). Identity columns on partitioned tables
+    # need Postgres 17, so `id` takes its values from an owned sequence instead.
+    #
+    # The migration runs in stages so that nothing proportional to the table size happens under a lock
+    # that blocks reads or writes. A failed run can be repeated from the start.
+    #  1. Add a CHECK bounding `created_at` below the first monthly partition, NOT VALID (a brief lock),
+    #     then validate it. Validation scans the table under SHARE UPDATE EXCLUSIVE, so reads and writes
+    #     carry on, and lets ATTACH PARTITION skip its own scan.
+    #  2. Build the (id, created_at) index of the new primary key with CREATE INDEX CONCURRENTLY.
+    #  3. In one short transaction under ACCESS EXCLUSIVE: swap the primary key onto that index, rename
+    #     the table and its indexes, create the partitioned table, attach the old one and create the
+    #     model's indexes on the parent, which adopt the matching indexes of the old table instead of
+    #     building them. An empty table is dropped instead, so new databases only have monthly partitions.
+    Task = apps.get_model("tasks", "Task")
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        # A day of margin keeps tasks created while the migration runs inside the CHECK near a month's end.
+        cursor.execute(
+            "SELECT date_trunc('month', greatest(now() + interval '1 day', max(created_at)), 'UTC') + interval '1 month' "
+            "FROM tasks_task"
+        )
+        cutoff = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE tasks_task DROP CONSTRAINT IF EXISTS {HISTORY_CHECK}")
+        cursor.execute(
+            f"ALTER TABLE tasks_task ADD CONSTRAINT {HISTORY_CHECK} CHECK (created_at IS NOT NULL AND created_at < %s) NOT VALID",
+            [cutoff],
+        )
+        cursor.execute(f"ALTER TABLE tasks_task VALIDATE CONSTRAINT {HISTORY_CHECK}")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {HISTORY}_tasks_task_pkey")
+        cursor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {HISTORY}_tasks_task_pkey ON tasks_task (id, created_at)")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE tasks_task IN ACCESS EXCLUSIVE MODE")
+        cursor.execute("SELECT COALESCE(max(id), 0) + 1, EXISTS (SELECT FROM tasks_task) FROM tasks_task")
+        next_id, keep = cursor.fetchone()
+        for trigger in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER {trigger} ON tasks_task")
+        cursor.execute("ALTER TABLE tasks_task DROP CONSTRAINT tasks_task_pkey")
+        cursor.execute(f"ALTER TABLE tasks_task ADD CONSTRAINT {HISTORY}_tasks_task_pkey PRIMARY KEY USING INDEX {HISTORY}_tasks_task_pkey")
+        cursor.execute("ALTER TABLE tasks_task ALTER COLUMN id DROP IDENTITY")
+        cursor.execute(f"ALTER TABLE tasks_task RENAME TO {HISTORY}")
+        cursor.execute(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+            [HISTORY],
+        )
+        for index, in cursor.fetchall():
+            cursor.execute(f"ALTER INDEX {index} RENAME TO {HISTORY}_{index}")
+
+        cursor.execute(
+            f"CREATE TABLE tasks_task (LIKE {HISTORY} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"ALTER TABLE tasks_task DROP CONSTRAINT {HISTORY_CHECK}")
+        cursor.execute("CREATE SEQUENCE tasks_task_id_seq AS integer OWNED BY tasks_task.id")
+        cursor.execute("ALTER TABLE tasks_task ALTER COLUMN id SET DEFAULT nextval('tasks_task_id_seq')")
+        cursor.execute("SELECT setval('tasks_task_id_seq', %s, false)", [next_id])
+        cursor.execute("ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_pkey PRIMARY KEY (id, created_at)")
+        if keep:
+            cursor.execute(f"ALTER TABLE tasks_task ATTACH PARTITION {HISTORY} FOR VALUES FROM (MINVALUE) TO (%s)", [cutoff])
+            cursor.execute(f"ALTER TABLE {HISTORY} DROP CONSTRAINT {HISTORY_CHECK}")
+            create_months(cursor, cutoff)
+        else:
+            cursor.execute(f"DROP TABLE {HISTORY}")
+            cursor.execute("SELECT date_trunc('month', now(), 'UTC')")
+            create_months(cursor, cursor.fetchone()[0])
+        for index in Task._meta.indexes:
+            schema_editor.add_index(Task, index)
+        cursor.execute(NAME_PARTITION_INDEXES)
+        cursor.execute(CREATE_TRIGGERS)
+
+
+def unpartition(apps, schema_editor):
+    # Turns `tasks_task` back into a plain table, reusing `tasks_task_history` when there is one: only
+    # the rows of the monthly partitions are copied into it. Its (id) primary key index is built
+    # concurrently beforehand, and the rest happens in one transaction under ACCESS EXCLUSIVE.
+    Task = apps.get_model("tasks", "Task")
+    connection = schema_editor.connection
+    columns = stored_columns(apps, schema_editor)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [HISTORY])
+        history = cursor.fetchone()[0]
+        if history:
+            cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS tasks_task_id_key")
+            cursor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY tasks_task_id_key ON {HISTORY} (id)")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE tasks_task IN ACCESS EXCLUSIVE MODE")
+        cursor.execute("SELECT COALESCE(max(id), 0) + 1 FROM tasks_task")
+        next_id = cursor.fetchone()[0]
+        if history:
+            cursor.execute(f"ALTER TABLE tasks_task DETACH PARTITION {HISTORY}")
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [HISTORY]
+            )
+            cursor.execute(f"ALTER TABLE {HISTORY} DROP CONSTRAINT {cursor.fetchone()[0]}")
+        else:
+            cursor.execute(
+                f"CREATE TABLE {HISTORY} (LIKE tasks_task INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+            )
+            cursor.execute(f"ALTER TABLE {HISTORY} ALTER COLUMN id DROP DEFAULT")
+        # The triggers are only created on the plain table, so the copy neither counts nor tombstones anything.
+        cursor.execute(f"INSERT INTO {HISTORY} ({columns}) SELECT {columns} FROM tasks_task")
+        # Also drops the `tasks_task_id_seq` sequence it owns.
+        cursor.execute("DROP TABLE tasks_task")
+        cursor.execute(f"ALTER TABLE {HISTORY} RENAME TO tasks_task")
+        if not history:
+            cursor.execute("CREATE UNIQUE INDEX tasks_task_id_key ON tasks_task (id)")
+        cursor.execute("ALTER TABLE tasks_task ADD CONSTRAINT tasks_task_pkey PRIMARY KEY USING INDEX tasks_task_id_key")
+        cursor.execute("ALTER TABLE tasks_task ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+        cursor.execute("SELECT setval(pg_get_serial_sequence('tasks_task', 'id'), %s, false)", [next_id])
+        if history:
+            prefix = f"{HISTORY}_"
+            cursor.execute(
+                "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = 'tasks_task'::regclass AND NOT i.indisprimary"
+            )
+            for index, in cursor.fetchall():
+                if index.startswith(prefix):
+                    cursor.execute(f"ALTER INDEX {index} RENAME TO {index[len(prefix):]}")
+        else:
+            for index in Task._meta.indexes:
+                schema_editor.add_index(Task, index)
+        cursor.execute(CREATE_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+    # The stages of `partition` and `unpartition` manage their own transactions, and CREATE INDEX
+    # CONCURRENTLY cannot run inside one.
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0012_task_reminders"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,198 @@
+# Generated by Django 5.2 on 2026-10-17 18:47
+
+import django.contrib.postgres.search
+import tasks.models
+from django.db import migrations, models
+
+# Live and archived tasks as one relation. The archive has no full-text column or lease, so its branch
+# computes `search_vector` with the expression of the generated column and leaves the lease empty.
+CREATE_VIEW = """
+CREATE VIEW tasks_task_with_archived AS
+SELECT id, created_at, updated_at, title, description, status, due_date, priority, version, claimed_by,
+       lease_expires_at, search_vector, NULL::timestamp with time zone AS archived_at
+FROM tasks_task
+UNION ALL
+SELECT id, created_at, updated_at, title, description, status, due_date, priority, version, NULL::varchar(255),
+       NULL::timestamp with time zone,
+       setweight(to_tsvector('english'::regconfig, COALESCE(title, '')::text), 'A')
+       || setweight(to_tsvector('english'::regconfig, COALESCE(description, '')), 'B'),
+       archived_at
+FROM tasks_archivedtask;
+"""
+
+# Archived tasks stay in the TaskStat rollup: the statistics triggers of `tasks_task` (0008) also count the
+# archive, so moving a task between the tables nets out to no change.
+CREATE_TRIGGERS = """
+CREATE TRIGGER tasks_archivedtask_stats_insert AFTER INSERT ON tasks_archivedtask
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_archivedtask_stats_update AFTER UPDATE ON tasks_archivedtask
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_archivedtask_stats_delete AFTER DELETE ON tasks_archivedtask
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_archivedtask_stats_insert ON tasks_archivedtask;
+DROP TRIGGER IF EXISTS tasks_archivedtask_stats_update ON tasks_archivedtask;
+DROP TRIGGER IF EXISTS tasks_archivedtask_stats_delete ON tasks_archivedtask;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0013_task_partitions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskWithArchived",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Last Updated At"),
+                ),
+                ("title", models.CharField(max_length=255, verbose_name="Task Title")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Task Description"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            (tasks.models.TaskStatus["PENDING"], "Pending"),
+                            (tasks.models.TaskStatus["COMPLETED"], "Completed"),
+                        ],
+                        default=tasks.models.TaskStatus["PENDING"],
+                        max_length=20,
+                        verbose_name="Task Status",
+                    ),
+                ),
+                (
+                    "due_date",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Due Date"
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(default=0, verbose_name="Priority Level"),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=1, verbose_name="Version"),
+                ),
+                (
+                    "claimed_by",
+                    models.CharField(
+                        blank=True, max_length=255, null=True, verbose_name="Claimed By"
+                    ),
+                ),
+                (
+                    "lease_expires_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Lease Expires At"
+                    ),
+                ),
+                (
+                    "search_vector",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=django.contrib.postgres.search.CombinedSearchVector(
+                            django.contrib.postgres.search.SearchVector(
+                                "title", config="english", weight="A"
+                            ),
+                            "||",
+                            django.contrib.postgres.search.SearchVector(
+                                "description", config="english", weight="B"
+                            ),
+                            django.contrib.postgres.search.SearchConfig("english"),
+                        ),
+                        output_field=django.contrib.postgres.search.SearchVectorField(),
+                        verbose_name="Search Vector",
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Archived At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task (Including Archived)",
+                "verbose_name_plural": "Tasks (Including Archived)",
+                "db_table": "tasks_task_with_archived",
+                "ordering": ["-created_at"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                ("title", models.CharField(max_length=255, verbose_name="Task Title")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Task Description"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            (tasks.models.TaskStatus["PENDING"], "Pending"),
+                            (tasks.models.TaskStatus["COMPLETED"], "Completed"),
+                        ],
+                        default=tasks.models.TaskStatus["PENDING"],
+                        max_length=20,
+                        verbose_name="Task Status",
+                    ),
+                ),
+                (
+                    "due_date",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Due Date"
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(default=0, verbose_name="Priority Level"),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=1, verbose_name="Version"),
+                ),
+                (
+                    "id",
+                    models.IntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(verbose_name="Last Updated At")),
+                ("archived_at", models.DateTimeField(verbose_name="Archived At")),
+            ],
+            options={
+                "verbose_name": "Archived Task",
+                "verbose_name_plural": "Archived Tasks",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["created_at", "id"], name="archived_task_created_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_VIEW, "DROP VIEW IF EXISTS tasks_task_with_archived;"),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,225 @@
+# Generated by Django 5.2 on 2026-10-17 18:55
+
+from functools import partial
+from django.db import migrations, models
+from django.db.backends.ddl_references import Table
+
+# Renames the indexes Postgres creates on each partition for a new index on `tasks_task` to
+# `<partition>_<index on tasks_task>`, as 0013 does. Only unmigrating needs it, when it re-creates the
+# pending indexes this migration replaces; create_partitioned_index() names its indexes itself.
+NAME_PARTITION_INDEXES = """
+DO $$
+DECLARE
+    renamed record;
+BEGIN
+    FOR renamed IN
+        SELECT child.relname AS current, format('%s_%s', partition.relname, parent.relname) AS wanted
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_index child_index ON child_index.indexrelid = child.oid
+        JOIN pg_index parent_index ON parent_index.indexrelid = parent.oid
+        JOIN pg_class partition ON partition.oid = child_index.indrelid
+        WHERE parent_index.indrelid = 'tasks_task'::regclass
+          AND child.relname <> format('%s_%s', partition.relname, parent.relname)
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', renamed.current, renamed.wanted);
+    END LOOP;
+END;
+$$;
+"""
+
+
+def create_partitioned_index(index, apps, schema_editor):
+    # Builds an index on `tasks_task` without blocking writes: an invalid index ON ONLY the parent, one
+    # `<partition>_<index>` built CONCURRENTLY on each partition, each attached to the parent, which
+    # turns valid once every partition has one. Partition indexes left invalid by a failed run are
+    # rebuilt and the valid ones kept, so the migration can be run again.
+    Task = apps.get_model("tasks", "Task")
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NULL", [index.name])
+        if cursor.fetchone()[0]:
+            parent = index.create_sql(Task, schema_editor)
+            parent.template = parent.template.replace(" ON %(table)s", " ON ONLY %(table)s")
+            cursor.execute(str(parent))
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'tasks_task'::regclass ORDER BY 1"
+        )
+        for partition, in cursor.fetchall():
+            name = f"{partition}_{index.name}"
+            cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [name])
+            valid = cursor.fetchone()
+            if valid is None or not valid[0]:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}")
+                statement = index.create_sql(Task, schema_editor, concurrently=True)
+                statement.parts.update(table=Table(partition, quote), name=quote(name))
+                cursor.execute(str(statement))
+            cursor.execute(f"ALTER INDEX {quote(index.name)} ATTACH PARTITION {quote(name)}")
+
+
+def drop_partitioned_index(index, apps, schema_editor):
+    # Dropping the parent index drops the partition indexes attached to it.
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(index.name)}")
+
+
+def add_partitioned_index(index):
+    # AddIndex for `tasks_task` that builds the index with create_partitioned_index(); the migration
+    # using it has to be non-atomic.
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunPython(partial(create_partitioned_index, index), partial(drop_partitioned_index, index)),
+        ],
+        state_operations=[migrations.AddIndex(model_name="task", index=index)],
+    )
+
+
+# Soft-deleted tasks leave the statistics and get their tombstone when they are marked, so purging them
+# later changes neither. `tasks_task_stats()` (0008) still counts the archive, which has no `deleted_at`.
+CREATE_TRIGGERS = """
+CREATE FUNCTION tasks_task_live_stats() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, count(*)
+        FROM new_rows WHERE deleted_at IS NULL GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, -count(*)
+        FROM old_rows WHERE deleted_at IS NULL GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO tasks_taskstat (status, priority, due_date, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, sum(delta)
+        FROM (
+            SELECT status, priority, due_date, -1 AS delta FROM old_rows WHERE deleted_at IS NULL
+            UNION ALL
+            SELECT status, priority, due_date, 1 AS delta FROM new_rows WHERE deleted_at IS NULL
+        ) AS changes
+        GROUP BY 1, 2, 3 HAVING sum(delta) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+DROP TRIGGER tasks_task_stats_insert ON tasks_task;
+DROP TRIGGER tasks_task_stats_update ON tasks_task;
+DROP TRIGGER tasks_task_stats_delete ON tasks_task;
+CREATE TRIGGER tasks_task_stats_insert AFTER INSERT ON tasks_task
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_live_stats();
+CREATE TRIGGER tasks_task_stats_update AFTER UPDATE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_live_stats();
+CREATE TRIGGER tasks_task_stats_delete AFTER DELETE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_live_stats();
+
+CREATE OR REPLACE FUNCTION tasks_task_tombstones() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO tasks_tasktombstone (task_id, deleted_at) SELECT id, clock_timestamp() FROM old_rows WHERE deleted_at IS NULL;
+    ELSE
+        -- Rows this update soft-deleted; empty for every other update.
+        INSERT INTO tasks_tasktombstone (task_id, deleted_at)
+        SELECT id, clock_timestamp() FROM (
+            SELECT id FROM new_rows WHERE deleted_at IS NOT NULL
+            EXCEPT
+            SELECT id FROM old_rows WHERE deleted_at IS NOT NULL
+        ) AS marked;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+CREATE TRIGGER tasks_task_soft_delete_tombstones AFTER UPDATE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_tombstones();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_task_soft_delete_tombstones ON tasks_task;
+CREATE OR REPLACE FUNCTION tasks_task_tombstones() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO tasks_tasktombstone (task_id, deleted_at) SELECT id, clock_timestamp() FROM old_rows;
+    RETURN NULL;
+END;
+$$;
+DROP TRIGGER tasks_task_stats_insert ON tasks_task;
+DROP TRIGGER tasks_task_stats_update ON tasks_task;
+DROP TRIGGER tasks_task_stats_delete ON tasks_task;
+CREATE TRIGGER tasks_task_stats_insert AFTER INSERT ON tasks_task
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_task_stats_update AFTER UPDATE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+CREATE TRIGGER tasks_task_stats_delete AFTER DELETE ON tasks_task
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_stats();
+DROP FUNCTION IF EXISTS tasks_task_live_stats();
+"""
+
+VIEW = """
+CREATE OR REPLACE VIEW tasks_task_with_archived AS
+SELECT id, created_at, updated_at, title, description, status, due_date, priority, version, claimed_by,
+       lease_expires_at, search_vector, NULL::timestamp with time zone AS archived_at
+FROM tasks_task{where}
+UNION ALL
+SELECT id, created_at, updated_at, title, description, status, due_date, priority, version, NULL::varchar(255),
+       NULL::timestamp with time zone,
+       setweight(to_tsvector('english'::regconfig, COALESCE(title, '')::text), 'A')
+       || setweight(to_tsvector('english'::regconfig, COALESCE(description, '')), 'B'),
+       archived_at
+FROM tasks_archivedtask;
+"""
+
+# Unmigrating drops `deleted_at`, so soft-deleted tasks are purged first, while the triggers above still
+# know they were already counted out and tombstoned.
+PURGE_SOFT_DELETED = "DELETE FROM tasks_task WHERE deleted_at IS NOT NULL;"
+
+
+class Migration(migrations.Migration):
+    # The indexes on `tasks_task` are built CONCURRENTLY, which cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0014_task_archive"),
+    ]
+
+    operations = [
+        migrations.RunSQL(migrations.RunSQL.noop, NAME_PARTITION_INDEXES),
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_pending_queue_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_pending_due_date_idx",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="deleted_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Deleted At"
+            ),
+        ),
+        add_partitioned_index(
+            models.Index(
+                condition=models.Q(("deleted_at__isnull", True), ("status", "Pending")),
+                fields=["due_date", "id"],
+                name="task_pending_due_date_idx",
+            ),
+        ),
+        add_partitioned_index(
+            models.Index(
+                condition=models.Q(("deleted_at__isnull", True), ("status", "Pending")),
+                fields=["-priority", "due_date", "id"],
+                name="task_pending_queue_idx",
+            ),
+        ),
+        add_partitioned_index(
+            models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at", "id"],
+                name="task_deleted_at_idx",
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.RunSQL(VIEW.format(where="\nWHERE deleted_at IS NULL"), VIEW.format(where="")),
+        migrations.RunSQL(migrations.RunSQL.noop, PURGE_SOFT_DELETED),
+    ]
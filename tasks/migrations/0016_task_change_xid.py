@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-17 19:04
+
+import django.db.models.functions.comparison
+from importlib import import_module
+from django.db import migrations, models
+
+soft_delete_migration = import_module("tasks.migrations.0015_task_soft_delete")
+
+# Every insert and every new version of a task records the ID of the transaction writing it. Changes then
+# reach `/tasks/changes/` in commit order: once a transaction ID is below the xmin of a snapshot, that
+# transaction has finished and no row can still appear with a lower ID.
+CREATE_TRIGGERS = """
+CREATE FUNCTION tasks_task_change_xid() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$;
+CREATE TRIGGER tasks_task_change_xid_insert BEFORE INSERT ON tasks_task
+    FOR EACH ROW EXECUTE FUNCTION tasks_task_change_xid();
+CREATE TRIGGER tasks_task_change_xid_update BEFORE UPDATE ON tasks_task
+    FOR EACH ROW WHEN (OLD.version IS DISTINCT FROM NEW.version) EXECUTE FUNCTION tasks_task_change_xid();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_task_change_xid_insert ON tasks_task;
+DROP TRIGGER IF EXISTS tasks_task_change_xid_update ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_change_xid();
+"""
+
+
+class Migration(migrations.Migration):
+    # The change index on `tasks_task` is built CONCURRENTLY, which cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0015_task_soft_delete"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="change_xid",
+            field=models.BigIntegerField(
+                default=0, editable=False, verbose_name="Change Transaction"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tasktombstone",
+            name="change_xid",
+            field=models.BigIntegerField(
+                db_default=django.db.models.functions.comparison.Cast(
+                    django.db.models.functions.comparison.Cast(
+                        models.Func(
+                            function="pg_current_xact_id",
+                            output_field=models.TextField(),
+                        ),
+                        models.TextField(),
+                    ),
+                    models.BigIntegerField(),
+                ),
+                verbose_name="Change Transaction",
+            ),
+        ),
+        soft_delete_migration.add_partitioned_index(
+            models.Index(fields=["change_xid", "id"], name="task_change_xid_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(
+                fields=["change_xid", "id"], name="task_tombstone_change_idx"
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2 on 2026-10-17 19:12
+
+from django.db import migrations, models
+
+# Counter rows per bucket. Changing it only needs the functions below recreated; readers sum every slot.
+SLOTS = 16
+
+# The statistics trigger functions of 0008 (the archive) and 0015 (`tasks_task`, which leaves out
+# soft-deleted tasks), adding to the slot of the writing transaction instead of one row per bucket.
+# Concurrent transactions mostly pick different slots, so they no longer queue on the row lock of a busy
+# bucket; the rows of one transaction keep the (status, priority, due day) lock order.
+STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    shard smallint := {shard};
+BEGIN
+    -- PL/pgSQL plans each statement when it first runs, so a branch may name a transition table
+    -- that only exists for its own operation.
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date{slot}, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END{shard_value}, count(*)
+        FROM new_rows{live} GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date{slot}) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO tasks_taskstat (status, priority, due_date{slot}, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END{shard_value}, -count(*)
+        FROM old_rows{live} GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date{slot}) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO tasks_taskstat (status, priority, due_date{slot}, count)
+        SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END{shard_value}, sum(delta)
+        FROM (
+            SELECT status, priority, due_date, -1 AS delta FROM old_rows{live}
+            UNION ALL
+            SELECT status, priority, due_date, 1 AS delta FROM new_rows{live}
+        ) AS changes
+        GROUP BY 1, 2, 3 HAVING sum(delta) <> 0 ORDER BY 1, 2, 3
+        ON CONFLICT (status, priority, due_date{slot}) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def stats_functions(sharded):
+    shard = f"pg_current_xact_id()::text::bigint % {SLOTS}" if sharded else "0"
+    slot, shard_value = (", slot", ", shard") if sharded else ("", "")
+    return "".join(
+        STATS_FUNCTION.format(name=name, live=live, shard=shard, slot=slot, shard_value=shard_value)
+        for name, live in (("tasks_task_stats", ""), ("tasks_task_live_stats", " WHERE deleted_at IS NULL"))
+    )
+
+
+# Unmigrating folds the slots of each bucket back into one row before the one-row-per-bucket
+# constraint returns.
+MERGE_SLOTS = """
+WITH merged AS (DELETE FROM tasks_taskstat RETURNING status, priority, due_date, count)
+INSERT INTO tasks_taskstat (status, priority, due_date, slot, count)
+SELECT status, priority, due_date, 0, sum(count) FROM merged GROUP BY 1, 2, 3;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0016_task_change_xid"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="taskstat",
+            name="task_stat_bucket_uniq",
+        ),
+        migrations.AddField(
+            model_name="taskstat",
+            name="slot",
+            field=models.SmallIntegerField(default=0, verbose_name="Counter Slot"),
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, MERGE_SLOTS),
+        migrations.AddConstraint(
+            model_name="taskstat",
+            constraint=models.UniqueConstraint(
+                fields=("status", "priority", "due_date", "slot"),
+                name="task_stat_bucket_slot_uniq",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.RunSQL(stats_functions(sharded=True), stats_functions(sharded=False)),
+    ]
@@ -0,0 +1,143 @@
+# Generated by Django 5.2 on 2026-10-17 19:22
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# The functions of 0017, restored when unmigrating.
+slots_migration = import_module("tasks.migrations.0017_taskstat_slots")
+SLOTS = slots_migration.SLOTS
+
+# The statistics trigger functions split each statement's count deltas between two rollups: per
+# (status, priority) in `tasks_taskstat`, and pending tasks per UTC due day in `tasks_taskduestat`. The
+# status and priority totals no longer grow with the number of due days, and the overdue count is one
+# range of the due-day rollup. Both keep the per-transaction slot of 0017 and write in key order.
+STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    shard smallint := pg_current_xact_id()::text::bigint % {slots};
+BEGIN
+    -- PL/pgSQL plans each statement when it first runs, so a branch may name a transition table
+    -- that only exists for its own operation.
+    IF TG_OP = 'INSERT' THEN
+        {insert}
+    ELSIF TG_OP = 'DELETE' THEN
+        {delete}
+    ELSE
+        {update}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+APPLY_CHANGES = """WITH changes AS ({changes}), totals AS (
+            INSERT INTO tasks_taskstat (status, priority, slot, count)
+            SELECT status, priority, shard, sum(delta) FROM changes
+            GROUP BY 1, 2 HAVING sum(delta) <> 0 ORDER BY 1, 2
+            ON CONFLICT (status, priority, slot) DO UPDATE SET count = tasks_taskstat.count + EXCLUDED.count
+        )
+        INSERT INTO tasks_taskduestat (due_date, slot, count)
+        SELECT (due_date AT TIME ZONE 'UTC')::date, shard, sum(delta) FROM changes
+        WHERE status = 'Pending' AND due_date IS NOT NULL
+        GROUP BY 1 HAVING sum(delta) <> 0 ORDER BY 1
+        ON CONFLICT (due_date, slot) DO UPDATE SET count = tasks_taskduestat.count + EXCLUDED.count;"""
+
+
+def stats_functions():
+    functions = []
+    for name, live in (("tasks_task_stats", ""), ("tasks_task_live_stats", " WHERE deleted_at IS NULL")):
+        added = f"SELECT status, priority, due_date, 1 AS delta FROM new_rows{live}"
+        removed = f"SELECT status, priority, due_date, -1 AS delta FROM old_rows{live}"
+        functions.append(STATS_FUNCTION.format(
+            name=name,
+            slots=SLOTS,
+            insert=APPLY_CHANGES.format(changes=added),
+            delete=APPLY_CHANGES.format(changes=removed),
+            update=APPLY_CHANGES.format(changes=f"{removed} UNION ALL {added}"),
+        ))
+    return "".join(functions)
+
+
+# Moves the due days of pending tasks into the new rollup, then folds the days out of `tasks_taskstat`.
+SPLIT_DUE_DAYS = """
+INSERT INTO tasks_taskduestat (due_date, slot, count)
+SELECT due_date, slot, sum(count) FROM tasks_taskstat
+WHERE status = 'Pending' AND due_date IS NOT NULL GROUP BY 1, 2 HAVING sum(count) <> 0;
+"""
+
+MERGE_DUE_DAYS = """
+WITH merged AS (DELETE FROM tasks_taskstat RETURNING status, priority, slot, count)
+INSERT INTO tasks_taskstat (status, priority, slot, count)
+SELECT status, priority, slot, sum(count) FROM merged GROUP BY 1, 2, 3 HAVING sum(count) <> 0;
+"""
+
+# Unmigrating recounts the (status, priority, due day) buckets of 0017 from the tasks, one slot each.
+RECOUNT = """
+DELETE FROM tasks_taskstat;
+INSERT INTO tasks_taskstat (status, priority, due_date, slot, count)
+SELECT status, priority, CASE WHEN status = 'Pending' THEN (due_date AT TIME ZONE 'UTC')::date END, 0, count(*)
+FROM (
+    SELECT status, priority, due_date FROM tasks_task WHERE deleted_at IS NULL
+    UNION ALL
+    SELECT status, priority, due_date FROM tasks_archivedtask
+) AS tasks
+GROUP BY 1, 2, 3;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0017_taskstat_slots"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDueStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("due_date", models.DateField(verbose_name="Due Day")),
+                (
+                    "slot",
+                    models.SmallIntegerField(default=0, verbose_name="Counter Slot"),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="Task Count")),
+            ],
+            options={
+                "verbose_name": "Task Due Day Statistic",
+                "verbose_name_plural": "Task Due Day Statistics",
+            },
+        ),
+        migrations.RunSQL(SPLIT_DUE_DAYS, migrations.RunSQL.noop),
+        migrations.RemoveConstraint(
+            model_name="taskstat",
+            name="task_stat_bucket_slot_uniq",
+        ),
+        migrations.RunSQL(MERGE_DUE_DAYS, RECOUNT),
+        migrations.RemoveField(
+            model_name="taskstat",
+            name="due_date",
+        ),
+        migrations.AddConstraint(
+            model_name="taskstat",
+            constraint=models.UniqueConstraint(
+                fields=("status", "priority", "slot"), name="task_stat_slot_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskduestat",
+            constraint=models.UniqueConstraint(
+                fields=("due_date", "slot"), name="task_due_stat_slot_uniq"
+            ),
+        ),
+        migrations.RunSQL(stats_functions(), slots_migration.stats_functions(sharded=True)),
+    ]
@@ -1,6 +1,13 @@
 from django.db import models
+from django.db.models import Func
+from django.db.models.functions import Cast
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from enum import Enum, StrEnum
 
+# ID of the current top-level transaction (`pg_current_xact_id()`, a 64-bit xid8) as a bigint.
+current_xid = Cast(Cast(Func(function='pg_current_xact_id', output_field=models.TextField()), models.TextField()), models.BigIntegerField())
+
 class TaskStatus(StrEnum):
     # Enum class for defining the possible statuses of a task.
     PENDING = 'Pending'
@@ -22,8 +29,12 @@ class BaseModel(models.Model):
         abstract = True
         verbose_name = "Base Fields"
 
-class Task(BaseModel):
-    # Model representing a Task.
+class AbstractTask(BaseModel):
+    # Abstract base model with the fields of a task, shared by live tasks (Task), archived ones
+    # (ArchivedTask) and the view over both (TaskWithArchived).
+
+    # Text search configuration of `search_vector`; full-text queries must use the same one.
+    search_config = 'english'
 
     title = models.CharField(max_length=255, verbose_name="Task Title", null=False)
     # `title`: CharField to store the title of the task.
@@ -43,13 +54,223 @@ class Task(BaseModel):
     # `due_date`: DateTimeField to store the task's due date and time.
     priority = models.IntegerField(default=0, verbose_name="Priority Level")
     # `priority`: IntegerField to store the task's priority level.
+    version = models.PositiveIntegerField(default=1, verbose_name="Version")
+    # `version`: Incremented by every write; exposed as the task's ETag for conditional requests.
+    claimed_by = models.CharField(max_length=255, null=True, blank=True, verbose_name="Claimed By")
+    # `claimed_by`: Worker holding the task's work-queue lease, if any (see TaskQueue).
+    lease_expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Lease Expires At")
+    # `lease_expires_at`: Database clock time after which the lease lapses and other workers may claim the task.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config=search_config)
+            + SearchVector('description', weight='B', config=search_config)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="Search Vector",
+    )
+    # `search_vector`: Stored tsvector of the title (weight A) and description (weight B), computed by
+    # Postgres on every write and indexed for full-text search.
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        # String representation of the Task object.
+        return f"{self.title} ({self.status})"
+
+class TaskManager(models.Manager):
+    # Default manager of Task: hides soft-deleted tasks (see TaskDeletion). The indexes of pending tasks,
+    # which the work queue and the reminder scheduler walk, are partial on `deleted_at IS NULL`, so those
+    # scans never step over deleted rows.
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+class Task(AbstractTask):
+    # Model representing a Task. Its table is range-partitioned by month of `created_at` (see TaskPartitions);
+    # the indexes below are created on every partition.
+    #
+    # Postgres requires the partition key in the primary key, so it is (id, created_at) and only keeps
+    # that pair unique: the database would accept two tasks with one ID and different creation times. IDs
+    # stay unique because new tasks take them from the `tasks_task_id_seq` sequence and nothing
+    # writes explicit IDs except TaskArchive.restore, which skips IDs a live task has under a per-ID
+    # advisory lock. Code that writes explicit IDs must do the same.
+
+    deleted_at = models.DateTimeField(null=True, blank=True, verbose_name="Deleted At")
+    # `deleted_at`: Set when the task is soft-deleted; `purge_tasks` removes the row later.
+    change_xid = models.BigIntegerField(default=0, editable=False, verbose_name="Change Transaction")
+    # `change_xid`: ID of the transaction that wrote the current version, stamped by a trigger (migration
+    # 0016) on every insert and version change; `/tasks/changes/` reads tasks in (change_xid, id) order.
+
+    objects = TaskManager()
+    all_objects = models.Manager()
+    # `all_objects`: Includes soft-deleted tasks.
 
     class Meta:
         # Meta class to define model-level options.
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
         ordering = ['-created_at']  # Orders tasks by the most recent ones first.
+        indexes = [
+            # Serves the default ordering and keyset pagination seeks on (created_at, id) in either direction.
+            models.Index(fields=['created_at', 'id'], name='task_created_at_id_idx'),
+            # Trigram index so title searches with the `%` operator don't scan the whole table.
+            GinIndex(fields=['title'], name='task_title_trgm_idx', opclasses=['gin_trgm_ops']),
+            # Answers full-text `@@` matches without reading the title or description.
+            GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+            # Counts the pending tasks that fell overdue today, the only part of the overdue statistic
+            # not served by TaskStat, and serves the reminder scheduler's (due_date, id) keyset scans.
+            models.Index(
+                fields=['due_date', 'id'], name='task_pending_due_date_idx',
+                condition=models.Q(status='Pending', deleted_at__isnull=True),
+            ),
+            # Serves the archive's walk through completed tasks in (updated_at, id) order.
+            models.Index(fields=['updated_at', 'id'], name='task_updated_at_id_idx'),
+            # Serves the `/tasks/changes/` delta feed, which seeks through tasks in (change_xid, id) order.
+            models.Index(fields=['change_xid', 'id'], name='task_change_xid_idx'),
+            # Work-queue order of pending tasks, so a claim reads the next candidates from the head of the
+            # index instead of sorting every pending task.
+            models.Index(
+                fields=['-priority', 'due_date', 'id'], name='task_pending_queue_idx',
+                condition=models.Q(status='Pending', deleted_at__isnull=True),
+            ),
+            # Soft-deleted tasks in the order `purge_tasks` removes them.
+            models.Index(fields=['deleted_at', 'id'], name='task_deleted_at_idx', condition=models.Q(deleted_at__isnull=False)),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Every save of an existing task is a new version of it.
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
+class ArchivedTask(AbstractTask):
+    # Completed task moved out of `tasks_task` by TaskArchive, so the hot table and its indexes only hold
+    # the tasks clients list. Rows keep their ID and timestamps and have no full-text column or lease;
+    # TaskArchive restores them as they were.
+
+    id = models.IntegerField(primary_key=True, verbose_name="ID")
+    created_at = models.DateTimeField(verbose_name="Created At")
+    updated_at = models.DateTimeField(verbose_name="Last Updated At")
+    search_vector = None
+    claimed_by = None
+    lease_expires_at = None
+    archived_at = models.DateTimeField(verbose_name="Archived At")
+    # `archived_at`: Database clock time the task was moved to the archive.
+
+    class Meta:
+        verbose_name = "Archived Task"
+        verbose_name_plural = "Archived Tasks"
+        ordering = ['-created_at']
+        indexes = [
+            # Serves `?include_archived=` listings, which merge both tables in (created_at, id) order.
+            models.Index(fields=['created_at', 'id'], name='archived_task_created_idx'),
+        ]
+
+class TaskWithArchived(AbstractTask):
+    # Read-only view (`tasks_task_with_archived`, migrations 0014 and 0015) of live and archived tasks as one
+    # relation, behind `?include_archived=`; soft-deleted tasks are left out. Filters on it reach the indexes
+    # of `tasks_task`; the archive branch computes `search_vector` on the fly. Columns added to AbstractTask
+    # must be added to the view.
+
+    archived_at = models.DateTimeField(null=True, blank=True, verbose_name="Archived At")
+    # `archived_at`: NULL for live tasks.
+
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_with_archived'
+        verbose_name = "Task (Including Archived)"
+        verbose_name_plural = "Tasks (Including Archived)"
+        ordering = ['-created_at']
+
+class TaskTombstone(models.Model):
+    # Record of a deleted task, so delta-sync clients of `/tasks/changes/` learn about removals.
+    # Database triggers on `tasks_task` write one per deleted or soft-deleted row, whichever code path
+    # deletes it; purging a soft-deleted task writes no second one.
+
+    task_id = models.IntegerField(verbose_name="Task ID")
+    # `task_id`: ID of the deleted task.
+
+    deleted_at = models.DateTimeField(verbose_name="Deleted At")
+    # `deleted_at`: Database clock time of the deletion; tombstones are pruned by it.
+    change_xid = models.BigIntegerField(db_default=current_xid, verbose_name="Change Transaction")
+    # `change_xid`: ID of the deleting transaction; the feed reads tombstones in (change_xid, id) order.
+
+    class Meta:
+        verbose_name = "Task Tombstone"
+        verbose_name_plural = "Task Tombstones"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='task_tombstone_deleted_idx'),
+            models.Index(fields=['change_xid', 'id'], name='task_tombstone_change_idx'),
+        ]
 
     def __str__(self):
-        # String representation of the Task object.
-        return f"{self.title} ({self.status})"
\ No newline at end of file
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
+
+class Checkpoint(models.Model):
+    # Model storing the progress of long-running task jobs (such as imports) so they can resume.
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Checkpoint Name")
+    # `name`: Unique name of the job the checkpoint belongs to.
+
+    state = models.JSONField(default=dict, verbose_name="Checkpoint State")
+    # `state`: Job-specific progress, saved in the same transaction as the work it describes.
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Last Updated At")
+
+    class Meta:
+        verbose_name = "Checkpoint"
+        verbose_name_plural = "Checkpoints"
+
+    def __str__(self):
+        return f"{self.name}: {self.state}"
+
+class TaskStat(models.Model):
+    # Counter rollup behind `/tasks/stats/`: the number of tasks per (status, priority), with TaskDueStat
+    # counting pending tasks per due day for the overdue figure. Database triggers on `tasks_task` and
+    # `tasks_archivedtask` keep both current in the same transaction as every insert, update and delete,
+    # including bulk writes, raw updates and COPY imports, so reading the statistics only touches these
+    # small tables. `rebuild_task_stats` recomputes them from scratch.
+    #
+    # Each counter is spread over up to 16 rows (`slot`), so concurrent writers to the same counter
+    # rarely queue on one row lock; readers add the slots up in SQL.
+
+    status = models.CharField(max_length=20, verbose_name="Task Status")
+    priority = models.IntegerField(verbose_name="Priority Level")
+
+    slot = models.SmallIntegerField(default=0, verbose_name="Counter Slot")
+    # `slot`: Counter row of the bucket. The triggers add to slot `transaction ID % 16` (see migrations
+    # 0017 and 0018), so all writes of one transaction land on the same rows.
+
+    count = models.BigIntegerField(default=0, verbose_name="Task Count")
+
+    class Meta:
+        verbose_name = "Task Statistic"
+        verbose_name_plural = "Task Statistics"
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'priority', 'slot'], name='task_stat_slot_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.status}/{self.priority}#{self.slot}: {self.count}"
+
+class TaskDueStat(models.Model):
+    # Counter rollup of pending tasks per UTC due day, kept by the same triggers as TaskStat. The overdue
+    # count sums the days before today in one range scan of the unique index.
+
+    due_date = models.DateField(verbose_name="Due Day")
+    slot = models.SmallIntegerField(default=0, verbose_name="Counter Slot")
+    # `slot`: Counter row of the day, as for TaskStat.
+    count = models.BigIntegerField(default=0, verbose_name="Task Count")
+
+    class Meta:
+        verbose_name = "Task Due Day Statistic"
+        verbose_name_plural = "Task Due Day Statistics"
+        constraints = [
+            models.UniqueConstraint(fields=['due_date', 'slot'], name='task_due_stat_slot_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.due_date}#{self.slot}: {self.count}"
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from tasks.helpers.replicas import TaskReplicas
+
+class TaskReplicaRouter:
+    # Database router for read replicas. Reads inside `TaskReplicas.reading()` go to the replica it
+    # chose; all other reads and every write go to the primary (`default`).
+
+    def db_for_read(self, model, **hints):
+        return TaskReplicas.current()
+
+    def db_for_write(self, model, **hints):
+        # Explicitly the primary: without a router answer Django would write an instance back to the
+        # database it was read from, which may be a replica.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows read from a replica are rows of the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema from the primary.
+        if db in settings.TASK_REPLICA_DATABASES:
+            return False
+        return None
@@ -1,3 +1,5 @@
+import functools
+from django.conf import settings
 from rest_framework import serializers
 from .models import Task, TaskStatus
 
@@ -9,4 +11,75 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         # The `Meta` class is used to configure the serializer's behavior.
         model = Task
-        fields = '__all__' # Include all fields in the serializer.
\ No newline at end of file
+        # Include all fields except the internal full-text index column, the work-queue lease, which
+        # only the claim endpoints report, the soft-delete mark of tasks the API no longer shows and the
+        # transaction ID the delta feed orders by.
+        exclude = ['search_vector', 'claimed_by', 'lease_expires_at', 'deleted_at', 'change_xid']
+        read_only_fields = ['version']  # Set by the server on every write.
+
+    # Fields only included when a sparse fieldset asks for them, read from annotations TaskQueryService adds.
+    optional_fields = {
+        'description_preview': lambda: serializers.CharField(read_only=True),
+    }
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # `fields` trims the task fields to a sparse fieldset (see `TaskQueryService.selected_fields`);
+        # other declared fields, such as a search `headline`, are kept.
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in self.selectable_fields():
+                if name not in fields:
+                    self.fields.pop(name, None)
+            for name in fields:
+                if name in self.optional_fields:
+                    self.fields[name] = self.optional_fields[name]()
+
+    @staticmethod
+    @functools.cache
+    def default_fields():
+        # Names of the task fields returned when no fieldset is requested.
+        return list(TaskSerializer().fields)
+
+    @classmethod
+    def selectable_fields(cls):
+        # Names accepted by `?fields=` and `?exclude=`.
+        return [*cls.default_fields(), *cls.optional_fields]
+
+class TaskSearchResultSerializer(TaskSerializer):
+    # A task found by full-text search, with the `ts_headline` snippet of its matching text.
+    headline = serializers.CharField(read_only=True)
+
+class TaskBulkDeleteSerializer(serializers.Serializer):
+    # Serializer for the IDs of a bulk delete request.
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        # Rejects batches larger than `TASK_BULK_MAX_ITEMS`.
+        if len(value) > settings.TASK_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f"Ensure this field has no more than {settings.TASK_BULK_MAX_ITEMS} elements.")
+        return value
+
+class TaskClaimSerializer(serializers.Serializer):
+    # Serializer for a work-queue claim: the worker, how many tasks it takes and for how long.
+    worker = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(min_value=1, default=1)
+    lease_seconds = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        # Rejects claims larger than `TASK_CLAIM_MAX_TASKS`.
+        if value > settings.TASK_CLAIM_MAX_TASKS:
+            raise serializers.ValidationError(f"Ensure this value is less than or equal to {settings.TASK_CLAIM_MAX_TASKS}.")
+        return value
+
+class TaskLeaseSerializer(serializers.Serializer):
+    # Serializer for a heartbeat or release of the tasks a worker has claimed.
+    worker = serializers.CharField(max_length=255)
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    lease_seconds = serializers.IntegerField(min_value=1, required=False)
+    completed = serializers.BooleanField(default=False)
+
+    def validate_ids(self, value):
+        # Rejects batches larger than `TASK_CLAIM_MAX_TASKS`.
+        if len(value) > settings.TASK_CLAIM_MAX_TASKS:
+            raise serializers.ValidationError(f"Ensure this field has no more than {settings.TASK_CLAIM_MAX_TASKS} elements.")
+        return value
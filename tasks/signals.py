@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from tasks.helpers.cache import TaskCache
+from tasks.models import Task
+
+# Any saved or deleted task invalidates the cached task responses.
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender, **kwargs):
+    TaskCache.bump()
@@ -0,0 +1,115 @@
+import io
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from tasks.helpers.archive import TaskArchive
+from tasks.helpers.stats import TaskStats
+from tasks.models import ArchivedTask, Checkpoint, Task, TaskStatus, TaskTombstone
+
+logger = logging.getLogger('django')
+
+# Test suite for archiving completed tasks to `tasks_archivedtask`.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class TaskArchiveTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for archive tests")
+        cache.clear()
+        self.live = Task.objects.create(title="Live Task")
+        self.recent = Task.objects.create(title="Recently Completed", status=TaskStatus.COMPLETED)
+        self.old = [self.task(f"Old Task {i}", days=100 + i) for i in range(3)]
+
+    def task(self, title, days, **fields):
+        task = Task.objects.create(title=title, status=TaskStatus.COMPLETED, **fields)
+        Task.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(days=days))
+        return task
+
+    # Test that only completed tasks older than the cutoff move, with tombstones and unchanged statistics.
+    def test_archive(self):
+        logger.info("Running test_archive")
+        pending = Task.objects.create(title="Old Pending Task")
+        Task.objects.filter(pk=pending.pk).update(updated_at=timezone.now() - timedelta(days=200))
+        stats = TaskStats.get()
+        self.assertEqual(TaskArchive.archive(days=90), 3)
+        self.assertEqual(set(ArchivedTask.objects.values_list('pk', flat=True)), {task.pk for task in self.old})
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)), {self.live.pk, self.recent.pk, pending.pk})
+        self.assertEqual(set(TaskTombstone.objects.values_list('task_id', flat=True)), {task.pk for task in self.old})
+        self.assertEqual(TaskStats.get(), stats)
+        self.assertEqual(TaskStats.rebuild(dry_run=True)[1], 0)
+        self.assertEqual(TaskArchive.archive(days=90), 0)
+
+    # Test that a run limited to some batches saves its position, and the next run resumes from it.
+    def test_batches_resume(self):
+        logger.info("Running test_batches_resume")
+        self.assertEqual(TaskArchive.archive(days=90, batch_size=2, max_batches=1), 2)
+        self.assertEqual(set(ArchivedTask.objects.values_list('pk', flat=True)), {self.old[2].pk, self.old[1].pk})  # Oldest first
+        self.assertIn('position', Checkpoint.objects.get(name=TaskArchive.checkpoint_name).state)
+        self.assertEqual(TaskArchive.archive(days=90, batch_size=2), 1)
+        self.assertNotIn('position', Checkpoint.objects.get(name=TaskArchive.checkpoint_name).state)
+
+    # Test that restoring moves a task back as a new version.
+    def test_restore(self):
+        logger.info("Running test_restore")
+        task = self.old[0]
+        TaskArchive.archive(days=90)
+        self.assertEqual(TaskArchive.restore([task.pk, 0]), [task.pk])
+        restored = Task.objects.get(pk=task.pk)
+        self.assertEqual((restored.title, restored.version), (task.title, task.version + 1))
+        self.assertFalse(ArchivedTask.objects.filter(pk=task.pk).exists())
+        self.assertEqual(TaskStats.rebuild(dry_run=True)[1], 0)
+
+    # Test that a task whose ID a live task already has stays archived instead of duplicating the ID.
+    def test_restore_skips_taken_id(self):
+        logger.info("Running test_restore_skips_taken_id")
+        now = timezone.now()
+        ArchivedTask.objects.create(
+            id=self.live.pk, title="Clashing Task", status=TaskStatus.COMPLETED,
+            created_at=now - timedelta(days=400), updated_at=now - timedelta(days=400), archived_at=now,
+        )
+        self.assertEqual(TaskArchive.restore([self.live.pk]), [])
+        self.assertEqual(Task.objects.filter(pk=self.live.pk).count(), 1)
+        response = self.client.post(reverse("task-restore", args=[self.live.pk]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(ArchivedTask.objects.filter(pk=self.live.pk).exists())
+
+    # Test that listings leave archived tasks out unless `include_archived` is set.
+    def test_list(self):
+        logger.info("Running test_list")
+        TaskArchive.archive(days=90)
+        for url in (reverse("task-list"), reverse("async-task-list")):
+            response = self.client.get(url)
+            self.assertEqual(response.json()['count'], 2)
+            response = self.client.get(url, {'include_archived': 'true'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['count'], 5)
+            self.assertEqual({task['id'] for task in response.json()['results']}, {self.live.pk, self.recent.pk, *(task.pk for task in self.old)})
+
+    # Test that archived tasks stay readable by ID but cannot be changed until restored.
+    def test_detail_and_restore_endpoint(self):
+        logger.info("Running test_detail_and_restore_endpoint")
+        task = self.old[0]
+        TaskArchive.archive(days=90)
+        for url in (reverse("task-detail", args=[task.pk]), reverse("async-task-detail", args=[task.pk])):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual((response.json()['title'], response['ETag']), (task.title, '"1"'))
+        response = self.client.patch(reverse("task-detail", args=[task.pk]), {"priority": 2}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse("task-restore", args=[task.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.json()['id'], response['ETag']), (task.pk, '"2"'))
+        response = self.client.post(reverse("task-restore", args=[task.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test the `archive_tasks` command.
+    def test_command(self):
+        logger.info("Running test_command")
+        out = io.StringIO()
+        call_command('archive_tasks', '--days', '90', stdout=out)
+        call_command('archive_tasks', '--restore', str(self.old[0].pk), stdout=out)
+        self.assertEqual(out.getvalue(), "Archived 3 completed tasks older than 90 days.\nRestored 1 of 1 tasks.\n")
@@ -0,0 +1,132 @@
+import io
+import json
+import logging
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from tasks.models import Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for the async task endpoints under /async/tasks/.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class AsyncTaskViewsTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for async view tests")
+        cache.clear()
+        self.list_url = reverse("async-task-list")
+        self.task = Task.objects.create(title="Async Task", description="Served on the event loop")
+        Task.objects.create(title="Another Async Task", status=TaskStatus.COMPLETED, priority=2)
+
+    def detail_url(self, pk):
+        return reverse("async-task-detail", args=[pk])
+
+    # Test that the async list returns the same body as the DRF list, including filters.
+    async def test_list_matches_sync_list(self):
+        logger.info("Running test_list_matches_sync_list")
+        for query in ("", "?page_size=1&page=2", "?search=Async&sort_by_date=false"):
+            response = await self.async_client.get(self.list_url + query)
+            expected = await self.async_client.get(reverse("task-list") + query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['results'], expected.json()['results'])
+            self.assertEqual(response.json()['count'], expected.json()['count'])
+
+    # Test that the async list falls back to TaskSerializer with the fast serializer turned off.
+    @override_settings(TASK_FAST_SERIALIZER_ENABLED=False)
+    async def test_list_without_fast_serializer(self):
+        logger.info("Running test_list_without_fast_serializer")
+        for query in ("", "?fields=id,title", "?search=Async&sort_by_date=false"):
+            response = await self.async_client.get(self.list_url + query)
+            expected = await self.async_client.get(reverse("task-list") + query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['results'], expected.json()['results'])
+
+    # Test that async list pages can be walked with cursor pagination.
+    async def test_list_cursor_pagination(self):
+        logger.info("Running test_list_cursor_pagination")
+        response = await self.async_client.get(self.list_url + "?pagination=cursor&page_size=1")
+        first = response.json()
+        self.assertNotIn('count', first)
+        second = (await self.async_client.get(first['next'])).json()
+        self.assertEqual(len(first['results']) + len(second['results']), 2)
+        self.assertNotEqual(first['results'][0]['id'], second['results'][0]['id'])
+
+    # Test that invalid filters and page numbers are rejected like the DRF list.
+    async def test_list_rejects_invalid_parameters(self):
+        logger.info("Running test_list_rejects_invalid_parameters")
+        response = await self.async_client.get(self.list_url + "?search_threshold=5")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search_threshold', response.json())
+        response = await self.async_client.get(self.list_url + "?page=99")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test retrieving a task and a missing task.
+    async def test_retrieve(self):
+        logger.info("Running test_retrieve")
+        response = await self.async_client.get(self.detail_url(self.task.pk))
+        self.assertEqual(response.json()['title'], "Async Task")
+        response = await self.async_client.get(self.detail_url(999999))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test creating a task, with validation errors for invalid data.
+    async def test_create(self):
+        logger.info("Running test_create")
+        response = await self.async_client.post(self.list_url, {"title": "Created Async", "priority": 4}, content_type='application/json')
+        logger.info(f"Response status: {response.status_code}, response data: {response.content}")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['status'], TaskStatus.PENDING)
+        self.assertTrue(await Task.objects.filter(title="Created Async", priority=4).aexists())
+
+        response = await self.async_client.post(self.list_url, {"status": "Unknown"}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('title', response.json())
+        response = await self.async_client.post(self.list_url, "not json", content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test a partial update, logged like the DRF endpoint.
+    async def test_partial_update(self):
+        logger.info("Running test_partial_update")
+        with self.assertLogs('tasks.audit', level='INFO') as logs:
+            response = await self.async_client.patch(
+                self.detail_url(self.task.pk), json.dumps({"status": TaskStatus.COMPLETED}), content_type='application/json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], TaskStatus.COMPLETED)
+        await self.task.arefresh_from_db()
+        self.assertEqual(self.task.status, TaskStatus.COMPLETED)
+        self.assertTrue(any('Partial update for Task: Async Task' in line for line in logs.output))
+
+    # Test deleting a task.
+    async def test_delete(self):
+        logger.info("Running test_delete")
+        response = await self.async_client.delete(self.detail_url(self.task.pk))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Task.objects.filter(pk=self.task.pk).aexists())
+        response = await self.async_client.delete(self.detail_url(self.task.pk))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that async deletes share the delete rate limit.
+    @override_settings(RATELIMIT_ENABLE=True)
+    async def test_delete_is_rate_limited(self):
+        logger.info("Running test_delete_is_rate_limited")
+        for _ in range(2):
+            await self.async_client.delete(self.detail_url(999999))
+        response = await self.async_client.delete(self.detail_url(self.task.pk))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+# Test suite for the `loadtest_tasks` management command. The worker threads use their own database
+# connections, so the seeded rows have to be committed.
+class LoadTestCommandTest(TransactionTestCase):
+    # Test that both paths are measured and the sample rows are removed.
+    def test_loadtest_reports_both_paths(self):
+        logger.info("Running test_loadtest_reports_both_paths")
+        stdout = io.StringIO()
+        call_command('loadtest_tasks', requests=10, concurrency=2, seed=3, endpoint='detail', stdout=stdout)
+        logger.info(f"Load test output: {stdout.getvalue()}")
+        self.assertIn("WSGI (TaskViewSet)", stdout.getvalue())
+        self.assertIn("ASGI (async views)", stdout.getvalue())
+        self.assertIn("errors 0", stdout.getvalue())
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,112 @@
+import io
+import json
+import logging
+import os
+import tempfile
+from unittest import mock
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from tasks.helpers.logger import AuditLogHandler, TaskLogger, audit_logger
+
+logger = logging.getLogger('django')
+
+# Test suite for the queued AuditLogHandler and the structured audit records.
+class AuditLogHandlerTest(SimpleTestCase):
+    def setUp(self):
+        logger.info("Setting up audit log file for handler tests")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'audit.log')
+        self.handler = AuditLogHandler(self.path, maxsize=100, batch_size=10, flush_interval=0.05)
+        self.logger = logging.getLogger('tasks.audit.test')
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+        self.directory.cleanup()
+
+    def read_entries(self):
+        with open(self.path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    # Test that records are written as JSON lines with their event and audit fields.
+    def test_writes_json_lines(self):
+        logger.info("Running test_writes_json_lines")
+        self.logger.info("Deleting Task: %s (ID: %s)", "Write report", 7, extra={'event': 'task.delete', 'audit': {'task_ids': [7]}})
+        self.handler.flush()
+        entry, = self.read_entries()
+        self.assertEqual(entry['event'], 'task.delete')
+        self.assertEqual(entry['message'], "Deleting Task: Write report (ID: 7)")
+        self.assertEqual(entry['task_ids'], [7])
+        self.assertEqual(entry['level'], 'INFO')
+
+    # Test that queued records are written in batches of at most `batch_size` lines.
+    def test_batches_writes(self):
+        logger.info("Running test_batches_writes")
+        with mock.patch.object(self.handler, 'write', wraps=self.handler.write) as write:
+            for index in range(25):
+                self.logger.info("Record %d", index)
+            self.handler.flush()
+        self.assertLessEqual(max(len(call.args[0]) for call in write.call_args_list), 10)
+        self.assertEqual([entry['message'] for entry in self.read_entries()], [f"Record {index}" for index in range(25)])
+
+    # Test that messages are formatted by the writer thread, not by the caller.
+    def test_formats_lazily(self):
+        logger.info("Running test_formats_lazily")
+        with mock.patch.object(self.handler, 'format', wraps=self.handler.format) as format_record:
+            emitted = []
+            with mock.patch.object(self.handler, 'run'):  # No writer thread: the record stays queued.
+                self.logger.info("Record %s", "queued")
+                emitted.append(format_record.call_count)
+            self.assertEqual(emitted, [0])
+            self.assertEqual(self.handler.stats()['queued'], 1)
+
+    # Test that a full queue drops and counts records instead of blocking, and the drops are noted in the file.
+    def test_drops_when_full(self):
+        logger.info("Running test_drops_when_full")
+        handler = AuditLogHandler(self.path, maxsize=2)
+        with mock.patch.object(handler, 'run'):
+            handler.start()
+            for index in range(5):
+                handler.handle(logging.makeLogRecord({'msg': f"Record {index}", 'levelno': logging.INFO, 'levelname': 'INFO'}))
+        self.assertEqual(handler.stats(), {'queued': 2, 'written': 0, 'dropped': 3})
+        handler.writer_pid = None  # Restart with a real writer thread.
+        handler.handle(logging.makeLogRecord({'msg': "After the drops", 'levelno': logging.INFO, 'levelname': 'INFO'}))
+        handler.close()
+        entries = self.read_entries()
+        self.assertEqual([entry['event'] for entry in entries], [None, 'audit.dropped'])
+        self.assertEqual(entries[-1]['count'], 3)
+
+    # Test that closing the handler, as `logging.shutdown()` does, writes every queued record.
+    def test_close_drains_queue(self):
+        logger.info("Running test_close_drains_queue")
+        for index in range(50):
+            self.logger.info("Record %d", index)
+        self.handler.close()
+        self.assertEqual(len(self.read_entries()), 50)
+        self.assertEqual(self.handler.stats()['written'], 50)
+
+
+# Test suite for the TaskLogger audit events and the audit log benchmark.
+class TaskAuditLogTest(TestCase):
+    # Test that TaskLogger events carry their event name and task IDs.
+    def test_task_logger_events(self):
+        logger.info("Running test_task_logger_events")
+        task = mock.Mock(id=3, title="Audited Task")
+        with self.assertLogs('tasks.audit', level='INFO') as logs:
+            TaskLogger.log_task_update(task)
+            TaskLogger.log_bulk_task_deletion([task])
+        self.assertEqual([record.event for record in logs.records], ['task.update', 'task.bulk_delete'])
+        self.assertEqual([record.audit['task_ids'] for record in logs.records], [[3], [3]])
+        self.assertEqual(logs.records[0].getMessage(), "Partial update for Task: Audited Task (ID: 3)")
+
+    # Test that the benchmark reports every handler and restores the audit logger.
+    def test_benchmark_runs(self):
+        logger.info("Running test_benchmark_runs")
+        handlers = audit_logger.handlers[:]
+        stdout = io.StringIO()
+        call_command('bench_audit_log', requests=5, stdout=stdout)
+        logger.info(f"Benchmark output: {stdout.getvalue()}")
+        self.assertEqual(stdout.getvalue().count('p99'), 3)
+        self.assertEqual(audit_logger.handlers, handlers)
@@ -0,0 +1,139 @@
+import logging
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.models import Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for the bulk create, update and delete endpoint.
+@override_settings(RATELIMIT_ENABLE=False)
+class TaskBulkTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for bulk tests")
+        cache.clear()
+        self.url = reverse("task-bulk")
+        self.task_1 = Task.objects.create(title="Bulk Task 1")
+        self.task_2 = Task.objects.create(title="Bulk Task 2")
+
+    # Test creating several tasks in one request with a single INSERT.
+    def test_bulk_create(self):
+        logger.info("Running test_bulk_create")
+        payload = [{"title": f"Imported Task {index}", "priority": index} for index in range(5)]
+        with self.assertLogs('tasks.audit', level='INFO') as logs:
+            response = self.client.post(self.url, payload, format='json')
+        logger.info(f"Response status: {response.status_code}, response data: {response.data}")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['data']['title'] for result in response.data['results']], [item['title'] for item in payload])
+        self.assertEqual(Task.objects.filter(title__startswith="Imported Task").count(), 5)
+        self.assertEqual(len([line for line in logs.output if 'Bulk creating' in line]), 1)
+
+    # Test that one invalid item rejects the whole batch and reports errors per item.
+    def test_bulk_create_rejects_invalid_batch(self):
+        logger.info("Running test_bulk_create_rejects_invalid_batch")
+        payload = [{"title": "Valid Task"}, {"status": "Unknown"}]
+        response = self.client.post(self.url, payload, format='json')
+        logger.info(f"Response status: {response.status_code}, response data: {response.data}")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('title', response.data['errors'][1])
+        self.assertFalse(Task.objects.filter(title="Valid Task").exists())
+
+    # Test that oversized batches are rejected.
+    @override_settings(TASK_BULK_MAX_ITEMS=2)
+    def test_bulk_create_rejects_oversized_batch(self):
+        logger.info("Running test_bulk_create_rejects_oversized_batch")
+        response = self.client.post(self.url, [{"title": "Task"}] * 3, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test updating several tasks in one request, with unknown IDs reported per item.
+    def test_bulk_update(self):
+        logger.info("Running test_bulk_update")
+        payload = [
+            {"id": self.task_1.id, "status": TaskStatus.COMPLETED},
+            {"id": self.task_2.id, "title": "Renamed Bulk Task", "priority": 4},
+            {"id": 999999, "title": "Missing"},
+        ]
+        with self.assertLogs('tasks.audit', level='INFO') as logs:
+            response = self.client.patch(self.url, payload, format='json')
+        logger.info(f"Response status: {response.status_code}, response data: {response.data}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 200, 404])
+        self.task_1.refresh_from_db()
+        self.task_2.refresh_from_db()
+        self.assertEqual(self.task_1.status, TaskStatus.COMPLETED)
+        self.assertEqual((self.task_2.title, self.task_2.priority), ("Renamed Bulk Task", 4))
+        self.assertGreater(self.task_2.updated_at, self.task_2.created_at)
+        self.assertEqual(len([line for line in logs.output if 'Bulk update' in line]), 1)
+
+    # Test that invalid update data rejects the whole batch.
+    def test_bulk_update_rejects_invalid_batch(self):
+        logger.info("Running test_bulk_update_rejects_invalid_batch")
+        payload = [{"id": self.task_1.id, "title": "Changed"}, {"id": self.task_2.id, "status": "Unknown"}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data['errors'][1])
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.title, "Bulk Task 1")
+
+    # Test that update items without an ID are rejected.
+    def test_bulk_update_requires_ids(self):
+        logger.info("Running test_bulk_update_requires_ids")
+        response = self.client.patch(self.url, [{"title": "No ID"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that a batch naming a task twice is rejected, naming the repeated IDs, and changes nothing.
+    def test_bulk_update_rejects_duplicate_ids(self):
+        logger.info("Running test_bulk_update_rejects_duplicate_ids")
+        payload = [{"id": self.task_1.id, "priority": 2}, {"id": self.task_2.id, "priority": 3}, {"id": self.task_1.id, "priority": 4}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'id': [f"Duplicate ids: {self.task_1.id}."]})
+        self.task_1.refresh_from_db()
+        self.assertEqual(self.task_1.version, 1)
+
+    # Test that a batch locks its tasks in ID order, whatever order the items come in.
+    def test_bulk_update_locks_in_id_order(self):
+        logger.info("Running test_bulk_update_locks_in_id_order")
+        payload = [{"id": self.task_2.id, "priority": 2}, {"id": self.task_1.id, "priority": 3}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [lock] = [query['sql'] for query in queries if query['sql'].endswith('FOR UPDATE')]
+        self.assertIn('ORDER BY "tasks_task"."id" ASC FOR UPDATE', lock)
+
+    # Test deleting several tasks in one request.
+    def test_bulk_delete(self):
+        logger.info("Running test_bulk_delete")
+        payload = {"ids": [self.task_1.id, self.task_2.id, 999999]}
+        with self.assertLogs('tasks.audit', level='INFO') as logs:
+            response = self.client.delete(self.url, payload, format='json')
+        logger.info(f"Response status: {response.status_code}, response data: {response.data}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['results']], [204, 204, 404])
+        self.assertFalse(Task.objects.filter(id__in=[self.task_1.id, self.task_2.id]).exists())
+        self.assertEqual(len([line for line in logs.output if 'Bulk deleting' in line]), 1)
+
+    # Test that bulk writes invalidate the cached task list.
+    def test_bulk_writes_invalidate_cache(self):
+        logger.info("Running test_bulk_writes_invalidate_cache")
+        list_url = reverse("task-list")
+        self.client.get(list_url)
+        self.client.post(self.url, [{"title": "Cache Busting Task"}], format='json')
+        response = self.client.get(list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 3)
+
+    # Test that bulk deletes count once against the delete rate limit.
+    @override_settings(RATELIMIT_ENABLE=True)
+    def test_bulk_delete_is_rate_limited_per_batch(self):
+        logger.info("Running test_bulk_delete_is_rate_limited_per_batch")
+        for _ in range(2):
+            response = self.client.delete(self.url, {"ids": [999999]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(self.url, {"ids": [self.task_1.id, self.task_2.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
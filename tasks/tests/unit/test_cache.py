@@ -0,0 +1,96 @@
+import logging
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.checks import check_task_cache
+from tasks.helpers.cache import TaskCache
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for the versioned task response cache.
+@override_settings(RATELIMIT_ENABLE=False)
+class TaskCacheTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for response cache tests")
+        cache.clear()
+        self.task = Task.objects.create(title="Cached Task")
+        self.url = reverse("task-list")
+
+    # Test that a repeated list request is served from the cache without touching the database.
+    def test_repeated_list_is_cached(self):
+        logger.info("Running test_repeated_list_is_cached")
+        first = self.client.get(self.url + "?page_size=5")
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url + "?page_size=5")
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    # Test that the key is built from normalized query parameters.
+    def test_query_parameter_order_is_normalized(self):
+        logger.info("Running test_query_parameter_order_is_normalized")
+        self.client.get(self.url + "?page_size=5&sort_by_date=true")
+        response = self.client.get(self.url + "?sort_by_date=true&page_size=5")
+        self.assertEqual(response['X-Cache'], 'HIT')
+        response = self.client.get(self.url + "?sort_by_date=false&page_size=5")
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    # Test that creating a task invalidates cached lists.
+    def test_create_invalidates_list(self):
+        logger.info("Running test_create_invalidates_list")
+        self.client.get(self.url)
+        self.client.post(self.url, {"title": "Fresh Task"})
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 2)
+
+    # Test that updating and deleting a task invalidate its cached detail response.
+    def test_update_and_delete_invalidate_retrieve(self):
+        logger.info("Running test_update_and_delete_invalidate_retrieve")
+        detail_url = reverse("task-detail", kwargs={"pk": self.task.id})
+        self.client.get(detail_url)
+        self.client.patch(detail_url, {"title": "Renamed Task"})
+        response = self.client.get(detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], "Renamed Task")
+        self.client.delete(detail_url)
+        response = self.client.get(detail_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that an explicit bump, as used by the bulk write paths, invalidates cached responses.
+    def test_bump_invalidates_bulk_writes(self):
+        logger.info("Running test_bump_invalidates_bulk_writes")
+        self.client.get(self.url)
+        Task.objects.filter(pk=self.task.pk).update(title="Bulk Renamed")
+        TaskCache.bump()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], "Bulk Renamed")
+
+    # Test that the hit/miss counters are exported.
+    def test_cache_stats(self):
+        logger.info("Running test_cache_stats")
+        before = self.client.get(reverse("task-cache-stats")).data
+        self.client.get(self.url)
+        self.client.get(self.url)
+        after = self.client.get(reverse("task-cache-stats")).data
+        logger.info(f"Cache stats before: {before}, after: {after}")
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    # Test that a per-process cache fails the system check and leaves responses uncached.
+    @override_settings(
+        TASK_CACHE_ENABLED=True, TASK_CACHE_ALIAS='local',
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}, 'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    def test_local_cache_is_refused(self):
+        logger.info("Running test_local_cache_is_refused")
+        self.assertEqual([error.id for error in check_task_cache(None)], ['tasks.E001'])
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Cache', response)
+        with self.settings(TASK_CACHE_ENABLED=False):
+            self.assertEqual(check_task_cache(None), [])
@@ -0,0 +1,122 @@
+import io
+import logging
+import threading
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from tasks.helpers.changes import TaskChangeFeed
+from tasks.helpers.pagination import encode_cursor
+from tasks.models import Task, TaskTombstone
+
+logger = logging.getLogger('django')
+
+# Test suite for the `/tasks/changes/` delta-sync feed and deletion tombstones. The feed only serves
+# committed transactions, so the rows have to be committed.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class TaskChangesTest(APITransactionTestCase):
+    def setUp(self):
+        logger.info("Setting up test data for delta-sync tests")
+        cache.clear()
+        self.tasks = [Task.objects.create(title=f"Sync Task {index}") for index in range(5)]
+        self.url = reverse("task-changes")
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def full_sync(self):
+        # Pages through the feed like a client would, returning the IDs received and the final cursor.
+        ids, since = [], None
+        while True:
+            page = self.sync(since, page_size=2)
+            ids += [task['id'] for task in page['changed']]
+            since = page['next']
+            if not page['has_more']:
+                return ids, since
+
+    # Test that a full sync pages through every task once, in the order they were written.
+    def test_full_sync(self):
+        logger.info("Running test_full_sync")
+        ids, since = self.full_sync()
+        self.assertEqual(ids, [task.id for task in self.tasks])
+        page = self.sync(since)
+        self.assertEqual((page['changed'], page['deleted'], page['has_more']), ([], [], False))
+        Task.objects.create(title="Later Task")
+        self.assertNotEqual(self.sync(since)['next'], since)  # Idle cursors move forward with new transactions
+
+    # Test that an incremental sync returns only updates and deletions made since the cursor.
+    def test_incremental_sync(self):
+        logger.info("Running test_incremental_sync")
+        _, since = self.full_sync()
+        self.client.patch(reverse("task-detail", args=[self.tasks[1].pk]), {"priority": 4}, format='json')
+        self.client.delete(reverse("task-detail", args=[self.tasks[2].pk]))
+        self.client.delete(reverse("task-bulk"), {"ids": [self.tasks[3].pk, self.tasks[4].pk]}, format='json')
+        with self.assertNumQueries(3):  # Tombstone horizon, tasks, tombstones
+            page = self.sync(since)
+        logger.info(f"Changes: {page}")
+        self.assertEqual([(task['id'], task['priority']) for task in page['changed']], [(self.tasks[1].id, 4)])
+        self.assertEqual(sorted(page['deleted']), [task.id for task in self.tasks[2:]])
+        self.assertEqual(self.sync(page['next'])['deleted'], [])
+
+    # Test that a transaction in flight holds back the changes committed after it started, until it commits.
+    def test_transaction_in_flight(self):
+        logger.info("Running test_transaction_in_flight")
+        _, since = self.full_sync()
+        pages = []
+
+        def write_and_sync():
+            try:
+                Task.objects.filter(pk=self.tasks[0].pk).update(title="Renamed Task", version=F('version') + 1)
+                pages.append(self.sync(since))
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            earlier = Task.objects.create(title="Long Transaction Task")
+            thread = threading.Thread(target=write_and_sync)
+            thread.start()
+            thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(pages[0]['changed'], [])  # The rename committed, but after the transaction started
+        changed = self.sync(pages[0]['next'])['changed']
+        self.assertEqual([task['id'] for task in changed], [earlier.id, self.tasks[0].id])
+
+    # Test that a change is delivered whatever `updated_at` it carries, such as an imported timestamp.
+    def test_backdated_change(self):
+        logger.info("Running test_backdated_change")
+        _, since = self.full_sync()
+        Task.objects.filter(pk=self.tasks[0].pk).update(
+            updated_at=timezone.now() - timedelta(days=365), version=F('version') + 1,
+        )
+        self.assertEqual([task['id'] for task in self.sync(since)['changed']], [self.tasks[0].id])
+
+    # Test that tampered cursors are rejected and cursors older than pruned tombstones expire.
+    def test_invalid_and_expired_cursors(self):
+        logger.info("Running test_invalid_and_expired_cursors")
+        response = self.client.get(self.url, {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'since': encode_cursor({'tx': ['x', 0], 'dx': [0, 0]}, TaskChangeFeed.cursor_salt)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        _, since = self.full_sync()
+        self.tasks[0].delete()
+        TaskTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        stdout = io.StringIO()
+        call_command('prune_task_tombstones', days=0, stdout=stdout)
+        self.assertIn("Pruned 1 task tombstones", stdout.getvalue())
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        # Cursors of the earlier timestamp-ordered feed expire too.
+        response = self.client.get(self.url, {'since': encode_cursor({'t': ['2026-01-01T00:00:00Z', 0], 'd': ['2026-01-01T00:00:00Z', 0]}, TaskChangeFeed.cursor_salt)})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
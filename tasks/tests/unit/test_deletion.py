@@ -0,0 +1,82 @@
+import io
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from tasks.helpers.deletion import TaskDeletion
+from tasks.helpers.queue import TaskQueue
+from tasks.helpers.stats import TaskStats
+from tasks.models import Task, TaskStatus, TaskTombstone
+
+logger = logging.getLogger('django')
+
+# Test suite for soft deletion and the purge of soft-deleted tasks.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False, TASK_SOFT_DELETE=True)
+class TaskDeletionTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for deletion tests")
+        cache.clear()
+        self.task = Task.objects.create(title="Doomed Task", priority=3)
+        self.other = Task.objects.create(title="Surviving Task")
+
+    def delete_days_ago(self, tasks, days):
+        Task.all_objects.filter(pk__in=[task.pk for task in tasks]).update(deleted_at=timezone.now() - timedelta(days=days))
+
+    # Test that deleting a task hides it, takes it out of the statistics and writes one tombstone.
+    def test_soft_delete(self):
+        logger.info("Running test_soft_delete")
+        total = TaskStats.get()['total']
+        for url in (reverse("task-detail", args=[self.task.pk]), reverse("async-task-detail", args=[self.other.pk])):
+            self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+            response = self.client.patch(url, {"priority": 1}, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse("task-list"), {'include_archived': 'true'}).json()['count'], 0)
+        deleted = Task.all_objects.get(pk=self.task.pk)
+        self.assertIsNotNone(deleted.deleted_at)
+        self.assertEqual(deleted.version, 2)
+        self.assertEqual(TaskStats.get()['total'], total - 2)
+        self.assertEqual(sorted(TaskTombstone.objects.values_list('task_id', flat=True)), [self.task.pk, self.other.pk])
+        self.assertEqual(TaskStats.rebuild(dry_run=True)[1], 0)
+
+    # Test that bulk deletes are soft too, and hard deletes remain available.
+    def test_bulk_and_hard_delete(self):
+        logger.info("Running test_bulk_and_hard_delete")
+        response = self.client.delete(reverse("task-bulk"), {"ids": [self.task.pk]}, content_type='application/json')
+        self.assertEqual(response.json()['results'], [{'id': self.task.pk, 'status': status.HTTP_204_NO_CONTENT}])
+        self.assertTrue(Task.all_objects.filter(pk=self.task.pk).exists())
+        with self.settings(TASK_SOFT_DELETE=False):
+            self.assertEqual(TaskDeletion.delete(Task.objects.filter(pk=self.other.pk)), 1)
+        self.assertFalse(Task.all_objects.filter(pk=self.other.pk).exists())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+
+    # Test that soft-deleted tasks cannot be claimed from the work queue.
+    def test_queue_skips_deleted(self):
+        logger.info("Running test_queue_skips_deleted")
+        TaskDeletion.delete(Task.objects.filter(pk=self.task.pk))
+        self.assertEqual([task.pk for task in TaskQueue("worker").claim(10)], [self.other.pk])
+
+    # Test that purging removes old soft-deleted tasks in batches, leaving statistics and tombstones alone.
+    def test_purge(self):
+        logger.info("Running test_purge")
+        old = [Task.objects.create(title=f"Old Deleted Task {i}") for i in range(3)]
+        self.delete_days_ago(old, 10)
+        self.delete_days_ago([self.task], 1)
+        stats, tombstones = TaskStats.get(), TaskTombstone.objects.count()
+        self.assertEqual(TaskDeletion.purge(days=7, batch_size=2, max_batches=1, pause=0), 2)
+        self.assertEqual(TaskDeletion.purge(days=7, batch_size=2, pause=0), 1)
+        self.assertEqual(set(Task.all_objects.values_list('pk', flat=True)), {self.task.pk, self.other.pk})
+        self.assertEqual((TaskStats.get(), TaskTombstone.objects.count()), (stats, tombstones))
+        self.assertEqual(TaskStats.rebuild(dry_run=True)[1], 0)
+
+    # Test the `purge_tasks` command.
+    def test_command(self):
+        logger.info("Running test_command")
+        self.delete_days_ago([self.task], 10)
+        out = io.StringIO()
+        call_command('purge_tasks', '--days', '7', '--pause', '0', stdout=out)
+        self.assertEqual(out.getvalue(), "Purged 1 tasks soft-deleted more than 7 days ago.\n")
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import logging
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.helpers.export import TaskExporter
+from tasks.models import Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for the streaming task export.
+class TaskExportTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for export tests")
+        self.url = reverse("task-export")
+        Task.objects.create(title="Export Report", description="Quarterly, \"final\" numbers")
+        Task.objects.create(title="Export Slides", status=TaskStatus.COMPLETED, priority=2)
+        Task.objects.create(title="Plan Offsite")
+
+    # Reads the full body of a streamed response.
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    # Test that NDJSON export matches the API representation of every task.
+    def test_export_ndjson(self):
+        logger.info("Running test_export_ndjson")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        expected = self.client.get(reverse("task-list")).json()['results']
+        logger.info(f"Exported records: {records}")
+        self.assertEqual(records, expected)
+
+    # Test that CSV export writes a header row and one row per task.
+    def test_export_csv(self):
+        logger.info("Running test_export_csv")
+        response = self.client.get(self.url + "?export_format=csv&sort_by_date=false")
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        logger.info(f"Exported rows: {rows}")
+        self.assertEqual(rows[0][:2], ['id', 'status'])
+        self.assertEqual([row[rows[0].index('title')] for row in rows[1:]], ["Export Report", "Export Slides", "Plan Offsite"])
+        self.assertEqual(rows[1][rows[0].index('description')], 'Quarterly, "final" numbers')
+
+    # Test that the export applies the same filters as the list endpoint.
+    def test_export_applies_filters(self):
+        logger.info("Running test_export_applies_filters")
+        response = self.client.get(self.url + "?search=Export")
+        titles = {json.loads(line)['title'] for line in self.read(response).splitlines()}
+        self.assertEqual(titles, {"Export Report", "Export Slides"})
+
+    # Test that the export is chunked rather than built in memory.
+    def test_export_streams_in_chunks(self):
+        logger.info("Running test_export_streams_in_chunks")
+        exporter = TaskExporter(Task.objects.order_by('id'))
+        exporter.rows_per_flush = 1
+        chunks = list(exporter.stream('ndjson'))
+        self.assertEqual(len(chunks), 3)
+
+    # Test that an unknown export format is rejected.
+    def test_export_rejects_unknown_format(self):
+        logger.info("Running test_export_rejects_unknown_format")
+        response = self.client.get(self.url + "?export_format=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,84 @@
+import logging
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.helpers.service import TaskQueryService
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for sparse fieldsets (`?fields=`/`?exclude=`) and the `description_preview` field.
+@override_settings(
+    RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False, TASK_COUNT_ESTIMATE_THRESHOLD=0, TASK_DESCRIPTION_PREVIEW_LENGTH=10
+)
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for sparse fieldset tests")
+        cache.clear()
+        self.long = Task.objects.create(title="Long", description="A description well past ten characters")
+        self.short = Task.objects.create(title="Short", description="Brief")
+        self.url = reverse("task-list")
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, [query['sql'] for query in queries]
+
+    # Test that `fields` trims the response and the description column is not read.
+    def test_fields(self):
+        logger.info("Running test_fields")
+        data, queries = self.get(self.url, fields='id,title,status')
+        self.assertEqual([list(task) for task in data['results']], [['id', 'status', 'title']] * 2)  # Serializer order
+        self.assertFalse(any('"description"' in sql for sql in queries))
+
+    # Test that `exclude` removes fields from the default set.
+    def test_exclude(self):
+        logger.info("Running test_exclude")
+        data, queries = self.get(self.url, exclude='description,due_date')
+        self.assertNotIn('description', data['results'][0])
+        self.assertIn('version', data['results'][0])
+        self.assertFalse(any('"description"' in sql for sql in queries))
+
+    # Test the SQL-computed preview, identical on both serializer paths.
+    def test_description_preview(self):
+        logger.info("Running test_description_preview")
+        data, _ = self.get(self.url, fields='title,description_preview')
+        previews = {task['title']: task['description_preview'] for task in data['results']}
+        self.assertEqual(previews, {'Long': "A descript…", 'Short': "Brief"})
+        with self.settings(TASK_FAST_SERIALIZER_ENABLED=False):
+            slow, queries = self.get(self.url, fields='title,description_preview')
+        self.assertEqual(slow['results'], data['results'])
+        self.assertEqual(len(queries), 2)  # Count and page; no deferred field loads
+
+    # Test that a list parses the fieldset for its serializers once, even when it builds two of them.
+    @override_settings(TASK_FAST_SERIALIZER_ENABLED=False)
+    def test_fields_parsed_once(self):
+        logger.info("Running test_fields_parsed_once")
+        with mock.patch.object(TaskQueryService, 'parse_params', autospec=True, side_effect=TaskQueryService.parse_params) as parse:
+            data, _ = self.get(self.url, fields='id,title')
+        self.assertEqual([list(task) for task in data['results']], [['id', 'title']] * 2)
+        self.assertEqual(parse.call_count, 1)  # Not again for the page serializer
+
+    # Test that keyset pagination works when the ordering columns are not selected.
+    def test_cursor_pagination(self):
+        logger.info("Running test_cursor_pagination")
+        first, _ = self.get(self.url, fields='title', pagination='cursor', page_size=1)
+        second = self.client.get(first['next']).data
+        self.assertEqual([first['results'], second['results']], [[{'title': 'Short'}], [{'title': 'Long'}]])
+
+    # Test sparse retrieval, the async list, and rejection of unknown field names.
+    def test_retrieve_async_and_invalid(self):
+        logger.info("Running test_retrieve_async_and_invalid")
+        data, _ = self.get(reverse("task-detail", args=[self.long.pk]), fields='title,description_preview')
+        self.assertEqual(data, {'title': "Long", 'description_preview': "A descript…"})
+        response = self.client.get(reverse("async-task-list"), {'fields': 'id,title'})
+        self.assertEqual([list(task) for task in response.json()['results']], [['id', 'title']] * 2)
+        response = self.client.get(self.url, {'fields': 'title,search_vector'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
@@ -0,0 +1,97 @@
+import io
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from django.core.management import call_command
+from django.test import TestCase
+from tasks.models import Checkpoint, Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for the `import_tasks` management command.
+class ImportTasksCommandTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test files for import tests")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Writes an input file and returns its path.
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    # Runs the command and returns its (stdout, stderr).
+    def run_import(self, *args, **options):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_tasks', *args, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    # Test importing NDJSON, keeping provided timestamps and skipping invalid rows.
+    def test_import_ndjson(self):
+        logger.info("Running test_import_ndjson")
+        lines = [
+            {"title": "Imported One", "priority": 2, "created_at": "2024-03-01T10:00:00Z"},
+            {"title": "Imported Two", "status": TaskStatus.COMPLETED, "due_date": "2025-04-25T12:00:00Z"},
+            {"status": "Unknown"},
+            "not json",
+        ]
+        path = self.write('tasks.ndjson', "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines))
+        stdout, stderr = self.run_import(path, batch_size=1)
+        logger.info(f"Import output: {stdout} {stderr}")
+        self.assertIn("Imported 2 rows, skipped 2 invalid rows", stdout)
+        self.assertIn("rows/s", stdout)
+        self.assertIn("Line 3", stderr)
+        self.assertIn("Line 4", stderr)
+
+        first = Task.objects.get(title="Imported One")
+        self.assertEqual(first.created_at, datetime(2024, 3, 1, 10, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(first.updated_at, first.created_at)
+        self.assertEqual((first.priority, first.status, first.description), (2, TaskStatus.PENDING, ""))
+        second = Task.objects.get(title="Imported Two")
+        self.assertEqual(second.status, TaskStatus.COMPLETED)
+        self.assertEqual(second.due_date, datetime(2025, 4, 25, 12, 0, tzinfo=dt_timezone.utc))
+
+    # Test importing CSV, where empty cells fall back to the defaults.
+    def test_import_csv(self):
+        logger.info("Running test_import_csv")
+        path = self.write('tasks.csv', 'title,description,priority,due_date\n"Quoted, Title","Says ""hi""",3,\nPlain,,,\n')
+        stdout, _ = self.run_import(path)
+        self.assertIn("Imported 2 rows", stdout)
+        quoted = Task.objects.get(title="Quoted, Title")
+        self.assertEqual((quoted.description, quoted.priority, quoted.due_date), ('Says "hi"', 3, None))
+        self.assertEqual(Task.objects.get(title="Plain").priority, 0)
+
+    # Test that a dry run validates without writing rows or checkpoints.
+    def test_dry_run(self):
+        logger.info("Running test_dry_run")
+        path = self.write('tasks.ndjson', json.dumps({"title": "Dry Run"}) + "\n")
+        stdout, _ = self.run_import(path, dry_run=True)
+        self.assertIn("Validated 1 rows", stdout)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(Checkpoint.objects.exists())
+
+    # Test that a rerun resumes from the checkpoint instead of importing rows twice.
+    def test_resume_from_checkpoint(self):
+        logger.info("Running test_resume_from_checkpoint")
+        path = self.write('tasks.ndjson', "".join(json.dumps({"title": f"Resumable {index}"}) + "\n" for index in range(5)))
+        self.run_import(path, checkpoint='resume-test', batch_size=2)
+        self.assertEqual(Checkpoint.objects.get(name='import_tasks:resume-test').state, {'records': 5})
+
+        with open(path, 'a', encoding='utf-8') as stream:
+            stream.write(json.dumps({"title": "Resumable 5"}) + "\n")
+        stdout, _ = self.run_import(path, checkpoint='resume-test')
+        self.assertIn("skipping 5", stdout)
+        self.assertEqual(Task.objects.filter(title__startswith="Resumable").count(), 6)
+
+    # Test reading NDJSON from stdin.
+    def test_import_from_stdin(self):
+        logger.info("Running test_import_from_stdin")
+        stdin = io.StringIO(json.dumps({"title": "From Stdin"}) + "\n")
+        self.run_import('-', stdin=stdin, checkpoint='stdin-test')
+        self.assertTrue(Task.objects.filter(title="From Stdin").exists())
@@ -0,0 +1,100 @@
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Increments a counter in two forked workers, then prints the aggregated `/metrics` text.
+MULTIPROCESS_SCRIPT = """
+import os, django
+django.setup()
+from tasks.helpers.metrics import TaskMetrics
+for _ in range(2):
+    pid = os.fork()
+    if pid == 0:
+        TaskMetrics.cache_requests.labels('list', 'hit').inc()
+        os._exit(0)
+    os.waitpid(pid, 0)
+print(TaskMetrics.export().decode())
+"""
+
+def sample(name, **labels):
+    # Current value of a metric sample, 0 before its first observation.
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+# Test suite for the Prometheus metrics and the `/metrics` endpoint.
+@override_settings(RATELIMIT_ENABLE=False)
+class TaskMetricsTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for metrics tests")
+        cache.clear()
+        self.task = Task.objects.create(title="Measured Task")
+
+    # Test that a request records its latency, query count and SQL time under its route.
+    def test_request_metrics(self):
+        logger.info("Running test_request_metrics")
+        labels = {'method': 'GET', 'route': 'task-detail', 'status': '200'}
+        requests = sample('tasks_http_request_duration_seconds_count', **labels)
+        queries = sample('tasks_db_queries_per_request_sum', route='task-detail')
+        with self.settings(TASK_CACHE_ENABLED=False), self.assertNumQueries(1):
+            self.client.get(reverse("task-detail", args=[self.task.pk]))
+        self.assertEqual(sample('tasks_http_request_duration_seconds_count', **labels), requests + 1)
+        self.assertEqual(sample('tasks_db_queries_per_request_sum', route='task-detail'), queries + 1)
+        self.assertGreater(sample('tasks_db_query_duration_seconds_per_request_sum', route='task-detail'), 0)
+
+        async_queries = sample('tasks_db_queries_per_request_sum', route='async-task-list')
+        self.client.get(reverse("async-task-list"))
+        self.assertGreater(sample('tasks_db_queries_per_request_sum', route='async-task-list'), async_queries)
+
+    # Test cache hits and misses, serializer timings and rate limit rejections.
+    def test_event_metrics(self):
+        logger.info("Running test_event_metrics")
+        hits, misses = (sample('tasks_cache_requests_total', action='list', result=result) for result in ('hit', 'miss'))
+        rows, model = (sample('tasks_serializer_duration_seconds_count', serializer=kind) for kind in ('rows', 'model'))
+        self.client.get(reverse("task-list"))
+        self.client.get(reverse("task-list"))
+        with self.settings(TASK_CACHE_ENABLED=False, TASK_FAST_SERIALIZER_ENABLED=False):
+            self.client.get(reverse("task-list"))
+        self.assertEqual(sample('tasks_cache_requests_total', action='list', result='hit'), hits + 1)
+        self.assertEqual(sample('tasks_cache_requests_total', action='list', result='miss'), misses + 1)
+        self.assertEqual(sample('tasks_serializer_duration_seconds_count', serializer='rows'), rows + 1)
+        self.assertEqual(sample('tasks_serializer_duration_seconds_count', serializer='model'), model + 1)
+
+        rejections = sample('tasks_ratelimit_rejections_total', group='update-task')
+        with self.settings(RATELIMIT_ENABLE=True):
+            codes = [self.client.patch(reverse("task-detail", args=[self.task.pk]), {"priority": 1}, format='json').status_code for _ in range(3)]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(sample('tasks_ratelimit_rejections_total', group='update-task'), rejections + 1)
+
+    # Test that `/metrics` serves the Prometheus text format.
+    def test_metrics_endpoint(self):
+        logger.info("Running test_metrics_endpoint")
+        self.client.get(reverse("task-list"))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'tasks_http_request_duration_seconds_bucket{le="0.005",method="GET",route="task-list",status="200"}', response.content)
+
+
+# Test suite for metrics aggregation over forked worker processes.
+class MultiprocessMetricsTest(TestCase):
+    # Test that with PROMETHEUS_MULTIPROC_DIR, `/metrics` sums the values of every worker.
+    def test_workers_are_aggregated(self):
+        logger.info("Running test_workers_are_aggregated")
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory, 'DJANGO_SETTINGS_MODULE': 'core.settings'}
+            output = subprocess.run(
+                [sys.executable, '-c', MULTIPROCESS_SCRIPT], cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True, timeout=60, check=True,
+            ).stdout
+        self.assertIn('tasks_cache_requests_total{action="list",result="hit"} 2.0', output)
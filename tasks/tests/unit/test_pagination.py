@@ -0,0 +1,157 @@
+import logging
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for keyset (cursor) pagination on the task list endpoint.
+class TaskCursorPaginationTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for cursor pagination tests")
+        self.tasks = [Task.objects.create(title=f"Paged Task {index}") for index in range(25)]
+        self.url = reverse("task-list")
+
+    # Follows `next` links until the end and returns the ids seen on every page.
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append([task['id'] for task in response.data['results']])
+            url = response.data['next']
+            self.assertLess(len(pages), 50, "Cursor pagination did not terminate")
+        return pages
+
+    # Test that walking the cursor pages returns every task exactly once, newest first.
+    def test_cursor_pages_cover_all_tasks_once(self):
+        logger.info("Running test_cursor_pages_cover_all_tasks_once")
+        pages = self.walk(self.url + "?pagination=cursor&page_size=10")
+        logger.info(f"Cursor pages: {pages}")
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        ids = [task_id for page in pages for task_id in page]
+        self.assertEqual(ids, [task.id for task in reversed(self.tasks)])
+
+    # Test that the cursor follows the ascending order picked by `sort_by_date=false`.
+    def test_cursor_follows_ascending_sort(self):
+        logger.info("Running test_cursor_follows_ascending_sort")
+        pages = self.walk(self.url + "?pagination=cursor&page_size=7&sort_by_date=false")
+        ids = [task_id for page in pages for task_id in page]
+        self.assertEqual(ids, [task.id for task in self.tasks])
+
+    # Test that trigram-ranked search results can be paged without duplicates or gaps.
+    def test_cursor_follows_search_ranking(self):
+        logger.info("Running test_cursor_follows_search_ranking")
+        pages = self.walk(self.url + "?search=Paged Task&pagination=cursor&page_size=4")
+        ids = [task_id for page in pages for task_id in page]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {task.id for task in self.tasks})
+
+    # Test that the previous link of the second page leads back to the first page.
+    def test_cursor_previous_page(self):
+        logger.info("Running test_cursor_previous_page")
+        first = self.client.get(self.url + "?pagination=cursor&page_size=10").data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([task['id'] for task in back['results']], [task['id'] for task in first['results']])
+        self.assertIsNotNone(back['next'])
+
+    # Test that a cursor page never issues a COUNT(*) or an OFFSET scan.
+    def test_cursor_page_skips_count_and_offset(self):
+        logger.info("Running test_cursor_page_skips_count_and_offset")
+        first = self.client.get(self.url + "?pagination=cursor&page_size=10").data
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = " ".join(query['sql'] for query in queries.captured_queries)
+        logger.info(f"Cursor page SQL: {sql}")
+        self.assertNotIn('COUNT(', sql.upper())
+        self.assertNotIn('OFFSET', sql.upper())
+
+    # Test that a tampered cursor is rejected.
+    def test_tampered_cursor_rejected(self):
+        logger.info("Running test_tampered_cursor_rejected")
+        response = self.client.get(self.url + "?cursor=not-a-real-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that a cursor minted for one ordering cannot be replayed against another.
+    def test_cursor_bound_to_ordering(self):
+        logger.info("Running test_cursor_bound_to_ordering")
+        first = self.client.get(self.url + "?pagination=cursor&page_size=10").data
+        response = self.client.get(first['next'] + "&sort_by_date=false")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that page-number pagination stays the default.
+    def test_page_number_pagination_is_default(self):
+        logger.info("Running test_page_number_pagination_is_default")
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 25)
+
+
+# Test suite for estimated counts on page-number pagination and the admin changelist.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False, TASK_COUNT_ESTIMATE_THRESHOLD=10)
+class TaskCountEstimateTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for count estimate tests")
+        cache.clear()
+        Task.objects.bulk_create(Task(title=f"Counted Task {index}") for index in range(25))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tasks_task")
+        self.url = reverse("task-list")
+
+    # Returns the response for a URL and the SQL it ran.
+    def get_with_sql(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, " ".join(query['sql'] for query in queries.captured_queries).upper()
+
+    # Test that a small table is still counted exactly.
+    @override_settings(TASK_COUNT_ESTIMATE_THRESHOLD=100)
+    def test_small_table_counts_exactly(self):
+        logger.info("Running test_small_table_counts_exactly")
+        response, sql = self.get_with_sql(self.url)
+        self.assertEqual((response.data['count'], response.data['count_is_approximate']), (25, False))
+        self.assertIn('COUNT(', sql)
+
+    # Test that a large unfiltered listing uses the planner estimate instead of COUNT(*).
+    def test_large_table_uses_estimate(self):
+        logger.info("Running test_large_table_uses_estimate")
+        response, sql = self.get_with_sql(self.url)
+        logger.info(f"Estimated count: {response.data['count']}")
+        self.assertTrue(response.data['count_is_approximate'])
+        self.assertEqual(response.data['count'], 25)  # Exact right after ANALYZE.
+        self.assertNotIn('COUNT(', sql)
+        self.assertIsNotNone(response.data['next'])
+
+    # Test that estimated pages find their end with a lookahead row instead of the count.
+    def test_estimated_pages_end_by_lookahead(self):
+        logger.info("Running test_estimated_pages_end_by_lookahead")
+        Task.objects.bulk_create(Task(title=f"Unanalyzed Task {index}") for index in range(10))
+        last = self.client.get(self.url + "?page=4")
+        self.assertTrue(last.data['count_is_approximate'])
+        self.assertEqual(len(last.data['results']), 5)
+        self.assertIsNone(last.data['next'])
+        self.assertEqual(self.client.get(self.url + "?page=5").status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that a selective filter is counted exactly.
+    def test_selective_filter_counts_exactly(self):
+        logger.info("Running test_selective_filter_counts_exactly")
+        response = self.client.get(self.url + "?search_date=2001-01-01")
+        self.assertEqual((response.data['count'], response.data['count_is_approximate']), (0, False))
+
+    # Test that the admin changelist pages with the estimate and no COUNT(*).
+    def test_admin_changelist_uses_estimate(self):
+        logger.info("Running test_admin_changelist_uses_estimate")
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response, sql = self.get_with_sql(reverse("admin:tasks_task_changelist"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('COUNT(', sql)
+        self.assertContains(response, "Counted Task 0")
@@ -0,0 +1,92 @@
+import io
+import logging
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from tasks.helpers.partitions import TaskPartitions
+from tasks.helpers.service import TaskQueryService
+from tasks.helpers.stats import TaskStats
+from tasks.models import Task, TaskTombstone
+
+logger = logging.getLogger('django')
+
+# Test suite for the monthly partitions of `tasks_task`.
+class TaskPartitionsTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for partition tests")
+        self.now = timezone.now()
+        self.task = Task.objects.create(title="Partitioned Task")
+
+    def partition_of(self, task):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM tasks_task WHERE id = %s", [task.pk])
+            return cursor.fetchone()[0]
+
+    def move(self, task, month):
+        # Re-dates a task into `month`; Postgres moves the row to that month's partition.
+        Task.objects.filter(pk=task.pk).update(created_at=month + timedelta(days=14))
+
+    # Test that tasks are stored in the partition of their creation month.
+    def test_rows_are_partitioned_by_month(self):
+        logger.info("Running test_rows_are_partitioned_by_month")
+        self.assertEqual(self.partition_of(self.task), TaskPartitions.name(TaskPartitions.month(self.now)))
+        months = [start for _, start, _ in TaskPartitions.partitions()]
+        self.assertEqual(months[-4:], [TaskPartitions.month(self.now, offset) for offset in range(4)])
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, "Partitioned Task")
+
+    # Test that a `search_date` filter only reads the partition of that day, through its created_at index.
+    def test_search_date_prunes_partitions(self):
+        logger.info("Running test_search_date_prunes_partitions")
+        month = TaskPartitions.month(self.now, 2)
+        request = Request(APIRequestFactory().get('/tasks/', {'search_date': f"{month:%Y-%m}-15"}))
+        queryset = TaskQueryService(Task.objects.all(), request).apply_filters()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        logger.info(f"Search date plan: {plan}")
+        self.assertIn(f"{TaskPartitions.name(month)}_task_created_at_id_idx", plan)
+        self.assertEqual(plan.count(' on tasks_task_'), 1)
+
+    # Test that new partitions take over their rows from the default partition, without touching statistics.
+    def test_ensure_moves_default_rows(self):
+        logger.info("Running test_ensure_moves_default_rows")
+        later = TaskPartitions.month(self.now, 6)
+        self.move(self.task, later)
+        self.assertEqual(self.partition_of(self.task), TaskPartitions.default)
+        stats = TaskStats.get()
+        created = TaskPartitions.ensure(months_ahead=6)
+        self.assertEqual(created, [TaskPartitions.name(TaskPartitions.month(self.now, offset)) for offset in (4, 5, 6)])
+        self.assertEqual(self.partition_of(self.task), TaskPartitions.name(later))
+        self.assertEqual(TaskStats.get(), stats)
+        self.assertFalse(TaskTombstone.objects.exists())
+        self.assertEqual(TaskPartitions.ensure(months_ahead=6), [])
+
+    # Test that expired partitions are detached or dropped, with statistics and tombstones for their tasks.
+    def test_retire(self):
+        logger.info("Running test_retire")
+        old, older = TaskPartitions.month(self.now, -3), TaskPartitions.month(self.now, -4)
+        TaskPartitions.create(old)
+        TaskPartitions.create(older)
+        self.move(self.task, old)
+        total = TaskStats.get()['total']
+        self.assertEqual(TaskPartitions.retire(retain_months=3, now=self.now), [TaskPartitions.name(older)])
+        self.assertEqual(TaskPartitions.retire(retain_months=2, drop=True, now=self.now), [TaskPartitions.name(old)])
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertEqual(TaskStats.get()['total'], total - 1)
+        self.assertTrue(TaskTombstone.objects.filter(task_id=self.task.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s), to_regclass(%s)", [TaskPartitions.name(older), TaskPartitions.name(old)])
+            self.assertEqual(cursor.fetchone(), (TaskPartitions.name(older), None))  # Detached, dropped
+        self.assertEqual(TaskPartitions.retire(retain_months=0, now=self.now), [])
+
+    # Test the `manage_task_partitions` command.
+    def test_command(self):
+        logger.info("Running test_command")
+        out = io.StringIO()
+        call_command('manage_task_partitions', '--ahead', '4', stdout=out)
+        name = TaskPartitions.name(TaskPartitions.month(self.now, 4))
+        self.assertEqual(out.getvalue(), f"Created 1 partitions: {name}.\nDetached 0 partitions.\n")
@@ -0,0 +1,95 @@
+import logging
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.helpers.profiling import TaskProfiler
+from tasks.middleware import MetricsMiddleware
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for `Server-Timing` headers and the slow-request trace buffer.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False, TASK_COUNT_ESTIMATE_THRESHOLD=0, TASK_SLOW_REQUEST_SAMPLE_RATE=1)
+class TaskProfilerTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for profiling tests")
+        cache.clear()
+        self.task = Task.objects.create(title="Profiled Task", description="Timed")
+        self.admin = User.objects.create_user("admin", password="secret", is_staff=True)
+
+    def timings(self, response):
+        # Parses the `Server-Timing` header into {name: params}.
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def traces(self):
+        self.client.force_authenticate(self.admin)
+        try:
+            response = self.client.get(reverse("task-slow-requests"))
+        finally:
+            self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    # Test that list responses report each phase, with the query count on `db`.
+    def test_server_timing(self):
+        logger.info("Running test_server_timing")
+        timings = self.timings(self.client.get(reverse("task-list")))
+        logger.info(f"Server-Timing: {timings}")
+        self.assertEqual(list(timings), ['filter', 'count', 'db', 'serialize', 'render', 'total'])
+        self.assertEqual(timings['db']['desc'], '"2 queries"')
+        self.assertGreaterEqual(float(timings['total']['dur']), float(timings['db']['dur']))
+        async_timings = self.timings(self.client.get(reverse("async-task-list")))
+        self.assertEqual(list(async_timings), ['filter', 'count', 'db', 'serialize', 'render', 'total'])
+
+    # Test that slow requests are traced with their SQL, and only SELECTs are explained.
+    @override_settings(TASK_SLOW_REQUEST_MS=0)
+    def test_slow_request_trace(self):
+        logger.info("Running test_slow_request_trace")
+        self.client.get(reverse("task-list"), {'search': 'Profiled'})
+        self.client.patch(reverse("task-detail", args=[self.task.pk]), {"priority": 2}, format='json')
+        update, listing = self.traces()
+        self.assertEqual((listing['method'], listing['path'], listing['query_count']), ('GET', '/tasks/?search=Profiled', 2))
+        self.assertIn('Profiled', listing['queries'][1]['params'])
+        self.assertTrue(all('Buffers' in query['explain'] or 'actual time' in query['explain'] for query in listing['queries']))
+        self.assertIn('UPDATE', update['queries'][0]['sql'])
+        self.assertIsNone(update['queries'][0]['explain'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 2)  # Traces never re-run writes
+
+    # Test that the plans are added to the trace after the response is sent, not while it is built.
+    @override_settings(TASK_SLOW_REQUEST_MS=0)
+    def test_explain_after_response(self):
+        logger.info("Running test_explain_after_response")
+        middleware = MetricsMiddleware(lambda request: HttpResponse(Task.objects.values_list('title', flat=True).first()))
+        response = middleware(RequestFactory().get("/profiled/"))
+        [trace] = TaskProfiler.traces()
+        self.assertIsNone(trace['queries'][0]['explain'])
+        request_finished.disconnect(close_old_connections)  # As the test client does, to keep the test transaction
+        try:
+            response.close()
+        finally:
+            request_finished.connect(close_old_connections)
+        [trace] = TaskProfiler.traces()
+        self.assertIn('actual time', trace['queries'][0]['explain'])
+
+    # Test that the buffer keeps the newest traces, sampling can be turned off, and only staff can read it.
+    @override_settings(TASK_SLOW_REQUEST_MS=0, TASK_SLOW_REQUEST_BUFFER_SIZE=2)
+    def test_ring_buffer(self):
+        logger.info("Running test_ring_buffer")
+        for page_size in (1, 2, 3):
+            self.client.get(reverse("task-list"), {'page_size': page_size})
+        with self.settings(TASK_SLOW_REQUEST_SAMPLE_RATE=0):
+            self.client.get(reverse("task-list"), {'page_size': 4})
+        self.assertEqual([trace['path'] for trace in self.traces()], ['/tasks/?page_size=3', '/tasks/?page_size=2'])
+        response = self.client.get(reverse("task-slow-requests"))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
@@ -0,0 +1,143 @@
+import io
+import logging
+import threading
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.helpers.queue import TaskQueue
+from tasks.models import Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for TaskQueue claims, heartbeats and releases.
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for work queue tests")
+        now = timezone.now()
+        self.low = Task.objects.create(title="Low priority", priority=1)
+        self.undated = Task.objects.create(title="High priority, no due date", priority=5)
+        self.later = Task.objects.create(title="High priority, due later", priority=5, due_date=now + timedelta(days=2))
+        self.sooner = Task.objects.create(title="High priority, due sooner", priority=5, due_date=now + timedelta(days=1))
+        Task.objects.create(title="Completed", priority=9, status=TaskStatus.COMPLETED)
+
+    # Test that claims follow queue order, skip leased tasks, and do not count as task writes.
+    def test_claim_order(self):
+        logger.info("Running test_claim_order")
+        with self.assertNumQueries(1):
+            first = TaskQueue("worker-1").claim(2)
+        self.assertEqual([task.id for task in first], [self.sooner.id, self.later.id])
+        self.assertTrue(all(task.claimed_by == "worker-1" and task.lease_expires_at > timezone.now() for task in first))
+        second = TaskQueue("worker-2").claim(5)
+        self.assertEqual([task.id for task in second], [self.undated.id, self.low.id])
+        self.assertEqual(TaskQueue("worker-3").claim(5), [])
+        self.sooner.refresh_from_db()
+        self.assertEqual((self.sooner.version, self.sooner.updated_at), (1, first[0].updated_at))
+
+    # Test that an expired lease can be claimed by another worker, after which the first worker has lost it.
+    def test_lease_expiry(self):
+        logger.info("Running test_lease_expiry")
+        claimed = TaskQueue("worker-1").claim(1)[0]
+        Task.objects.filter(pk=claimed.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([task.id for task in TaskQueue("worker-2").claim(1)], [claimed.id])
+        self.assertEqual(TaskQueue("worker-1").heartbeat([claimed.id]), ([], None))
+        self.assertEqual(TaskQueue("worker-1").release([claimed.id], completed=True), [])
+
+    # Test that heartbeats extend only the worker's own leases.
+    def test_heartbeat(self):
+        logger.info("Running test_heartbeat")
+        claimed = TaskQueue("worker-1", lease_seconds=10).claim(2)
+        other = TaskQueue("worker-2").claim(1)[0]
+        renewed, lease_expires_at = TaskQueue("worker-1", lease_seconds=600).heartbeat([task.id for task in claimed] + [other.id])
+        self.assertEqual(renewed, sorted(task.id for task in claimed))
+        self.assertGreater(lease_expires_at, claimed[0].lease_expires_at + timedelta(seconds=500))
+
+    # Test that releasing returns tasks to the queue, and completing them is a versioned write.
+    def test_release(self):
+        logger.info("Running test_release")
+        queue = TaskQueue("worker-1")
+        first, second = queue.claim(2)
+        self.assertEqual(queue.release([first.id]), [first.id])
+        self.assertEqual([task.id for task in TaskQueue("worker-2").claim(1)], [first.id])
+        with self.assertLogs('tasks.audit') as logs:
+            self.assertEqual(queue.release([second.id], completed=True), [second.id])
+        self.assertIn(f"Worker worker-1 completed 1 Tasks (IDs: [{second.id}])", logs.output[0])
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.claimed_by, second.version), (TaskStatus.COMPLETED, None, 2))
+
+
+# Test suite for the `/tasks/claim/`, `/tasks/heartbeat/` and `/tasks/release/` endpoints.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CLAIM_MAX_TASKS=5)
+class TaskQueueViewTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for work queue endpoint tests")
+        cache.clear()
+        self.tasks = [Task.objects.create(title=f"Queued Task {index}", priority=index) for index in range(3)]
+
+    # Test a worker's claim, heartbeat and release through the API.
+    def test_claim_heartbeat_release(self):
+        logger.info("Running test_claim_heartbeat_release")
+        response = self.client.post(reverse("task-claim"), {"worker": "api-worker", "limit": 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [task['id'] for task in response.data['tasks']]
+        self.assertEqual(ids, [self.tasks[2].id, self.tasks[1].id])
+        self.assertNotIn('claimed_by', response.data['tasks'][0])
+        self.assertIsNotNone(response.data['lease_expires_at'])
+
+        response = self.client.post(reverse("task-heartbeat"), {"worker": "api-worker", "ids": ids + [self.tasks[0].id]}, format='json')
+        self.assertEqual((response.data['renewed'], response.data['lost']), (sorted(ids), [self.tasks[0].id]))
+
+        response = self.client.post(reverse("task-release"), {"worker": "api-worker", "ids": ids, "completed": True}, format='json')
+        self.assertEqual((response.data['released'], response.data['lost']), (sorted(ids), []))
+        self.assertEqual(self.client.get(reverse("task-detail", args=[ids[0]])).data['status'], TaskStatus.COMPLETED)
+
+    # Test that invalid and oversized requests are rejected.
+    def test_invalid_requests(self):
+        logger.info("Running test_invalid_requests")
+        for url, data in [
+            ("task-claim", {"limit": 1}),
+            ("task-claim", {"worker": "w", "limit": 6}),
+            ("task-claim", {"worker": "w", "lease_seconds": 0}),
+            ("task-heartbeat", {"worker": "w", "ids": []}),
+            ("task-release", {"worker": "w", "ids": list(range(6))}),
+        ]:
+            response = self.client.post(reverse(url), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+
+
+# Test suite for claims from concurrent connections. The rows have to be committed for other
+# connections to see them.
+class TaskQueueConcurrencyTest(TransactionTestCase):
+    # Test that a claim skips rows locked by another transaction instead of waiting for them.
+    def test_claim_skips_locked_rows(self):
+        logger.info("Running test_claim_skips_locked_rows")
+        tasks = [Task.objects.create(title=f"Contended Task {index}", priority=index) for index in range(3)]
+        claimed = []
+
+        def claim():
+            try:
+                claimed.extend(task.id for task in TaskQueue("worker-2").claim(3))
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            Task.objects.select_for_update().get(pk=tasks[2].pk)  # Held by another worker's claim in flight
+            thread = threading.Thread(target=claim)
+            thread.start()
+            thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(claimed, [tasks[1].id, tasks[0].id])
+
+    # Test that the benchmark drains the queue without processing a task twice and cleans up.
+    def test_benchmark_runs(self):
+        logger.info("Running test_benchmark_runs")
+        stdout = io.StringIO()
+        call_command('bench_claim', tasks=40, workers='1,4', batch=3, work_ms=0, stdout=stdout)
+        logger.info(f"Benchmark output: {stdout.getvalue()}")
+        self.assertEqual(stdout.getvalue().count("(40 tasks in"), 2)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,135 @@
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from tasks.helpers.ratelimit import LocalTokenBucket, RedisTokenBucket, is_ratelimited, key_value, split_rate
+
+logger = logging.getLogger('django')
+
+# Takes two tokens from a bucket file in another process.
+def drain_in_child(path):
+    bucket = LocalTokenBucket(path)
+    for _ in range(2):
+        bucket.take('shared-key', 2, 2 / 60, 1)
+
+# Test suite for the token bucket backends.
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        logger.info("Setting up bucket file for token bucket tests")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'buckets')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Test that a bucket allows a burst of its capacity and then refills at its rate.
+    def test_local_bucket_refills(self):
+        logger.info("Running test_local_bucket_refills")
+        bucket = LocalTokenBucket(self.path)
+        with mock.patch('tasks.helpers.ratelimit.time.monotonic', return_value=1000.0) as clock:
+            self.assertEqual([bucket.take('key', 2, 2 / 60, 1)[0] for _ in range(3)], [True, True, False])
+            clock.return_value = 1029.0  # 0.97 tokens refilled
+            self.assertFalse(bucket.take('key', 2, 2 / 60, 1)[0])
+            clock.return_value = 1031.0
+            self.assertTrue(bucket.take('key', 2, 2 / 60, 1)[0])
+            self.assertTrue(bucket.take('other-key', 2, 2 / 60, 1)[0])
+
+    # Test that worker processes on one host share the buckets in the mapped file.
+    def test_local_bucket_is_shared_between_processes(self):
+        logger.info("Running test_local_bucket_is_shared_between_processes")
+        child = multiprocessing.get_context('fork').Process(target=drain_in_child, args=(self.path,))
+        child.start()
+        child.join()
+        self.assertEqual(child.exitcode, 0)
+        self.assertFalse(LocalTokenBucket(self.path).take('shared-key', 2, 2 / 60, 1)[0])
+
+    # Test that a full table evicts a slot instead of failing.
+    def test_local_bucket_evicts_when_full(self):
+        logger.info("Running test_local_bucket_evicts_when_full")
+        bucket = LocalTokenBucket(self.path)
+        bucket.slots, bucket.probes = 2, 2
+        for index in range(5):
+            self.assertTrue(bucket.take(f'key-{index}', 1, 1 / 60, 1)[0])
+
+    # Test that separate Redis clients (one per worker) share one bucket.
+    def test_redis_bucket_is_shared(self):
+        logger.info("Running test_redis_bucket_is_shared")
+        cache.clear()
+        url = os.environ['REDIS_URL']
+        workers = [RedisTokenBucket(url), RedisTokenBucket(url)]
+        results = [workers[index % 2].take('rl:test:shared', 2, 2 / 60, 1)[0] for index in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+
+# Test suite for the `is_ratelimited` wrapper and RatelimitMiddleware.
+@override_settings(RATELIMIT_ENABLE=True, TASK_CACHE_ENABLED=False)
+class RateLimitTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up requests for rate limit tests")
+        cache.clear()
+        self.request = RequestFactory().patch('/tasks/1/')
+        self.request.user = AnonymousUser()
+
+    def check(self, **options):
+        return is_ratelimited(self.request, group='test-group', key='user', rate='2/m', method='PATCH', increment=True, **options)
+
+    # Test that `is_ratelimited` limits the third request of a `2/m` rate and marks the request.
+    def test_is_ratelimited(self):
+        logger.info("Running test_is_ratelimited")
+        self.assertEqual([self.check() for _ in range(3)], [False, False, True])
+        self.assertTrue(self.request.limited)
+
+    # Test that other methods and disabled rate limiting are never limited.
+    def test_method_and_setting_are_respected(self):
+        logger.info("Running test_method_and_setting_are_respected")
+        get_request = RequestFactory().get('/tasks/')
+        self.assertFalse(is_ratelimited(get_request, group='test-group', key='ip', rate='0/m', method='PATCH', increment=True))
+        with self.settings(RATELIMIT_ENABLE=False):
+            self.assertFalse(is_ratelimited(self.request, group='test-group', key='user', rate='0/m', increment=True))
+
+    # Test that rates and keys are read the way django-ratelimit reads them.
+    @override_settings(RATELIMIT_IPV4_MASK=24)
+    def test_rates_and_keys(self):
+        logger.info("Running test_rates_and_keys")
+        self.assertEqual([split_rate(rate) for rate in ('5/m', '100/15s', '2/h', (3, 9))], [(5, 60), (100, 15), (2, 3600), (3, 9)])
+        request = RequestFactory().get('/tasks/', {'token': 'abc'}, REMOTE_ADDR='10.1.2.3', HTTP_X_API_KEY='key-1')
+        request.user = AnonymousUser()
+        self.assertEqual(key_value('group', request, 'ip'), '10.1.2.0')
+        self.assertEqual(key_value('group', request, 'user_or_ip'), '10.1.2.0')
+        self.assertEqual(key_value('group', request, 'get:token'), 'abc')
+        self.assertEqual(key_value('group', request, 'header:x-api-key'), 'key-1')
+        self.assertEqual(key_value('group', request, lambda group, request: group), 'group')
+
+    # Test that an unreachable backend fails closed unless RATELIMIT_FAIL_OPEN is set.
+    @override_settings(TASK_RATELIMIT_BACKEND='redis', TASK_RATELIMIT_REDIS_URL='redis://localhost:1/0')
+    def test_backend_failure(self):
+        logger.info("Running test_backend_failure")
+        self.assertTrue(self.check())
+        with self.settings(RATELIMIT_FAIL_OPEN=True):
+            self.assertFalse(self.check())
+
+    # Test that the global rate applies to every request through the middleware.
+    @override_settings(TASK_RATELIMIT_GLOBAL_RATE='3/m')
+    def test_global_rate_limit(self):
+        logger.info("Running test_global_rate_limit")
+        responses = [self.client.get(reverse("task-list")) for _ in range(4)]
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200, 429])
+        self.assertEqual(responses[-1].json(), {'detail': 'Rate limit exceeded. Try again later.'})
+
+    # Test that the benchmark reports every backend.
+    def test_benchmark_runs(self):
+        logger.info("Running test_benchmark_runs")
+        stdout = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(TASK_RATELIMIT_LOCAL_PATH=os.path.join(directory, 'buckets')):
+                call_command('bench_ratelimit', iterations=20, stdout=stdout)
+        logger.info(f"Benchmark output: {stdout.getvalue()}")
+        self.assertEqual(stdout.getvalue().count('us/check'), 3)
@@ -0,0 +1,98 @@
+import logging
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from tasks.helpers.reminders import TaskReminderScheduler
+from tasks.models import Checkpoint, Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+class RecordingSink:
+    # Keeps the batches it is sent, and can fail on demand like an unreachable webhook.
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def send(self, kind, reminders):
+        if self.fail:
+            raise ConnectionError("Sink unavailable")
+        self.batches.append((kind, [reminder['id'] for reminder in reminders]))
+
+    def sent(self, kind):
+        return [pk for batch_kind, ids in self.batches if batch_kind == kind for pk in ids]
+
+# Test suite for the due-date reminder scheduler.
+@override_settings(TASK_REMINDER_LEAD_SECONDS=3600)
+class TaskReminderSchedulerTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for reminder tests")
+        self.now = timezone.now().replace(microsecond=0)
+        self.sink = RecordingSink()
+        self.scheduler = TaskReminderScheduler(sink=self.sink)
+
+    def task(self, minutes, **fields):
+        return Task.objects.create(title=f"Due in {minutes} minutes", due_date=self.now + timedelta(minutes=minutes), **fields)
+
+    # Test that tasks entering the lead window get one due-soon reminder, then one overdue reminder.
+    def test_due_soon_then_overdue(self):
+        logger.info("Running test_due_soon_then_overdue")
+        soon, later = self.task(30), self.task(90)
+        self.task(-5), self.task(20, status=TaskStatus.COMPLETED)
+        self.assertEqual(self.scheduler.tick(now=self.now), {'due_soon': 1, 'overdue': 0})  # Starts watching at `now`
+        self.assertEqual(self.sink.sent('due_soon'), [soon.pk])
+        self.assertEqual(self.scheduler.tick(now=self.now + timedelta(minutes=2)), {'due_soon': 0, 'overdue': 0})
+
+        self.scheduler.tick(now=self.now + timedelta(minutes=45))
+        self.assertEqual(self.sink.sent('due_soon'), [soon.pk, later.pk])
+        self.assertEqual(self.sink.sent('overdue'), [soon.pk])
+        state = Checkpoint.objects.get(name='tasks.reminders').state
+        self.assertEqual(state['overdue'], [(self.now + timedelta(minutes=45)).isoformat(), None])
+
+    # Test that a backlog is sent in keyset batches, `max_batches` per tick, without skipping tasks sharing a due date.
+    def test_batches(self):
+        logger.info("Running test_batches")
+        tasks = [self.task(10) for _ in range(5)] + [self.task(15)]
+        scheduler = TaskReminderScheduler(sink=self.sink, batch_size=2)
+        self.assertEqual(scheduler.tick(now=self.now, max_batches=1), {'due_soon': 2, 'overdue': 0})
+        with self.assertNumQueries(1 + 1 + 2 * 2 + 1):  # Lock, checkpoint, a select and a save per batch, unlock
+            self.assertEqual(scheduler.tick(now=self.now, max_batches=2), {'due_soon': 4, 'overdue': 0})
+        self.assertEqual(scheduler.tick(now=self.now), {'due_soon': 0, 'overdue': 0})
+        self.assertEqual(self.sink.batches, [('due_soon', [task.pk for task in tasks[i:i + 2]]) for i in (0, 2, 4)])
+
+    # Test that a failed delivery keeps the watermark, so the batch is sent again.
+    def test_sink_failure(self):
+        logger.info("Running test_sink_failure")
+        task = self.task(30)
+        failing = TaskReminderScheduler(sink=RecordingSink(fail=True))
+        with self.assertRaises(ConnectionError):
+            failing.tick(now=self.now)
+        self.scheduler.tick(now=self.now)
+        self.assertEqual(self.sink.sent('due_soon'), [task.pk])
+
+    # Test that a tick is skipped while another scheduler holds the lock.
+    def test_concurrent_tick(self):
+        logger.info("Running test_concurrent_tick")
+        other = connection.copy()
+        try:
+            with other.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(hashtext('tasks.reminders'))")
+                self.assertIsNone(self.scheduler.tick(now=self.now))
+                cursor.execute("SELECT pg_advisory_unlock(hashtext('tasks.reminders'))")
+        finally:
+            other.close()
+        self.assertIsNotNone(self.scheduler.tick(now=self.now))
+
+
+# Test suite for the `run_reminders` command, which closes stale connections between ticks.
+class RunRemindersCommandTest(TransactionTestCase):
+    # Test a single tick with `--once`.
+    def test_command(self):
+        logger.info("Running test_command")
+        Task.objects.create(title="Due soon", due_date=timezone.now() + timedelta(minutes=5))
+        out = StringIO()
+        with self.settings(TASK_REMINDER_SINK='tasks.tests.unit.test_reminders.RecordingSink'):
+            call_command('run_reminders', '--once', stdout=out)
+        self.assertEqual(out.getvalue(), "Sent 1 due-soon and 0 overdue reminders.\n")
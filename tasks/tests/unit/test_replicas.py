@@ -0,0 +1,82 @@
+import logging
+import time
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from tasks.helpers.replicas import TaskReplicas
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for read-replica routing and read-your-writes stickiness. `replica_0` is a second alias of
+# the test database, so the rows have to be committed for it to see them.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False, TASK_REPLICA_READS_ENABLED=True)
+class TaskReplicaTest(TransactionTestCase):
+    databases = {'default', 'replica_0'}
+
+    def setUp(self):
+        logger.info("Setting up test data for replica routing tests")
+        TaskReplicas.health.clear()
+        self.task = Task.objects.create(title="Replicated Task")
+        self.client = APIClient()
+
+    def get(self, url, client=None, **headers):
+        # Returns the response and the number of queries each database served.
+        with CaptureQueriesContext(connections['default']) as primary, CaptureQueriesContext(connections['replica_0']) as replica:
+            response = (client or self.client).get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(primary), len(replica)
+
+    # Test that list, search and retrieve read from the replica, and writes go to the primary.
+    def test_reads_use_replica(self):
+        logger.info("Running test_reads_use_replica")
+        for url in [reverse("task-list"), reverse("task-list") + "?search=Replicated", reverse("task-detail", args=[self.task.pk])]:
+            _, primary, replica = self.get(url)
+            self.assertEqual(primary, 0, url)
+            self.assertGreater(replica, 0, url)
+        _, primary, replica = self.get(reverse("async-task-list"))
+        self.assertEqual((primary, replica > 0), (0, True))
+        self.assertEqual(router.db_for_write(Task, instance=Task.objects.using('replica_0').get()), 'default')
+        self.assertFalse(router.allow_migrate('replica_0', 'tasks'))
+
+    # Test that a client's reads stick to the primary after it writes, by cookie or by header.
+    def test_read_your_writes(self):
+        logger.info("Running test_read_your_writes")
+        response = self.client.patch(reverse("task-detail", args=[self.task.pk]), {"priority": 2}, format='json')
+        until = response[TaskReplicas.header_name]
+        self.assertEqual(response.cookies[TaskReplicas.cookie_name].value, until)
+        _, primary, replica = self.get(reverse("task-list"))  # The client sends the cookie back
+        self.assertEqual((primary > 0, replica), (True, 0))
+
+        _, primary, replica = self.get(reverse("task-list"), APIClient(), **{TaskReplicas.header_name: until})
+        self.assertEqual((primary > 0, replica), (True, 0))
+        # Pins further ahead than one window are ignored.
+        _, primary, replica = self.get(reverse("task-list"), APIClient(), **{TaskReplicas.header_name: str(time.time() + 3600)})
+        self.assertEqual((primary, replica > 0), (0, True))
+
+    # Test that replicas behind the allowed lag are skipped until their next check.
+    def test_lagging_replica_skipped(self):
+        logger.info("Running test_lagging_replica_skipped")
+        with self.settings(TASK_REPLICA_MAX_LAG_SECONDS=-1):
+            _, primary, replica = self.get(reverse("task-list"))
+            self.assertEqual((primary > 0, replica), (True, 1))  # Only the lag check
+            _, primary, replica = self.get(reverse("task-list"))
+            self.assertEqual((primary > 0, replica), (True, 0))  # Checked at most once per interval
+        self.assertEqual(TaskReplicas.health['replica_0'][1], 0.0)
+
+    # Test that pages read from a replica are served but not cached, and pages read from the primary are.
+    def test_replica_reads_not_cached(self):
+        logger.info("Running test_replica_reads_not_cached")
+        cache.clear()
+        with self.settings(TASK_CACHE_ENABLED=True):
+            for _ in range(2):
+                response, primary, replica = self.get(reverse("task-list"))
+                self.assertEqual((response['X-Cache'], primary, replica > 0), ('MISS', 0, True))
+            with self.settings(TASK_REPLICA_READS_ENABLED=False):
+                self.assertEqual(self.get(reverse("task-list"))[0]['X-Cache'], 'MISS')
+            response, primary, replica = self.get(reverse("task-list"))
+            self.assertEqual((response['X-Cache'], primary, replica), ('HIT', 0, 0))
@@ -0,0 +1,99 @@
+import io
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from tasks.helpers.renderer import TaskJSONRenderer
+from tasks.helpers.rows import TaskRowSerializer
+from tasks.models import Task, TaskStatus
+from tasks.serializer import TaskSerializer
+
+logger = logging.getLogger('django')
+
+# Test suite for the fast read path of the task list.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class TaskRowSerializerTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for fast serializer tests")
+        cache.clear()
+        now = timezone.now()
+        Task.objects.create(title="Fast Path Report", description="Line\nbreak, \"quotes\" and   separators")
+        Task.objects.create(title="Fast Path Émoji 😀", status=TaskStatus.COMPLETED, priority=3, due_date=now + timedelta(days=1))
+        Task.objects.create(title="Unrelated", due_date=now.replace(microsecond=0))
+
+    # Fetches a URL once through TaskSerializer and once through the fast path.
+    def fetch_both(self, url):
+        with self.settings(TASK_FAST_SERIALIZER_ENABLED=False):
+            baseline = self.client.get(url)
+        fast = self.client.get(url)
+        return baseline, fast
+
+    # Test that list responses are byte-for-byte identical on both paths.
+    def test_list_is_byte_compatible(self):
+        logger.info("Running test_list_is_byte_compatible")
+        list_url = reverse("task-list")
+        for query in ("", "?page_size=2&page=2", "?sort_by_date=false", "?search=Fast%20Path", "?pagination=cursor&page_size=1"):
+            baseline, fast = self.fetch_both(list_url + query)
+            logger.info(f"Fast response for {query!r}: {fast.content}")
+            self.assertEqual(fast.status_code, 200)
+            self.assertEqual(fast.content, baseline.content)
+
+    # Test that keyset pagination can follow the next links of fast path pages, including ranked searches.
+    def test_cursor_pagination_over_rows(self):
+        logger.info("Running test_cursor_pagination_over_rows")
+        url = reverse("task-list") + "?pagination=cursor&page_size=1&search=Fast%20Path"
+        titles = []
+        while url and len(titles) < 5:
+            response = self.client.get(url)
+            titles += [task['title'] for task in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(titles), ["Fast Path Report", "Fast Path Émoji 😀"])
+
+    # Test that the converter table reproduces TaskSerializer for every row.
+    def test_rows_match_serializer(self):
+        logger.info("Running test_rows_match_serializer")
+        queryset = Task.objects.order_by('id')
+        rows = TaskRowSerializer(TaskSerializer())
+        self.assertEqual(rows.to_representation(rows.values(queryset)), TaskSerializer(queryset, many=True).data)
+
+# Test suite for the orjson-backed renderer.
+class TaskJSONRendererTest(TestCase):
+    # Test that the renderer matches JSONRenderer byte-for-byte on API-like payloads.
+    def test_matches_json_renderer(self):
+        logger.info("Running test_matches_json_renderer")
+        data = {
+            'text': "Ünïcode    \x00 \"quoted\" \\ 😀",
+            'numbers': [0, -1, 2 ** 63 - 1, 0.1, 123456789.125],
+            'nested': {'empty': [], 'none': None, 'flag': True},
+            'when': timezone.now(),
+        }
+        self.assertEqual(TaskJSONRenderer().render(data), JSONRenderer().render(data))
+
+    # Test that payloads orjson rejects fall back to the stdlib encoder.
+    def test_falls_back_for_unsupported_payloads(self):
+        logger.info("Running test_falls_back_for_unsupported_payloads")
+        for data in ({'big': 2 ** 70}, {1: 'integer key'}):
+            self.assertEqual(TaskJSONRenderer().render(data), JSONRenderer().render(data))
+
+    # Test that indented output is left to JSONRenderer.
+    def test_indented_output(self):
+        logger.info("Running test_indented_output")
+        data = {'title': 'Indented'}
+        context = {'indent': 2}
+        self.assertEqual(TaskJSONRenderer().render(data, renderer_context=context), JSONRenderer().render(data, renderer_context=context))
+
+# Test suite for the `bench_serializers` management command.
+class BenchSerializersCommandTest(TestCase):
+    # Test that the benchmark verifies identical output and leaves no rows behind.
+    def test_benchmark_runs(self):
+        logger.info("Running test_benchmark_runs")
+        stdout = io.StringIO()
+        call_command('bench_serializers', rows=20, page_size=10, iterations=2, stdout=stdout)
+        logger.info(f"Benchmark output: {stdout.getvalue()}")
+        self.assertIn("identical output", stdout.getvalue())
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,77 @@
+import io
+import logging
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for `search_mode=fulltext` over the stored title/description tsvector.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for full-text search tests")
+        cache.clear()
+        self.in_title = Task.objects.create(title="Renew invoices", description="Send the renewal notices.")
+        self.in_description = Task.objects.create(title="Monthly close", description="Reconcile every open invoice with the ledger.")
+        Task.objects.create(title="Plan offsite", description="Book the venue and catering.")
+        self.url = reverse("task-list")
+
+    def search(self, term, **params):
+        response = self.client.get(self.url, {'search': term, 'search_mode': 'fulltext', **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    # Test that descriptions are searched, stemmed, and title matches rank first with a headline.
+    def test_ranked_search(self):
+        logger.info("Running test_ranked_search")
+        results = self.search("invoice")
+        logger.info(f"Results: {results}")
+        self.assertEqual([task['id'] for task in results], [self.in_title.id, self.in_description.id])
+        self.assertIn('<mark>invoice</mark>', results[1]['headline'])
+        self.assertNotIn('search_vector', results[0])
+
+    # Test the web search syntax: phrases, alternatives and exclusions.
+    def test_websearch_syntax(self):
+        logger.info("Running test_websearch_syntax")
+        self.assertEqual([task['id'] for task in self.search('"open invoice"')], [self.in_description.id])
+        self.assertEqual(len(self.search("venue or ledger")), 2)
+        self.assertEqual([task['id'] for task in self.search("invoice -ledger")], [self.in_title.id])
+
+    # Test that the vector follows writes, including the single-statement PATCH.
+    def test_vector_follows_writes(self):
+        logger.info("Running test_vector_follows_writes")
+        self.client.patch(reverse("task-detail", args=[self.in_description.pk]), {"description": "Archive the receipts."}, format='json')
+        self.assertEqual([task['id'] for task in self.search("invoice")], [self.in_title.id])
+        self.assertEqual([task['id'] for task in self.search("receipt")], [self.in_description.id])
+
+    # Test that the row serializer and TaskSerializer return the same results, and cursor pages walk the ranking.
+    def test_serializer_paths_and_cursor(self):
+        logger.info("Running test_serializer_paths_and_cursor")
+        fast = self.search("invoice")
+        with self.settings(TASK_FAST_SERIALIZER_ENABLED=False):
+            self.assertEqual(self.search("invoice"), fast)
+        response = self.client.get(self.url, {'search': 'invoice', 'search_mode': 'fulltext', 'pagination': 'cursor', 'page_size': 1})
+        second = self.client.get(response.data['next']).data
+        self.assertEqual([response.data['results'][0]['id'], second['results'][0]['id']], [task['id'] for task in fast])
+
+    # Test that the async list returns the same results, and unknown modes are rejected.
+    def test_async_and_invalid_mode(self):
+        logger.info("Running test_async_and_invalid_mode")
+        response = self.client.get(reverse("async-task-list"), {'search': 'invoice', 'search_mode': 'fulltext'})
+        self.assertEqual(response.json()['results'], self.search("invoice"))
+        response = self.client.get(self.url, {'search': 'invoice', 'search_mode': 'regex'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that the benchmark reports every search and leaves no rows behind.
+    def test_benchmark_runs(self):
+        logger.info("Running test_benchmark_runs")
+        stdout = io.StringIO()
+        call_command('bench_search', rows=200, iterations=1, stdout=stdout)
+        logger.info(f"Benchmark output: {stdout.getvalue()}")
+        self.assertEqual(stdout.getvalue().count('p99'), 3)
+        self.assertEqual(Task.objects.count(), 3)
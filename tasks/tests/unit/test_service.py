@@ -0,0 +1,138 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory
+from tasks.helpers.service import TaskQueryService
+from tasks.models import Task
+
+logger = logging.getLogger('django')
+
+# Test suite for the search behaviour of TaskQueryService.
+class TaskQueryServiceSearchTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for search tests")
+        self.factory = APIRequestFactory()
+        Task.objects.create(title="Read The Book Dune")
+        Task.objects.create(title="Write Book Review")
+        Task.objects.create(title="Finish Python Project")
+
+    # Builds a filtered queryset for the given query parameters.
+    def search(self, **params):
+        request = Request(self.factory.get('/tasks/', params))
+        return TaskQueryService(Task.objects.all(), request).apply_filters()
+
+    # Test that the session similarity threshold is applied to every connection.
+    def test_session_similarity_threshold(self):
+        logger.info("Running test_session_similarity_threshold")
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW pg_trgm.similarity_threshold")
+            threshold = cursor.fetchone()[0]
+        logger.info(f"Session similarity threshold: {threshold}")
+        self.assertEqual(float(threshold), 0.1)
+
+    # Test that the search is expressed with the index-aware `%` operator.
+    def test_search_uses_trigram_operator(self):
+        logger.info("Running test_search_uses_trigram_operator")
+        sql = str(self.search(search="Book").query)
+        logger.info(f"Search SQL: {sql}")
+        self.assertIn('"tasks_task"."title" % ', sql)
+        self.assertNotIn('> 0.1', sql)
+
+    # Test that Postgres can answer the search from the GIN trigram index.
+    def test_search_uses_trigram_index(self):
+        logger.info("Running test_search_uses_trigram_index")
+        queryset = self.search(search="Book")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        logger.info(f"Search plan: {plan}")
+        self.assertIn('task_title_trgm_idx', plan)
+
+    # Test that matches are ranked by similarity.
+    def test_search_ranks_candidates(self):
+        logger.info("Running test_search_ranks_candidates")
+        titles = [task.title for task in self.search(search="Book Review")]
+        logger.info(f"Ranked titles: {titles}")
+        self.assertEqual(titles[0], "Write Book Review")
+        self.assertNotIn("Finish Python Project", titles)
+
+    # Test that a per-query threshold narrows the matches.
+    def test_per_query_threshold(self):
+        logger.info("Running test_per_query_threshold")
+        loose = self.search(search="Book Review")
+        strict = self.search(search="Book Review", search_threshold="0.9")
+        logger.info(f"Loose: {list(loose)}, strict: {list(strict)}")
+        self.assertGreater(loose.count(), strict.count())
+
+    # Test that an invalid threshold is reported as a bad request.
+    def test_invalid_threshold(self):
+        logger.info("Running test_invalid_threshold")
+        response = self.client.get(reverse("task-list") + "?search=Book&search_threshold=high")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search_threshold', response.data)
+
+    # Test that a threshold below the session threshold, which the index cannot serve, is rejected.
+    def test_lower_threshold_is_rejected(self):
+        logger.info("Running test_lower_threshold_is_rejected")
+        with self.settings(TASK_SEARCH_SIMILARITY_THRESHOLD=0.3):
+            response = self.client.get(reverse("task-list") + "?search=Book&search_threshold=0.2")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search_threshold', response.data)
+
+
+# Test suite for the single query-compilation pipeline behind the task list.
+# Count estimates are disabled so the list runs exactly one count and one select.
+@override_settings(TASK_COUNT_ESTIMATE_THRESHOLD=0)
+class TaskQueryPipelineTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for query pipeline tests")
+        self.url = reverse("task-list")
+        self.late = Task.objects.create(title="Late Night Task")
+        self.early = Task.objects.create(title="Early Morning Task")
+        # `created_at` is auto-managed, so the creation times are pinned with an update.
+        Task.objects.filter(pk=self.late.pk).update(created_at=datetime(2025, 1, 2, 3, 0, tzinfo=dt_timezone.utc))
+        Task.objects.filter(pk=self.early.pk).update(created_at=datetime(2025, 1, 2, 12, 0, tzinfo=dt_timezone.utc))
+
+    # Returns the SQL of the single SELECT issued for a list request, with the count query excluded.
+    def list_sql(self, query_string):
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(self.url + query_string)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in queries.captured_queries if 'COUNT(' not in query['sql']][0]
+
+    # Test that all list parameters compile into one count and one select, with no redundant predicates.
+    def test_filters_compile_to_one_statement(self):
+        logger.info("Running test_filters_compile_to_one_statement")
+        sql = self.list_sql("?search=Task&search_date=2025-01-02&sort_by_date=true")
+        logger.info(f"Compiled SQL: {sql}")
+        self.assertEqual(sql.count('%'), 1)
+        self.assertNotIn('LIKE', sql)
+        self.assertNotIn('::date', sql)
+        self.assertNotIn('created_date', sql)
+        self.assertRegex(sql, r'ORDER BY ("tasks_task"\."created_at"|\d+) DESC')
+
+    # Test that a search date becomes a half-open `created_at` range served by the created_at index.
+    def test_search_date_is_index_range(self):
+        logger.info("Running test_search_date_is_index_range")
+        request = Request(APIRequestFactory().get('/tasks/', {'search_date': '2025-01-02'}))
+        queryset = TaskQueryService(Task.objects.all(), request).apply_filters()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        logger.info(f"Search date plan: {plan}")
+        self.assertIn('task_created_at_id_idx', plan)
+        self.assertIn('Index Cond: ((created_at >=', plan)
+
+    # Test that the day boundaries follow the active timezone.
+    def test_search_date_uses_active_timezone(self):
+        logger.info("Running test_search_date_uses_active_timezone")
+        response = self.client.get(self.url + "?search_date=2025-01-02")
+        self.assertEqual({task['id'] for task in response.data['results']}, {self.late.id, self.early.id})
+        with timezone.override('America/New_York'):
+            response = self.client.get(self.url + "?search_date=2025-01-01")
+        self.assertEqual([task['id'] for task in response.data['results']], [self.late.id])
@@ -0,0 +1,124 @@
+import io
+import logging
+import threading
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.helpers.stats import TaskStats
+from tasks.models import Task, TaskDueStat, TaskStat, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for the `/tasks/stats/` endpoint and the TaskStat rollup maintained by triggers.
+@override_settings(RATELIMIT_ENABLE=False, TASK_CACHE_ENABLED=False)
+class TaskStatsTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for stats tests")
+        cache.clear()
+        now = timezone.now()
+        self.overdue = Task.objects.create(title="Overdue", priority=1, due_date=now - timedelta(days=2))
+        self.due_today = Task.objects.create(title="Just overdue", priority=1, due_date=now - timedelta(seconds=1))
+        self.upcoming = Task.objects.create(title="Upcoming", priority=2, due_date=now + timedelta(days=1))
+        self.done = Task.objects.create(title="Done", status=TaskStatus.COMPLETED, priority=2, due_date=now - timedelta(days=5))
+
+    def get_stats(self):
+        response = self.client.get(reverse("task-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def assert_rollup_is_exact(self):
+        self.assertEqual(TaskStats.counters(), TaskStats.buckets())
+
+    # Test the counts per status, per priority and the overdue count.
+    def test_stats(self):
+        logger.info("Running test_stats")
+        stats = self.get_stats()
+        logger.info(f"Stats: {stats}")
+        self.assertEqual(stats, {
+            'total': 4,
+            'by_status': {'Pending': 3, 'Completed': 1},
+            'by_priority': {'1': 2, '2': 2},
+            'overdue': 2,
+        })
+
+    # Test that reading the statistics does not scan the tasks table.
+    def test_stats_queries(self):
+        logger.info("Running test_stats_queries")
+        with self.assertNumQueries(3):  # The totals, the past due days, and the tasks that fell overdue today
+            self.get_stats()
+
+    # Test that every write path keeps the rollup exact.
+    def test_writes_update_counters(self):
+        logger.info("Running test_writes_update_counters")
+        self.client.patch(reverse("task-detail", args=[self.overdue.pk]), {"status": TaskStatus.COMPLETED}, format='json')
+        self.assert_rollup_is_exact()
+        self.client.post(reverse("task-bulk"), [{"title": "Bulk", "priority": 7}, {"title": "Bulk 2"}], format='json')
+        self.client.patch(reverse("task-bulk"), [{"id": self.upcoming.pk, "priority": 7}], format='json')
+        self.assert_rollup_is_exact()
+        self.upcoming.refresh_from_db()
+        self.upcoming.due_date = timezone.now() - timedelta(days=3)
+        self.upcoming.save()
+        self.client.delete(reverse("task-detail", args=[self.done.pk]))
+        Task.objects.filter(title__startswith="Bulk").delete()
+        self.assert_rollup_is_exact()
+        stats = self.get_stats()
+        self.assertEqual(stats['by_status'], {'Pending': 2, 'Completed': 1})
+        self.assertEqual(stats['by_priority'], {'1': 2, '7': 1})
+        self.assertEqual(stats['overdue'], 2)
+
+    # Test that the reconciliation command reports and repairs drifted counters.
+    def test_rebuild_command(self):
+        logger.info("Running test_rebuild_command")
+        TaskStat.objects.filter(status=TaskStatus.COMPLETED).update(count=40)
+        TaskStat.objects.create(status=TaskStatus.PENDING, priority=9, count=3)
+        stdout = io.StringIO()
+        call_command('rebuild_task_stats', dry_run=True, stdout=stdout)
+        self.assertIn("2 of 6 task statistics counters are wrong.", stdout.getvalue())
+        call_command('rebuild_task_stats', stdout=stdout)
+        self.assert_rollup_is_exact()
+        self.assertEqual(self.get_stats()['total'], 4)
+        stdout = io.StringIO()
+        call_command('rebuild_task_stats', stdout=stdout)
+        self.assertIn("All 6 task statistics counters are correct.", stdout.getvalue())
+
+    # Test that a rebuild folds the counter slots and drops the rows that fell to zero.
+    def test_rebuild_prunes_zero_rows(self):
+        logger.info("Running test_rebuild_prunes_zero_rows")
+        Task.objects.create(title="Short Lived", priority=8, due_date=timezone.now() + timedelta(days=30)).delete()
+        self.assertTrue(TaskStat.objects.filter(priority=8).exists())
+        self.assertEqual(TaskStats.rebuild(), (6, 0))
+        self.assertFalse(TaskStat.objects.filter(count=0).exists())
+        self.assertFalse(TaskDueStat.objects.filter(count=0).exists())
+        self.assertEqual(TaskStat.objects.count(), 3)
+        self.assertEqual(TaskDueStat.objects.count(), 3)
+        self.assert_rollup_is_exact()
+
+
+# Test suite for concurrent writes to the TaskStat rollup. The rows have to be committed for other
+# connections to see them.
+class TaskStatsConcurrencyTest(TransactionTestCase):
+    # Test that transactions adding to the same bucket write different counter slots instead of waiting.
+    def test_writers_do_not_wait_on_one_bucket(self):
+        logger.info("Running test_writers_do_not_wait_on_one_bucket")
+
+        def create():
+            try:
+                Task.objects.create(title="Concurrent Task", priority=5)
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            Task.objects.create(title="Open Transaction Task", priority=5)
+            thread = threading.Thread(target=create)
+            thread.start()
+            thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(TaskStat.objects.filter(priority=5).exclude(count=0).count(), 2)
+        self.assertEqual(TaskStats.get()['by_priority'], {'5': 2})
+        self.assertEqual(TaskStats.rebuild(dry_run=True)[1], 0)
@@ -0,0 +1,108 @@
+import json
+import logging
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tasks.models import Task, TaskStatus
+
+logger = logging.getLogger('django')
+
+# Test suite for task versions, ETags and conditional requests on the DRF endpoints.
+@override_settings(RATELIMIT_ENABLE=False)
+class TaskVersionTest(APITestCase):
+    def setUp(self):
+        logger.info("Setting up test data for versioning tests")
+        cache.clear()
+        self.task = Task.objects.create(title="Versioned Task")
+        self.url = reverse("task-detail", args=[self.task.pk])
+
+    def patch(self, data, **headers):
+        return self.client.patch(self.url, data, format='json', headers=headers)
+
+    # Test that saving a task and bulk updates increment its version.
+    def test_writes_increment_version(self):
+        logger.info("Running test_writes_increment_version")
+        self.assertEqual(self.task.version, 1)
+        self.task.title = "Saved"
+        self.task.save(update_fields=['title'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 2)
+        response = self.client.patch(reverse("task-bulk"), [{"id": self.task.pk, "priority": 3}], format='json')
+        self.assertEqual(response.data['results'][0]['data']['version'], 3)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 3)
+
+    # Test that a PATCH is a single UPDATE that returns the new version as the ETag.
+    def test_partial_update_is_one_query(self):
+        logger.info("Running test_partial_update_is_one_query")
+        with self.assertNumQueries(1):
+            response = self.patch({"status": TaskStatus.COMPLETED})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(response.data['title'], "Versioned Task")
+        self.assertEqual(response['ETag'], '"2"')
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), (TaskStatus.COMPLETED, 2))
+
+    # Test that `If-Match` applies the update only to the current version.
+    def test_if_match(self):
+        logger.info("Running test_if_match")
+        response = self.patch({"priority": 2}, **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.patch({"priority": 5}, **{'If-Match': '"1"'})
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.patch({"priority": 5}, **{'If-Match': 'W/"2"'})  # Weak tags never match
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.priority, self.task.version), (2, 2))
+        response = self.patch({"priority": 5}, **{'If-Match': '"1", "2"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.patch({"priority": 1}, **{'If-Match': '*'})
+        self.assertEqual(response['ETag'], '"4"')
+
+    # Test that PATCH still validates its data and reports missing tasks.
+    def test_partial_update_errors(self):
+        logger.info("Running test_partial_update_errors")
+        self.assertEqual(self.patch({"status": "Unknown"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.patch({"version": 40}).data['version'], 2)  # Read-only
+        missing = reverse("task-detail", args=[999999])
+        for headers in ({}, {'If-Match': '"1"'}):
+            response = self.client.patch(missing, {"priority": 1}, format='json', headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test that GET answers a matching `If-None-Match` with 304 until the task changes.
+    def test_if_none_match(self):
+        logger.info("Running test_if_none_match")
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], '"1"')
+        response = self.client.get(self.url, headers={'If-None-Match': '"1"'})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.patch({"priority": 4})
+        response = self.client.get(self.url, headers={'If-None-Match': 'W/"1"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+
+
+# Test suite for conditional requests on the async detail endpoint.
+@override_settings(RATELIMIT_ENABLE=False)
+class AsyncTaskVersionTest(TestCase):
+    def setUp(self):
+        logger.info("Setting up test data for async versioning tests")
+        self.task = Task.objects.create(title="Async Versioned Task")
+        self.url = reverse("async-task-detail", args=[self.task.pk])
+
+    # Test `If-Match` on PATCH and `If-None-Match` on GET.
+    async def test_conditional_requests(self):
+        logger.info("Running test_conditional_requests")
+        response = await self.async_client.patch(self.url, json.dumps({"priority": 2}), content_type='application/json', headers={'If-Match': '"1"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], '"2"')
+        response = await self.async_client.patch(self.url, json.dumps({"priority": 3}), content_type='application/json', headers={'If-Match': '"1"'})
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = await self.async_client.get(self.url, headers={'If-None-Match': '"2"'})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = await self.async_client.put(self.url, json.dumps({"title": "Replaced"}), content_type='application/json')
+        self.assertEqual(response['ETag'], '"3"')
@@ -1,15 +1,31 @@
 from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django_filters.rest_framework import DjangoFilterBackend
-from django_ratelimit.core import is_ratelimited
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 
-from .models import Task
-from .serializer import TaskSerializer
-from tasks.helpers.pagination import TaskPagination
-from tasks.helpers.service import TaskQueryService
+from .models import Task, TaskWithArchived
+from .serializer import TaskClaimSerializer, TaskLeaseSerializer, TaskSearchResultSerializer, TaskSerializer
+from tasks.helpers.pagination import TaskPagination, TaskCursorPagination
+from tasks.helpers.archive import TaskArchive
+from tasks.helpers.deletion import TaskDeletion
+from tasks.helpers.queue import TaskQueue
+from tasks.helpers.replicas import TaskReplicas
+from tasks.helpers.ratelimit import is_ratelimited
 from tasks.helpers.logger import TaskLogger
-from tasks.helpers.filter import TaskFilter
+from tasks.helpers.cache import TaskCache
+from tasks.helpers.changes import TaskChangeFeed
+from tasks.helpers.bulk import TaskBulkService
+from tasks.helpers.export import TaskExporter
+from tasks.helpers.rows import TaskRowSerializer
+from tasks.helpers.filter import TaskFilter, TaskFilterBackend
+from tasks.helpers.metrics import TaskMetrics
+from tasks.helpers.profiling import TaskProfiler
+from tasks.helpers.service import TaskQueryService
+from tasks.helpers.stats import TaskStats
+from tasks.helpers.versioning import TaskVersion
 
  # Default queryset for fetching tasks
  
@@ -17,28 +33,221 @@ class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer  # Serializer class for serializing task objects
     pagination_class = TaskPagination  # Custom pagination class to control how many tasks per page
-    filter_backends = (DjangoFilterBackend,)  # Django filter backend to apply custom filtering to tasks
+    filter_backends = (TaskFilterBackend,)  # Django filter backend to apply custom filtering to tasks
     filterset_class = TaskFilter  # Custom filter class for filtering tasks based on various fields
 
+    # Use keyset pagination when the client asks for it, page numbers otherwise
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if TaskCursorPagination.is_requested(self.request):
+                self._paginator = TaskCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    # Listings and exports with `?include_archived=true` read live and archived tasks through one view
+    def get_queryset(self):
+        if self.action in ('list', 'export') and TaskArchive.requested(self.request.query_params):
+            return TaskWithArchived.objects.all()
+        return super().get_queryset()
+
+    # Retrievals fall back to the archive, so archived tasks stay readable by ID
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            task = TaskArchive.lookup(self.kwargs[self.lookup_field]) if self.action == 'retrieve' else None
+            if task is None:
+                raise
+            return task
+
+    # Full-text search results also carry their headline snippet
+    def get_serializer_class(self):
+        if self.action == 'list' and TaskQueryService.is_full_text_search(self.request.query_params):
+            return TaskSearchResultSerializer
+        return super().get_serializer_class()
+
+    # Lists, retrievals and exports honour the sparse fieldset of `?fields=`/`?exclude=`
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve', 'export'):
+            kwargs.setdefault('fields', self.selected_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    # The sparse fieldset is parsed once per request, however many serializers the action builds
+    def selected_fields(self):
+        if not hasattr(self, '_selected_fields'):
+            self._selected_fields = TaskQueryService(self.get_queryset(), self.request).selected_fields()
+        return self._selected_fields
+
+    # List tasks through the versioned response cache, reading from a replica when one is healthy.
+    # Only pages read from the primary are cached.
+    def list(self, request, *args, **kwargs):
+        with TaskReplicas.reading(TaskReplicas.read_alias(request)):
+            build_response = lambda: self.list_rows(request, *args, **kwargs)
+            return TaskCache.respond(request, 'list', build_response)
+
+    # Build list pages from value tuples and a precompiled converter table instead of model instances,
+    # falling back to TaskSerializer; the queryset building and serialization are timed as request phases
+    def list_rows(self, request, *args, **kwargs):
+        with TaskProfiler.phase('filter'):
+            serializer = self.get_serializer()
+            queryset = self.filter_queryset(self.get_queryset())
+            if settings.TASK_FAST_SERIALIZER_ENABLED and TaskRowSerializer.supports(serializer):
+                rows = TaskRowSerializer(serializer)
+                queryset = rows.values(queryset)
+                serialize, kind = rows.to_representation, 'rows'
+            else:
+                serialize, kind = (lambda tasks: self.get_serializer(tasks, many=True).data), 'model'
+        page = self.paginate_queryset(queryset)
+        tasks = list(queryset) if page is None else page
+        with TaskMetrics.serializing(kind):
+            data = serialize(tasks)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    # Retrieve a task through the versioned response cache (from a replica like `list`), tagged with its
+    # version as the ETag
+    def retrieve(self, request, *args, **kwargs):
+        build_response = lambda: super(TaskViewSet, self).retrieve(request, *args, **kwargs)
+        with TaskReplicas.reading(TaskReplicas.read_alias(request)):
+            response = TaskCache.respond(request, 'retrieve', build_response, kwargs.get(self.lookup_field))
+        if response.status_code != 200 or 'version' not in response.data:
+            return response
+        etag = TaskVersion.etag(response.data['version'])
+        if TaskVersion.not_modified(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers={'ETag': etag})  # Polling clients skip the payload
+        response['ETag'] = etag
+        return response
+
+    # Stream every task matching the list filters as NDJSON or CSV
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in TaskExporter.content_types:
+            return Response({'export_format': [f"Choose one of: {', '.join(TaskExporter.content_types)}."]}, status=400)
+        queryset = self.filter_queryset(self.get_queryset())
+        exporter = TaskExporter(queryset, self.get_serializer())
+        response = StreamingHttpResponse(exporter.stream(export_format), content_type=TaskExporter.content_types[export_format])
+        response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+        return response
+
+    # Hit/miss counters of the response cache
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        return Response(TaskCache.stats())
+
+    # Traces of sampled slow requests with their SQL and query plans, newest first (staff only)
+    @action(detail=False, methods=['get'], url_path='slow-requests', permission_classes=[IsAdminUser])
+    def slow_requests(self, request):
+        return Response(TaskProfiler.traces())
+
+    # Delta-sync feed: tasks changed and IDs deleted since the `since` cursor
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        return Response(TaskChangeFeed(self.get_serializer(), request).page())
+
+    # Counts per status and priority plus the overdue count, read from the counter rollup
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        return Response(TaskStats.get())
+
+    # Work queue: lease the next pending tasks to a worker, highest priority and earliest due date first
+    @action(detail=False, methods=['post'], url_path='claim')
+    def claim(self, request):
+        serializer = TaskClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queue = TaskQueue(data['worker'], data.get('lease_seconds'))
+        tasks = queue.claim(data['limit'])
+        return Response({
+            'worker': queue.worker,
+            'lease_expires_at': tasks[0].lease_expires_at if tasks else None,
+            'tasks': TaskSerializer(tasks, many=True).data,
+        })
+
+    # Work queue: extend the worker's leases; `lost` lists tasks it no longer holds
+    @action(detail=False, methods=['post'], url_path='heartbeat')
+    def heartbeat(self, request):
+        serializer = TaskLeaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        renewed, lease_expires_at = TaskQueue(data['worker'], data.get('lease_seconds')).heartbeat(data['ids'])
+        lost = sorted(set(data['ids']) - set(renewed))
+        return Response({'renewed': renewed, 'lost': lost, 'lease_expires_at': lease_expires_at})
+
+    # Work queue: give up the worker's leases, optionally marking the tasks Completed
+    @action(detail=False, methods=['post'], url_path='release')
+    def release(self, request):
+        serializer = TaskLeaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        released = TaskQueue(data['worker']).release(data['ids'], completed=data['completed'])
+        return Response({'released': released, 'lost': sorted(set(data['ids']) - set(released))})
+
+    # Bulk create (POST), update (PATCH) and delete (DELETE) of tasks, each batch in one transaction
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        bulk_service = TaskBulkService()
+        if request.method == 'POST':
+            status, data = bulk_service.create(request.data)
+        elif request.method == 'PATCH':
+            # The whole batch counts as one request against the update rate limit
+            if is_ratelimited(request, group='update-task',key='user', rate='2/m', method='PATCH', increment=True):
+                return Response({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
+            status, data = bulk_service.update(request.data)
+        else:
+            # The whole batch counts as one request against the delete rate limit
+            if is_ratelimited(request, group='delete-task',key='user', rate='2/m', method='DELETE', increment=True):
+                return Response({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
+            status, data = bulk_service.delete(request.data)
+        return Response(data, status=status)
+
+    # Move an archived task back into the live table as a new version
+    @action(detail=True, methods=['post'], url_path='restore')
+    def restore(self, request, pk=None):
+        try:
+            pk = Task._meta.pk.to_python(pk)
+        except ValidationError:
+            raise Http404("No archived Task matches the given query.")
+        if not TaskArchive.restore([pk]):
+            if TaskArchive.lookup(pk) is not None:
+                return Response({'detail': 'A live task already has this ID.'}, status=409)
+            raise Http404("No archived Task matches the given query.")
+        task = Task.objects.get(pk=pk)
+        return Response(self.get_serializer(task).data, headers={'ETag': TaskVersion.etag(task.version)})
+
     # Custom delete action, overriding the default destroy behavior
     def destroy(self, request, *args, **kwargs): 
         if is_ratelimited(request, group='delete-task',key='user', rate='2/m', method='DELETE', increment=True):
             return Response({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
         instance = self.get_object()  # Retrieve the task object that is to be deleted
         TaskLogger.log_task_deletion(instance)  
-        instance.delete()  # Delete the task from the database
+        TaskDeletion.delete(Task.objects.filter(pk=instance.pk))  # Soft-delete (or delete) the task
         return Response(status=204)  
     
-    # Custom queryset method to apply filters based on the request
-    def get_queryset(self):  
-        queryset = super().get_queryset()  
-        query_service = TaskQueryService(queryset, self.request)  # Use the TaskQueryService to apply any filters from the request  
-        return query_service.apply_filters() 
-    
-    # Custom partial update method, overriding the default behavior
+    # Custom partial update method: one conditional `UPDATE ... RETURNING` of the changed columns instead
+    # of fetching the task and saving every column. With `If-Match`, a stale version gets 412.
     def partial_update(self, request, *args, **kwargs):
         if is_ratelimited(request, group='update-task',key='user', rate='2/m', method='PATCH', increment=True):
             return Response({'detail': 'Rate limit exceeded. Try again later.'}, status=429)
-        task_instance = self.get_object()  # Get the task object that needs to be updated
+        try:
+            pk = Task._meta.pk.to_python(kwargs[self.lookup_field])
+        except ValidationError:
+            raise Http404("No Task matches the given query.")
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        versions = TaskVersion.parse_if_match(request.headers.get('If-Match'))
+        task_instance = TaskVersion.update(pk, serializer.validated_data, versions)
+        if task_instance is None:
+            if versions is not None and Task.objects.filter(pk=pk).exists():
+                return Response({'detail': 'The task has been modified since it was fetched.'}, status=412)
+            raise Http404("No Task matches the given query.")
         TaskLogger.log_task_update(task_instance)
-        return super().partial_update(request, *args, **kwargs)
\ No newline at end of file
+        return Response(self.get_serializer(task_instance).data, headers={'ETag': TaskVersion.etag(task_instance.version)})
+
+
+# Prometheus metrics of the task API (see TaskMetrics)
+def metrics(request):
+    return HttpResponse(TaskMetrics.export(), content_type=TaskMetrics.content_type)